@@ -0,0 +1,165 @@
+"""
+Stage benchmarks: element kernels, assembly, Dirichlet BCs, solve and post-processing
+on structured meshes from ~1e2 to ~1e6 DOFs. Wall time (best of --repeat) and peak
+traced memory (tracemalloc, separate pass) per stage are written to JSON.
+
+    PYTHONPATH=src python benchmarks/bench_stages.py --max-dofs 1e6 --out bench.json
+    PYTHONPATH=src python benchmarks/bench_stages.py --max-dofs 1e5 --compare bench.json
+"""
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+import numpy as np
+import scipy
+from fem.mesh import make_structured_Q4_mesh, make_structured_T3_mesh
+from fem.materials import D_plane_stress
+from fem.elements import K_structural_Q4_batch, K_conduction_T3_batch
+from fem.assembly import assemble_global, assemble_global_sparse
+from fem.bc import apply_dirichlet, Dirichlet
+from fem.solvers import solve
+from fem.post import nodal_von_mises_Q4
+
+DENSE_MAX_DOFS = 3000   # dense assembly / BC stages only run below this size
+
+def cantilever_q4(n):
+    """Plane-stress Q4 cantilever, n x n/4 elements, clamped left, loaded right."""
+    D = D_plane_stress(210e9, 0.3)
+    s = {}
+    stages = [
+        ('mesh',     lambda: s.update(mesh=make_structured_Q4_mesh(n, max(1, n//4), 1.0, 0.25))),
+        ('elements', lambda: s.update(Ks=K_structural_Q4_batch(s['mesh'].xy[s['mesh'].IEN], D, t=0.01))),
+        ('assembly', lambda: s.update(K=assemble_global_sparse(s['Ks'], s['mesh'].IEN, 2))),
+        ('bc',       lambda: _constrain(s, np.concatenate([2*s['mesh'].nodes['left'], 2*s['mesh'].nodes['left']+1]),
+                                        0.0, _tip_load(s))),
+        ('solve',    lambda: s.update(u=s['bc'].expand(solve(*s['sys']), 0.0))),
+        ('post',     lambda: s.update(vm=nodal_von_mises_Q4(s['mesh'].xy, s['mesh'].IEN, D, s['u']))),
+    ]
+    dense = [
+        ('assembly_dense', lambda: s.update(Kd=assemble_global(s['Ks'], s['mesh'].IEN, 2))),
+        ('bc_dense',       lambda: apply_dirichlet(s['Kd'], np.zeros(s['Kd'].shape[0]), s['bc'].fixed, 0.0)),
+    ]
+    return s, stages, dense
+
+def _tip_load(s):
+    f = np.zeros(s['K'].shape[0])
+    f[2*s['mesh'].nodes['right'] + 1] = -1e3
+    return f
+
+def _constrain(s, dofs, values, f):
+    """Partition fixed DOFs and form the reduced system (the 'bc' stage)."""
+    s['bc'] = Dirichlet(s['K'].shape[0], dofs)
+    s['sys'] = s['bc'].reduce(s['K'], f, values)
+
+def plate_t3(n):
+    """Unit-square T3 conduction plate, 2 n^2 elements, T=1 on the left edge, unit source."""
+    s = {}
+    stages = [
+        ('mesh',     lambda: s.update(mesh=make_structured_T3_mesh(n, n))),
+        ('elements', lambda: s.update(Ks=K_conduction_T3_batch(s['mesh'].xy[s['mesh'].IEN], 4.0))),
+        ('assembly', lambda: s.update(K=assemble_global_sparse(s['Ks'], s['mesh'].IEN, 1))),
+        ('bc',       lambda: _constrain(s, s['mesh'].nodes['left'], 1.0, np.ones(s['K'].shape[0]))),
+        ('solve',    lambda: s.update(u=s['bc'].expand(solve(*s['sys']), 1.0))),
+    ]
+    dense = [
+        ('assembly_dense', lambda: s.update(Kd=assemble_global(s['Ks'], s['mesh'].IEN, 1))),
+        ('bc_dense',       lambda: apply_dirichlet(s['Kd'], np.zeros(s['Kd'].shape[0]), s['bc'].fixed, 1.0)),
+    ]
+    return s, stages, dense
+
+PROBLEMS = {
+    # name: (builder, dofs(n))
+    'cantilever_q4': (cantilever_q4, lambda n: 2*(n+1)*(max(1, n//4)+1)),
+    'plate_t3':      (plate_t3,      lambda n: (n+1)**2),
+}
+
+def mesh_size(dofs, target):
+    """Smallest n >= 2 with dofs(n) >= target (dofs is increasing in n)."""
+    lo, hi = 2, 2
+    while dofs(hi) < target:
+        lo, hi = hi, 2*hi
+    while lo < hi:
+        mid = (lo + hi)//2
+        lo, hi = (mid + 1, hi) if dofs(mid) < target else (lo, mid)
+    return lo
+
+def _time(fn, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def _peak(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_case(name, target_dofs, repeat=3, memory=True):
+    build, dofs = PROBLEMS[name]
+    n = mesh_size(dofs, target_dofs)
+    s, stages, dense = build(n)
+    if dofs(n) <= DENSE_MAX_DOFS:
+        stages = stages + dense
+    out = {'problem': name, 'n': n, 'target_dofs': int(round(target_dofs)), 'dofs': dofs(n),
+           'stages': {}}
+    for stage, fn in stages:
+        rec = {'time': _time(fn, repeat)}
+        if memory:
+            rec['peak_bytes'] = _peak(fn)
+        out['stages'][stage] = rec
+    if 'K' in s:
+        out['nnz'] = int(s['K'].nnz)
+    return out
+
+def compare(results, baseline, threshold=1.25):
+    """Print per-stage time ratios against a baseline JSON; flag ratios above threshold."""
+    base = {(r['problem'], r['dofs']): r for r in baseline['results']}
+    for r in results['results']:
+        b = base.get((r['problem'], r['dofs']))
+        if b is None:
+            continue
+        for stage, rec in r['stages'].items():
+            if stage in b['stages']:
+                ratio = rec['time'] / max(b['stages'][stage]['time'], 1e-12)
+                flag = "  <-- regression" if ratio > threshold else ""
+                print(f"{r['problem']:>14s} {r['dofs']:>9d} {stage:>15s} x{ratio:6.2f}{flag}")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--problems', nargs='+', default=list(PROBLEMS))
+    ap.add_argument('--min-dofs', type=float, default=1e2)
+    ap.add_argument('--max-dofs', type=float, default=1e5)
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    ap.add_argument('--out', default='bench_results.json')
+    ap.add_argument('--compare', help="baseline JSON to compare stage times against")
+    args = ap.parse_args()
+
+    sizes = 10.0**np.arange(np.log10(args.min_dofs), np.log10(args.max_dofs) + 1e-9)
+    results = {
+        'meta': {'numpy': np.__version__, 'scipy': scipy.__version__,
+                 'python': platform.python_version(), 'machine': platform.machine(),
+                 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'results': [],
+    }
+    for name in args.problems:
+        for d in sizes:
+            r = run_case(name, d, args.repeat, not args.no_memory)
+            results['results'].append(r)
+            line = "  ".join(f"{k}={v['time']*1e3:.2f}ms" for k, v in r['stages'].items())
+            print(f"{name:>14s} dofs={r['dofs']:>8d}  {line}")
+    with open(args.out, 'w') as fh:
+        json.dump(results, fh, indent=2)
+    print("Saved", args.out)
+    if args.compare:
+        with open(args.compare) as fh:
+            compare(results, json.load(fh))
+
+if __name__ == "__main__":
+    main()
@@ -6,53 +6,27 @@ Saves a contour image to docs/heat_q4_temperature.png
 import numpy as np
 import os
 import matplotlib.pyplot as plt
-from fem.elements import K_conduction_Q4
-from fem.assembly import assemble_global
-from fem.bc import apply_dirichlet
-
-def make_structured_Q4_mesh(nx, ny, Lx=1.0, Ly=1.0):
-    xs = np.linspace(0, Lx, nx+1)
-    ys = np.linspace(0, Ly, ny+1)
-    X, Y = np.meshgrid(xs, ys, indexing="xy")
-    xy = np.column_stack([X.ravel(), Y.ravel()])  # (N,2)
-    IEN = []
-    def nid(i,j): return j*(nx+1) + i
-    for j in range(ny):
-        for i in range(nx):
-            n1 = nid(i, j)
-            n2 = nid(i+1, j)
-            n3 = nid(i+1, j+1)
-            n4 = nid(i, j+1)
-            IEN.append([n1,n2,n3,n4])
-    return xy, np.array(IEN, dtype=int), X, Y
+from fem.elements import K_conduction_Q4_batch
+from fem.mesh import make_structured_Q4_mesh
+from fem.assembly import assemble_global_sparse
+from fem.bc import Dirichlet
 
 def main():
     nx, ny = 20, 20
     k = 4.0  # conductivity
-    xy, IEN, X, Y = make_structured_Q4_mesh(nx, ny)
-    ne = IEN.shape[0]
+    mesh = make_structured_Q4_mesh(nx, ny)
+    xy, IEN, X, Y = mesh.xy, mesh.IEN, mesh.X, mesh.Y
 
-    Ks = []
-    for e in range(ne):
-        nodes = IEN[e]
-        xy_e = xy[nodes]
-        ke = K_conduction_Q4(xy_e, k)
-        Ks.append(ke)
+    Ks = K_conduction_Q4_batch(xy[IEN], k)
 
-    K = assemble_global(Ks, IEN, ndofs_per_node=1)
+    K = assemble_global_sparse(Ks, IEN, ndofs_per_node=1)
     f = np.zeros(K.shape[0])
 
     # Dirichlet: T=10 on x=0 and y=0 (left & bottom)
-    nxn = nx+1
-    left = [i*(nx+1) for i in range(ny+1)]
-    bottom = list(range(nxn))
-    bc_nodes = sorted(set(left + bottom))
-    bc_dofs = np.array(bc_nodes)  # 1 dof per node
+    bc_dofs = np.union1d(mesh.nodes['left'], mesh.nodes['bottom'])  # 1 dof per node
     bc_vals = np.full_like(bc_dofs, 10.0, dtype=float)
 
-    apply_dirichlet(K, f, bc_dofs, bc_vals)
-
-    T = np.linalg.solve(K, f)
+    T = Dirichlet(K.shape[0], bc_dofs).solve(K, f, values=bc_vals)
 
     print("Solved temperature field, min/max:", T.min(), T.max())
 
@@ -5,60 +5,37 @@ Saves: docs/cantilever_deformed.png and docs/cantilever_disp_contour.png and doc
 import numpy as np
 import os
 import matplotlib.pyplot as plt
-from fem.elements import K_structural_Q4
+from fem.elements import K_structural_Q4_batch
 from fem.materials import D_plane_stress
-from fem.assembly import assemble_global
-from fem.bc import apply_dirichlet
+from fem.mesh import make_structured_Q4_mesh
+from fem.assembly import assemble_global_sparse
+from fem.bc import Dirichlet
 from fem.post import nodal_von_mises_Q4
 
-def make_structured_Q4_mesh(nx, ny, Lx=1.0, Ly=0.2):
-    xs = np.linspace(0, Lx, nx+1)
-    ys = np.linspace(0, Ly, ny+1)
-    X, Y = np.meshgrid(xs, ys, indexing="xy")
-    xy = np.column_stack([X.ravel(), Y.ravel()])
-    IEN = []
-    def nid(i,j): return j*(nx+1) + i
-    for j in range(ny):
-        for i in range(nx):
-            n1 = nid(i, j)
-            n2 = nid(i+1, j)
-            n3 = nid(i+1, j+1)
-            n4 = nid(i, j+1)
-            IEN.append([n1,n2,n3,n4])
-    return xy, np.array(IEN, dtype=int), X, Y
-
 def main():
     nx, ny = 20, 4
     t = 0.01
     E, nu = 210e9, 0.3
     D = D_plane_stress(E, nu)
 
-    xy, IEN, X, Y = make_structured_Q4_mesh(nx, ny, Lx=1.0, Ly=0.2)
+    mesh = make_structured_Q4_mesh(nx, ny, Lx=1.0, Ly=0.2)
+    xy, IEN, X, Y = mesh.xy, mesh.IEN, mesh.X, mesh.Y
 
-    Ks = []
-    for e in range(IEN.shape[0]):
-        nodes = IEN[e]
-        xy_e = xy[nodes]
-        ke = K_structural_Q4(xy_e, D, t=t)
-        Ks.append(ke)
+    Ks = K_structural_Q4_batch(xy[IEN], D, t=t)
 
-    K = assemble_global(Ks, IEN, ndofs_per_node=2)
+    K = assemble_global_sparse(Ks, IEN, ndofs_per_node=2)
     f = np.zeros(K.shape[0])
 
     # Clamp x=0
-    nxn = nx+1
-    left_nodes = [j*(nxn) + 0 for j in range(ny+1)]
-    clamp_dofs = np.array([n*2 for n in left_nodes] + [n*2+1 for n in left_nodes])
+    left_nodes = mesh.nodes['left']
+    clamp_dofs = np.concatenate([2*left_nodes, 2*left_nodes+1])
 
     # Tip traction Ty (downward) on right edge -> lumped nodal forces
     Ty = -1e5
-    right_nodes = [j*(nxn) + nx for j in range(ny+1)]
-    for n in right_nodes:
-        f[n*2+1] += Ty * (0.2 / len(right_nodes)) * t
-
-    apply_dirichlet(K, f, clamp_dofs, np.zeros_like(clamp_dofs, dtype=float))
+    right_nodes = mesh.nodes['right']
+    f[2*right_nodes+1] += Ty * (0.2 / len(right_nodes)) * t
 
-    u = np.linalg.solve(K, f)
+    u = Dirichlet(K.shape[0], clamp_dofs).solve(K, f, values=0.0)
     U = u.reshape(-1,2)
     disp_mag = np.linalg.norm(U, axis=1)
     print("Displacement range |u|:", disp_mag.min(), disp_mag.max())
@@ -1,2 +1,2 @@
-from . import shapes, quadrature, jacobian, materials, elements, assembly, bc
-__all__ = ['shapes','quadrature','jacobian','materials','elements','assembly','bc']
+from . import profiling, shapes, quadrature, jacobian, materials, mesh, elements, dofmap, reorder, assembly, matfree, parallel, solvers, bc, transient, dynamics, nonlinear, post, adapt, locate, sweep, io
+__all__ = ['profiling','shapes','quadrature','jacobian','materials','mesh','elements','dofmap','reorder','assembly','matfree','parallel','solvers','bc','transient','dynamics','nonlinear','post','adapt','locate','sweep','io']
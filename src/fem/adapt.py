@@ -0,0 +1,318 @@
+"""
+Adaptive h-refinement driven by the ZZ error indicator (post.zz_error_indicator).
+
+AdaptiveMesh refines T3 meshes conformingly by newest-vertex bisection and Q4 meshes
+by red refinement (one element -> four) with hanging-node constraints, kept
+1-irregular. A pass only touches the marked elements and their closure: surviving
+elements keep their element matrices, new nodes are appended (existing ids never
+change), the CSR pattern is updated with DofMap.refine instead of rebuilt, and the
+previous solution is interpolated onto the new nodes to warm-start the next solve.
+"""
+from dataclasses import dataclass
+import numpy as np
+import scipy.sparse as sp
+from .dofmap import DofMap
+from .elements import K_structural_Q4_batch, K_structural_T3_batch
+from .bc import Dirichlet
+from .post import zz_error_indicator
+from .profiling import instrument
+
+_KERNELS = {'Q4': K_structural_Q4_batch, 'T3': K_structural_T3_batch}
+
+def _edge_key(a, b, N):
+    a, b = np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64)
+    return np.minimum(a, b)*N + np.maximum(a, b)
+
+def _lookup(sorted_keys, keys):
+    """Positions of keys in sorted_keys and a mask of which are present."""
+    pos = np.searchsorted(sorted_keys, keys)
+    if sorted_keys.size == 0:
+        return pos, np.zeros(np.shape(keys), dtype=bool)
+    return pos, sorted_keys[np.minimum(pos, sorted_keys.size - 1)] == keys
+
+def _longest_edge_first(xy, IEN):
+    """Rotate each triangle so its longest edge is the refinement edge (nodes 0-1)."""
+    L = np.stack([np.linalg.norm(xy[IEN[:, (i + 1) % 3]] - xy[IEN[:, i]], axis=1)
+                  for i in range(3)], axis=1)
+    r = np.argmax(L, axis=1)
+    cols = (r[:, None] + np.arange(3)) % 3
+    return np.take_along_axis(IEN, cols, axis=1)
+
+def mark_bulk(eta, theta=0.5):
+    """Doerfler marking: the fewest elements whose eta^2 sum to theta of the total (bool mask)."""
+    eta2 = np.asarray(eta, dtype=float)**2
+    order = np.argsort(eta2)[::-1]
+    n = np.searchsorted(np.cumsum(eta2[order]), theta*eta2.sum()) + 1
+    marked = np.zeros(eta2.size, dtype=bool)
+    marked[order[:n]] = True
+    return marked
+
+@dataclass
+class Refinement:
+    keep: np.ndarray        # (nelem_old,) bool, surviving elements (listed first, in order)
+    nnew: int               # number of new elements, appended after the survivors
+    interp: sp.csr_matrix   # (Nnodes_new, Nnodes_old) nodal interpolation old -> new
+
+class AdaptiveMesh:
+    """
+    Locally refinable T3 / Q4 mesh.
+    xy (N,2), IEN (nelem,nen); nodes: optional {side: node ids} (e.g. StructuredMesh.nodes),
+    extended as boundary edges are split. T3 elements are stored with their refinement
+    edge first ((a, b, c) bisects a-b); the initial one is the longest edge.
+    hanging: (nh, 3) Q4 constraints (h, a, b), u_h = (u_a + u_b)/2.
+    level:   (nelem,) refinement depth of every element.
+    """
+    def __init__(self, xy, IEN, etype, nodes=None):
+        if etype not in _KERNELS:
+            raise ValueError(f"Adaptive refinement supports T3 and Q4, not {etype!r}")
+        self.xy = np.array(xy, dtype=float)
+        IEN = np.array(IEN, dtype=np.int64)
+        self.IEN = _longest_edge_first(self.xy, IEN) if etype == 'T3' else IEN
+        self.etype = etype
+        self.nodes = {k: np.asarray(v, dtype=np.int64) for k, v in (nodes or {}).items()}
+        self.hanging = np.empty((0, 3), dtype=np.int64)
+        self.level = np.zeros(self.IEN.shape[0], dtype=np.int32)
+
+    @classmethod
+    def from_structured(cls, mesh):
+        return cls(mesh.xy, mesh.IEN, mesh.etype, mesh.nodes)
+
+    @property
+    def Nnodes(self):
+        return self.xy.shape[0]
+
+    def _edges(self, IEN):
+        nen = IEN.shape[1]
+        return [(IEN[:, i], IEN[:, (i + 1) % nen]) for i in range(nen)]
+
+    @instrument('adapt.AdaptiveMesh.refine')
+    def refine(self, marked):
+        """Refine the marked elements (bool mask or ids) and their closure; returns a Refinement."""
+        marked = np.asarray(marked)
+        if marked.dtype != bool:
+            marked = np.isin(np.arange(self.IEN.shape[0]), marked)
+        N = self.Nnodes
+        if self.etype == 'T3':
+            refined, children, edge_par, centre_par, lvl = self._bisect(marked)
+        else:
+            refined, children, edge_par, centre_par, lvl = self._red(marked)
+        ne, nc = edge_par.shape[0], centre_par.shape[0]
+        Nnew = N + ne + nc
+        rows = np.concatenate([np.arange(N), np.repeat(N + np.arange(ne), 2),
+                               np.repeat(N + ne + np.arange(nc), 4)])
+        cols = np.concatenate([np.arange(N), edge_par.ravel(), centre_par.ravel()])
+        vals = np.concatenate([np.ones(N), np.full(2*ne, 0.5), np.full(4*nc, 0.25)])
+        interp = sp.csr_matrix((vals, (rows, cols)), shape=(Nnew, N))
+        self.xy = interp @ self.xy
+        # a new node on a straight side belongs to that side when both edge ends do
+        for side, ids in self.nodes.items():
+            on = np.zeros(N, dtype=bool)
+            on[ids] = True
+            add = N + np.flatnonzero(on[edge_par[:, 0]] & on[edge_par[:, 1]])
+            self.nodes[side] = np.concatenate([ids, add])
+        keep = ~refined
+        self.IEN = np.concatenate([self.IEN[keep], children])
+        self.level = np.concatenate([self.level[keep], lvl])
+        return Refinement(keep, len(children), interp)
+
+    def _bisect(self, marked):
+        """Conforming newest-vertex bisection with closure."""
+        N, IEN = self.Nnodes, self.IEN
+        keys = np.stack([_edge_key(a, b, N) for a, b in self._edges(IEN)], axis=1)
+        ukeys, inv = np.unique(keys, return_inverse=True)
+        inv = inv.reshape(keys.shape)
+        mark = np.zeros(ukeys.size, dtype=bool)
+        mark[inv[marked, 0]] = True
+        while True:                     # any marked edge forces the refinement edge
+            need = mark[inv].any(axis=1) & ~mark[inv[:, 0]]
+            if not need.any():
+                break
+            mark[inv[need, 0]] = True
+        medges = ukeys[mark]
+        edge_par = np.column_stack([medges // N, medges % N])
+        refined = mark[inv[:, 0]]
+        elems, lvl = IEN[refined], self.level[refined]
+        Nk = N + medges.size                # key base covering the new mid-nodes
+        mkeys = edge_par[:, 0]*Nk + edge_par[:, 1]
+        out, out_lvl = [], []
+        while len(elems):
+            pos, bis = _lookup(mkeys, _edge_key(elems[:, 0], elems[:, 1], Nk))
+            out.append(elems[~bis])
+            out_lvl.append(lvl[~bis])
+            a, b, c = elems[bis].T
+            m = N + pos[bis]
+            elems = np.concatenate([np.column_stack([c, a, m]), np.column_stack([b, c, m])])
+            lvl = np.tile(lvl[bis] + 1, 2)
+        return (refined, np.concatenate(out), edge_par, np.empty((0, 4), dtype=np.int64),
+                np.concatenate(out_lvl))
+
+    def _red(self, marked):
+        """Q4 red refinement with 1-irregular hanging nodes."""
+        N, IEN = self.Nnodes, self.IEN
+        ekeys = np.stack([_edge_key(a, b, N) for a, b in self._edges(IEN)], axis=1)
+        order = np.argsort(ekeys.ravel())
+        skeys = ekeys.ravel()[order]
+        parent = np.full((N, 2), -1, dtype=np.int64)
+        parent[self.hanging[:, 0]] = self.hanging[:, 1:]
+        hkeys = _edge_key(self.hanging[:, 1], self.hanging[:, 2], N)
+        marked = marked.copy()
+        while True:
+            # an edge of a marked element lying on a coarser neighbour's edge (one end
+            # hanging, the other end one of its parents) forces that neighbour
+            coarse = []
+            for x, y in self._edges(IEN[marked]):
+                for h, o in ((x, y), (y, x)):
+                    p = parent[h]
+                    on = (p[:, 0] == o) | (p[:, 1] == o)
+                    coarse.append(_edge_key(p[on, 0], p[on, 1], N))
+            coarse = np.concatenate(coarse)
+            pos, found = _lookup(skeys, coarse)
+            force = np.unique(order[pos[found]] // 4)
+            force = force[~marked[force]]
+            if force.size == 0:
+                break
+            marked[force] = True
+
+        E = IEN[marked]
+        ek = ekeys[marked]                                           # (nm, 4)
+        uk, inv = np.unique(ek, return_inverse=True)
+        inv = inv.reshape(ek.shape)
+        n_all = np.searchsorted(skeys, uk, side='right') - np.searchsorted(skeys, uk)
+        n_marked = np.bincount(inv.ravel(), minlength=uk.size)
+        hpos, has_h = _lookup(np.sort(hkeys), uk)
+        h_sorted = self.hanging[np.argsort(hkeys)]
+
+        mid = np.empty(uk.size, dtype=np.int64)
+        mid[has_h] = h_sorted[hpos[has_h], 0]
+        new_edges = np.flatnonzero(~has_h)
+        mid[new_edges] = N + np.arange(new_edges.size)
+        edge_par = np.column_stack([uk[new_edges] // N, uk[new_edges] % N])
+        centre = N + new_edges.size + np.arange(E.shape[0])
+
+        # drop constraints whose edge is now refined from both sides, add new ones
+        keep_h = np.ones(self.hanging.shape[0], dtype=bool)
+        keep_h[np.argsort(hkeys)[hpos[has_h]]] = False
+        # a new mid-node hangs on an interior edge refined from one side only, and always
+        # on half of a coarse edge (the coarse neighbour's child will be unrefined)
+        h, p = self.hanging[:, 0], self.hanging[:, 1:]
+        halves = np.unique(np.concatenate([_edge_key(h, p[:, 0], N), _edge_key(h, p[:, 1], N)]))
+        is_half = _lookup(halves, uk)[1]
+        hang = ~has_h & (((n_all == 2) & (n_marked == 1)) | is_half)
+        new_h = np.column_stack([mid[hang], uk[hang] // N, uk[hang] % N])
+        self.hanging = np.concatenate([self.hanging[keep_h], new_h]).astype(np.int64)
+
+        m12, m23, m34, m41 = (mid[inv[:, i]] for i in range(4))
+        c1, c2, c3, c4 = E.T
+        children = np.concatenate([np.column_stack([c1, m12, centre, m41]),
+                                   np.column_stack([m12, c2, m23, centre]),
+                                   np.column_stack([centre, m23, c3, m34]),
+                                   np.column_stack([m41, centre, m34, c4])])
+        return marked, children, edge_par, E, np.tile(self.level[marked] + 1, 4)
+
+    def constraint_matrix(self):
+        """
+        T (Nnodes, nmaster) with nodal values u = T @ u_master, and the master node ids
+        (all nodes that are not hanging). Chained constraints are resolved.
+        """
+        N = self.Nnodes
+        h = self.hanging
+        master = np.setdiff1d(np.arange(N), h[:, 0])
+        if h.shape[0] == 0:
+            return sp.identity(N, format='csr'), master
+        free = np.ones(N, dtype=bool)
+        free[h[:, 0]] = False
+        rows = np.concatenate([master, h[:, 0], h[:, 0]])
+        cols = np.concatenate([master, h[:, 1], h[:, 2]])
+        vals = np.concatenate([np.ones(master.size), np.full(2*h.shape[0], 0.5)])
+        T = sp.csr_matrix((vals, (rows, cols)), shape=(N, N))
+        while T[:, h[:, 0]].nnz:
+            T = (T @ T).tocsr()
+        return T[:, master].tocsr(), master
+
+class AdaptiveSolver:
+    """
+    Solve -> estimate -> mark -> refine loop for plane elasticity on an AdaptiveMesh.
+    D, t:   material (D (3,3), thickness scalar)
+    bc:     bc(mesh) -> (fixed_dofs, values) on the current mesh (boundary nodes are
+            never hanging)
+    load:   load(mesh) -> f (2*Nnodes,)
+    theta:  Doerfler marking fraction (mark_bulk)
+    solver_opts: fem.solvers.solve options (default method='cg', precond='jacobi');
+            iterative solves start from the previous solution interpolated to the new mesh.
+    """
+    def __init__(self, mesh, D, bc, load, t=1.0, theta=0.5, **solver_opts):
+        self.mesh = mesh
+        self.D = np.asarray(D, dtype=float)
+        self.t = t
+        self.bc = bc
+        self.load = load
+        self.theta = theta
+        self.solver_opts = dict(method='cg', precond='jacobi', tol=1e-10)
+        self.solver_opts.update(solver_opts)
+        self.kernel = _KERNELS[mesh.etype]
+        self.Ks = self.kernel(mesh.xy[mesh.IEN], self.D, t)
+        self.dofmap = DofMap(mesh.IEN, 2, mesh.Nnodes)
+        self.u = None
+        self.history = []
+
+    @property
+    def ndofs(self):
+        """Independent DOFs (hanging nodes excluded)."""
+        return 2*(self.mesh.Nnodes - self.mesh.hanging.shape[0])
+
+    @instrument('adapt.AdaptiveSolver.solve')
+    def solve(self, x0=None):
+        """Solve on the current mesh; x0: optional initial guess (2*Nnodes,). Returns u, SolveInfo."""
+        mesh = self.mesh
+        K = self.dofmap.assemble(self.Ks)
+        Tn, master = mesh.constraint_matrix()
+        T = sp.kron(Tn, sp.identity(2), format='csr')
+        Kr = (T.T @ K @ T).tocsr()
+        fr = T.T @ np.asarray(self.load(mesh), dtype=float)
+        fixed, values = self.bc(mesh)
+        fixed = np.asarray(fixed, dtype=np.int64)
+        col = np.full(mesh.Nnodes, -1, dtype=np.int64)
+        col[master] = np.arange(master.size)
+        bc = Dirichlet(Kr.shape[0], 2*col[fixed // 2] + fixed % 2)
+        opts = dict(self.solver_opts)
+        if x0 is not None:
+            x0r = np.asarray(x0, dtype=float).reshape(-1, 2)[master].ravel()
+            opts['x0'] = x0r[bc.free]
+        ur, info = bc.solve(Kr, fr, values, return_info=True, **opts)
+        self.u = T @ ur
+        return self.u, info
+
+    def estimate(self):
+        """ZZ indicators eta (nelem,) and the global relative energy-norm error estimate."""
+        mesh = self.mesh
+        eta, energy = zz_error_indicator(mesh.xy, mesh.IEN, self.D, self.u, mesh.etype,
+                                         t=self.t, return_energy=True)
+        e2 = np.sum(eta**2)
+        return eta, np.sqrt(e2/(energy.sum() + e2))
+
+    @instrument('adapt.AdaptiveSolver.refine')
+    def refine(self, marked):
+        """Refine and update element matrices, DofMap and the interpolated solution."""
+        mesh = self.mesh
+        r = mesh.refine(marked)
+        new = mesh.IEN[mesh.IEN.shape[0] - r.nnew:]
+        self.Ks = np.concatenate([self.Ks[r.keep], self.kernel(mesh.xy[new], self.D, self.t)])
+        self.dofmap = self.dofmap.refine(r.keep, new, mesh.Nnodes)
+        if self.u is not None:
+            self.u = (r.interp @ self.u.reshape(-1, 2)).ravel()
+        return r
+
+    @instrument('adapt.AdaptiveSolver.run')
+    def run(self, target=0.05, max_steps=20, max_dofs=None):
+        """
+        Adapt until the estimated relative error is below target (or max_steps /
+        max_dofs is reached). history: per pass {ndofs, error, iterations}. Returns u.
+        """
+        for _ in range(max_steps):
+            u, info = self.solve(x0=self.u)
+            eta, err = self.estimate()
+            self.history.append({'ndofs': self.ndofs, 'error': err, 'iterations': info.iterations})
+            if err <= target or (max_dofs is not None and self.ndofs >= max_dofs):
+                break
+            self.refine(mark_bulk(eta, self.theta))
+        return self.u
@@ -1,40 +1,135 @@
 import numpy as np
+import scipy.sparse as sp
+from .dofmap import element_dofs, DofMap
+from .profiling import instrument
 
-def assemble_global(Ks, IEN, ndofs_per_node):
+BLOCK_SIZE = 65536   # elements per block in streamed assembly
+
+def _num_nodes(IEN, Nnodes):
+    if Nnodes is None and IEN is None:
+        raise ValueError("Nnodes is required when assembling a stream without IEN")
+    return int(np.max(IEN)) + 1 if Nnodes is None else int(Nnodes)
+
+def _is_stream(Ks):
+    """Element data given as an iterator of (IEN_block, values_block) pairs."""
+    return not isinstance(Ks, (list, tuple, np.ndarray)) and hasattr(Ks, '__iter__')
+
+def stream_element_matrices(kernel, xy, IEN, *args, block_size=BLOCK_SIZE, **kwargs):
+    """
+    Lazily yield (IEN_block, kernel(xy[IEN_block], *args, **kwargs)) over element blocks.
+    xy / IEN may be memory-mapped (fem.io.Store); only one block is in memory at a time,
+    and each block is dropped once the consumer has scattered it.
+    """
+    for start in range(0, IEN.shape[0], block_size):
+        ien = np.asarray(IEN[start:start+block_size])
+        yield ien, kernel(xy[ien], *args, **kwargs)
+
+@instrument('assembly.assemble_global')
+def assemble_global(Ks, IEN, ndofs_per_node, Nnodes=None):
     """
     Ks: list of element stiffness matrices (each (nen*ndofs, nen*ndofs))
     IEN: (nelems, nen) array of element -> node connectivity (global node ids 0..N-1)
     ndofs_per_node: 1 (conduction) or 2 (ux,uy) for structural
     Returns K_global (N*ndofs x N*ndofs)
     """
-    nelems, nen = IEN.shape
-    max_node = int(np.max(IEN))
-    Nnodes = max_node + 1
+    if _is_stream(Ks):
+        raise ValueError("assemble_global builds a dense N x N matrix; "
+                         "assemble streams with assemble_global_sparse")
+    Nnodes = _num_nodes(IEN, Nnodes)
     K = np.zeros((Nnodes*ndofs_per_node, Nnodes*ndofs_per_node))
 
-    for e in range(nelems):
-        ke = Ks[e]
-        nodes = IEN[e]
-        edofs = []
-        for a in nodes:
-            for d in range(ndofs_per_node):
-                edofs.append(a*ndofs_per_node + d)
-        edofs = np.array(edofs, dtype=int)
-        K[np.ix_(edofs, edofs)] += ke
+    edofs_all = element_dofs(IEN, ndofs_per_node)
+    for e in range(edofs_all.shape[0]):
+        edofs = edofs_all[e]
+        K[np.ix_(edofs, edofs)] += Ks[e]
     return K
 
-def assemble_force_RHS(Fs, IEN, ndofs_per_node):
-    nelems, nen = IEN.shape
-    max_node = int(np.max(IEN))
-    Nnodes = max_node + 1
-    f = np.zeros(Nnodes*ndofs_per_node)
-    for e in range(nelems):
-        fe = Fs[e]
-        nodes = IEN[e]
-        edofs = []
-        for a in nodes:
-            for d in range(ndofs_per_node):
-                edofs.append(a*ndofs_per_node + d)
-        edofs = np.array(edofs, dtype=int)
-        f[edofs] += fe
-    return f
+@instrument('assembly.assemble_global_sparse')
+def assemble_global_sparse(Ks, IEN, ndofs_per_node, Nnodes=None, dofmap=None):
+    """
+    Sparse counterpart of assemble_global.
+    Ks: (nelems, nd, nd) stack (or list) of element matrices, nd = nen*ndofs,
+        or a stream of (IEN_block, Ks_block) pairs (see stream_element_matrices)
+    Builds one batch of (row, col, value) triplets and converts to CSR;
+    duplicate entries are summed, so memory scales with nnz rather than N^2.
+    Nnodes: total node count (default max(IEN)+1)
+    dofmap: optional DofMap for this mesh; reuses its CSR pattern (data fill only)
+    Returns scipy.sparse CSR matrix (N*ndofs x N*ndofs)
+
+    Streams are scattered block by block into the CSR data of a pattern built over
+    element blocks (DofMap(..., block_size)), so peak memory is O(block + nnz), never
+    O(nelems*nd^2). Without IEN or a dofmap, block CSR matrices are summed instead.
+    """
+    if _is_stream(Ks):
+        return _assemble_stream(Ks, IEN, ndofs_per_node, Nnodes, dofmap)
+    if dofmap is not None:
+        return dofmap.assemble(Ks)
+    edofs = element_dofs(IEN, ndofs_per_node)
+    nelems, nd = edofs.shape
+    Ks = np.asarray(Ks, dtype=float).reshape(nelems, nd, nd)
+    N = _num_nodes(IEN, Nnodes)*ndofs_per_node
+    rows = np.broadcast_to(edofs[:, :, None], (nelems, nd, nd)).ravel()
+    cols = np.broadcast_to(edofs[:, None, :], (nelems, nd, nd)).ravel()
+    K = sp.coo_matrix((Ks.ravel(), (rows, cols)), shape=(N, N)).tocsr()
+    K.sum_duplicates()
+    return K
+
+def _assemble_stream(blocks, IEN, ndofs_per_node, Nnodes, dofmap):
+    if dofmap is None and IEN is not None:
+        dofmap = DofMap(IEN, ndofs_per_node, Nnodes, block_size=BLOCK_SIZE)
+    if dofmap is not None:
+        data = np.zeros(dofmap.nnz)
+        for ien, ks in blocks:
+            dofmap.scatter_add(data, element_dofs(ien, ndofs_per_node), ks)
+        K = sp.csr_matrix((data, dofmap.indices, dofmap.indptr), shape=dofmap.shape)
+        K.has_sorted_indices = True
+        return K
+    K = None
+    for ien, ks in blocks:
+        Kb = assemble_global_sparse.__wrapped__(ks, ien, ndofs_per_node, Nnodes)
+        K = Kb if K is None else K + Kb
+    return K
+
+@instrument('assembly.assemble_force_RHS')
+def assemble_force_RHS(Fs, IEN, ndofs_per_node, Nnodes=None, dofmap=None):
+    """
+    Fs: (nelems, nen*ndofs) stack (or list) of element load vectors,
+        (nelems, nen*ndofs, nrhs) for several load cases,
+        or a stream of (IEN_block, Fs_block) pairs (blocks with or without an nrhs axis)
+    Scatter-adds with np.bincount; returns f (N*ndofs,) or (N*ndofs, nrhs)
+    """
+    if _is_stream(Fs):
+        Nnodes = dofmap.Nnodes if dofmap is not None else _num_nodes(IEN, Nnodes)
+        f = None
+        for ien, fs in Fs:
+            fb = LoadScatter(ien, ndofs_per_node, Nnodes).assemble(fs)
+            f = fb if f is None else f + fb
+        return np.zeros(Nnodes*ndofs_per_node) if f is None else f
+    if np.ndim(Fs) == 3:
+        Nnodes = dofmap.Nnodes if dofmap is not None else _num_nodes(IEN, Nnodes)
+        return LoadScatter(IEN, ndofs_per_node, Nnodes).assemble(Fs)
+    if dofmap is not None:
+        return dofmap.assemble_vector(Fs)
+    edofs = element_dofs(IEN, ndofs_per_node)
+    N = _num_nodes(IEN, Nnodes)*ndofs_per_node
+    Fs = np.asarray(Fs, dtype=float).reshape(edofs.shape)
+    return np.bincount(edofs.ravel(), weights=Fs.ravel(), minlength=N)
+
+class LoadScatter:
+    """
+    Scatter of item load vectors into the global RHS with the indices built once.
+    conn: (nitems, nen) element connectivity (IEN) or a boundary edge set (mesh.edges[side]).
+    The scatter is a sparse (N, nitems*nd) 0/1 matrix, so one load case or an
+    (nitems, nd, nrhs) stack of load cases is assembled with a single product.
+    """
+    def __init__(self, conn, ndofs_per_node, Nnodes):
+        self.edofs = element_dofs(conn, ndofs_per_node)
+        self.N = int(Nnodes)*ndofs_per_node
+        n = self.edofs.size
+        self.S = sp.csr_matrix((np.ones(n), (self.edofs.ravel(), np.arange(n))), shape=(self.N, n))
+
+    @instrument('assembly.LoadScatter.assemble')
+    def assemble(self, Fs):
+        """Fs (nitems, nd) -> f (N,); (nitems, nd, nrhs) -> F (N, nrhs)."""
+        Fs = np.asarray(Fs, dtype=float)
+        return self.S @ Fs.reshape((self.S.shape[1],) + Fs.shape[2:])
@@ -1,12 +1,120 @@
 import numpy as np
+import scipy.sparse as sp
+from .solvers import solve as linear_solve
+from .profiling import instrument
 
+@instrument('bc.apply_dirichlet')
 def apply_dirichlet(K, f, dof_indices, values):
     """
-    Impose u[dof_indices] = values. Modifies K,f in-place and returns them.
+    Impose u[dof_indices] = values by symmetric lifting:
+    f -= K[:,dofs] @ values, zero constrained rows/cols, unit diagonal, f[dofs] = values.
+    Dense K and f are modified in-place; a sparse K is replaced by a new CSR matrix
+    (cost linear in nnz). Repeated DOFs are lifted once, with their first value.
+    Returns K, f.
     """
-    for dof, val in zip(dof_indices, values):
-        K[dof,:] = 0.0
-        K[:,dof] = 0.0
-        K[dof,dof] = 1.0
-        f[dof] = val
+    dofs = np.asarray(dof_indices, dtype=int).ravel()
+    vals = np.broadcast_to(np.asarray(values, dtype=float), dofs.shape)
+    dofs, first = np.unique(dofs, return_index=True)
+    vals = vals[first]
+    f -= K[:, dofs] @ vals
+    if sp.issparse(K):
+        keep = np.ones(K.shape[0])
+        keep[dofs] = 0.0
+        P = sp.diags(keep)
+        K = (P @ K @ P + sp.diags(1.0 - keep)).tocsr()
+    else:
+        K[dofs, :] = 0.0
+        K[:, dofs] = 0.0
+        K[dofs, dofs] = 1.0
+    f[dofs] = vals
     return K, f
+
+@instrument('bc.apply_dirichlet_penalty')
+def apply_dirichlet_penalty(K, f, dof_indices, values, penalty=None):
+    """
+    Impose u[dof_indices] = values approximately with a penalty beta on the diagonal:
+    K[d,d] += beta, f[d] += beta*value. Default beta = 1e8 * max|diag(K)|.
+    Dense K and f are modified in-place; a sparse K is replaced. Returns K, f.
+    """
+    dofs = np.asarray(dof_indices, dtype=int)
+    vals = np.broadcast_to(np.asarray(values, dtype=float), dofs.shape)
+    if penalty is None:
+        penalty = 1e8*np.abs(K.diagonal()).max()
+    if sp.issparse(K):
+        bump = np.zeros(K.shape[0])
+        bump[dofs] = penalty
+        K = (K + sp.diags(bump)).tocsr()
+    else:
+        K[dofs, dofs] += penalty
+    f[dofs] += penalty*vals
+    return K, f
+
+class Dirichlet:
+    """
+    Free/fixed DOF partition for elimination of prescribed DOFs:
+        K_ff u_f = f_f - K_fc u_c
+    The K_ff, K_fc blocks are sliced once for a given K and cached, so repeated
+    solves with new prescribed values (or new f) skip the re-slicing.
+    N: total DOFs; fixed_dofs: constrained DOF ids (values are given in this order).
+    """
+    def __init__(self, N, fixed_dofs):
+        self.N = int(N)
+        fixed_dofs = np.asarray(fixed_dofs, dtype=int).ravel()
+        self.fixed, self._order = np.unique(fixed_dofs, return_index=True)
+        self._nvals = fixed_dofs.size
+        mask = np.ones(self.N, dtype=bool)
+        mask[self.fixed] = False
+        self.free = np.flatnonzero(mask)
+        self._K = None
+        self._blocks = None
+
+    def prescribed(self, values=0.0):
+        """Values (scalar, or aligned with the constructor's fixed_dofs) -> (nfixed,)."""
+        vals = np.broadcast_to(np.asarray(values, dtype=float), (self._nvals,))
+        return vals[self._order]
+
+    @instrument('bc.Dirichlet.blocks')
+    def blocks(self, K):
+        """(K_ff, K_fc) for K, cached until a different K is passed or invalidate()."""
+        if K is not self._K:
+            self._K = K
+            if sp.issparse(K):
+                Kf = K.tocsr()[self.free]
+                self._blocks = (Kf[:, self.free].tocsr(), Kf[:, self.fixed].tocsr())
+            else:
+                self._blocks = (K[np.ix_(self.free, self.free)], K[np.ix_(self.free, self.fixed)])
+        return self._blocks
+
+    def invalidate(self):
+        """Drop the cached blocks (call after modifying K in-place)."""
+        self._K = None
+        self._blocks = None
+
+    @instrument('bc.Dirichlet.reduce')
+    def reduce(self, K, f, values=0.0):
+        """Return K_ff and the lifted right-hand side f_f - K_fc u_c; f: (N,) or (N, nrhs)."""
+        K_ff, K_fc = self.blocks(K)
+        f = np.asarray(f, dtype=float)
+        lift = K_fc @ self.prescribed(values)
+        return K_ff, f[self.free] - (lift[:, None] if f.ndim == 2 else lift)
+
+    def expand(self, u_f, values=0.0):
+        """Scatter free-DOF solution and prescribed values into the full vector (N,) or (N, nrhs)."""
+        u_f = np.asarray(u_f)
+        u = np.empty((self.N,) + u_f.shape[1:])
+        u[self.free] = u_f
+        u_c = self.prescribed(values)
+        u[self.fixed] = u_c[:, None] if u_f.ndim == 2 else u_c
+        return u
+
+    @instrument('bc.Dirichlet.solve')
+    def solve(self, K, f, values=0.0, **solver_opts):
+        """
+        Solve the reduced system with fem.solvers.solve (solver_opts: method, precond, tol,
+        return_info, ...) and return the full solution (N,), plus SolveInfo if requested.
+        """
+        K_ff, rhs = self.reduce(K, f, values)
+        if solver_opts.get('return_info'):
+            u_f, info = linear_solve(K_ff, rhs, **solver_opts)
+            return self.expand(u_f, values), info
+        return self.expand(linear_solve(K_ff, rhs, **solver_opts), values)
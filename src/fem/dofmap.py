@@ -0,0 +1,181 @@
+import numpy as np
+import scipy.sparse as sp
+from .profiling import instrument
+
+BLOCK_SIZE = 65536   # elements per block when filling without perm
+
+def element_dofs(IEN, ndofs_per_node):
+    """
+    IEN: (nelems, nen) connectivity
+    Returns (nelems, nen*ndofs) global DOF ids, node-major: [a0d0, a0d1, a1d0, ...]
+    """
+    IEN = np.asarray(IEN)
+    d = np.arange(ndofs_per_node)
+    return (IEN[:, :, None]*ndofs_per_node + d).reshape(IEN.shape[0], IEN.shape[1]*ndofs_per_node)
+
+def _index_dtype(n):
+    return np.int32 if n < np.iinfo(np.int32).max else np.int64
+
+def _block_keys(edofs, N):
+    """Row-major CSR keys row*N + col of every element entry of an edofs block."""
+    nelems, nd = edofs.shape
+    rows = np.broadcast_to(edofs[:, :, None], (nelems, nd, nd)).astype(np.int64)
+    return (rows*N + edofs[:, None, :]).ravel()
+
+class DofMap:
+    """
+    Element-DOF numbering and CSR scatter pattern of a mesh, built once and
+    reused for every reassembly on that mesh.
+
+    edofs:   (nelems, nd) global DOFs per element, nd = nen*ndofs_per_node
+    indptr, indices: CSR pattern of the global matrix (N x N)
+    perm:    (nelems*nd*nd,) position of each element entry Ks[e,i,j] in the CSR data
+
+    block_size: build the pattern over element blocks without materializing all
+    nelems*nd*nd triplets (out-of-core meshes); perm is then None and block
+    scatters locate entries with a binary search in the pattern (see positions).
+    """
+    @instrument('dofmap.DofMap.__init__')
+    def __init__(self, IEN, ndofs_per_node, Nnodes=None, block_size=None):
+        self.IEN = np.asarray(IEN)
+        self.ndofs_per_node = int(ndofs_per_node)
+        self.Nnodes = int(np.max(self.IEN)) + 1 if Nnodes is None else int(Nnodes)
+        self.N = self.Nnodes*self.ndofs_per_node
+        self.edofs = element_dofs(self.IEN, self.ndofs_per_node)
+        self._keys = None
+
+        if block_size is None:
+            keys = _block_keys(self.edofs, self.N)          # row-major => CSR order once sorted
+            ukeys, perm = np.unique(keys, return_inverse=True)
+        else:
+            # per-block unique keys overlap only on block interfaces: O(nnz) memory
+            ukeys = np.unique(np.concatenate([
+                np.unique(_block_keys(self.edofs[s:s+block_size], self.N))
+                for s in range(0, self.edofs.shape[0], block_size)]))
+            perm = None
+        idx = _index_dtype(max(self.N, ukeys.size))
+        self.perm = None if perm is None else perm.astype(idx).ravel()
+        self.indices = (ukeys % self.N).astype(idx)
+        counts = np.bincount(ukeys // self.N, minlength=self.N)
+        self.indptr = np.concatenate(([0], np.cumsum(counts))).astype(idx)
+        self.nnz = ukeys.size
+
+    @classmethod
+    def from_pattern(cls, IEN, ndofs_per_node, Nnodes, indptr, indices, perm=None):
+        """
+        Rebuild a DofMap from a stored pattern (e.g. memory-mapped arrays) without
+        re-sorting; perm=None gives a block-mode DofMap (scatter via positions).
+        """
+        self = cls.__new__(cls)
+        self.IEN = np.asarray(IEN)
+        self.ndofs_per_node = int(ndofs_per_node)
+        self.Nnodes = int(Nnodes)
+        self.N = self.Nnodes*self.ndofs_per_node
+        self.edofs = element_dofs(self.IEN, self.ndofs_per_node)
+        self.indptr, self.indices, self.perm = indptr, indices, perm
+        self.nnz = len(indices)
+        self._keys = None
+        return self
+
+    @instrument('dofmap.DofMap.refine')
+    def refine(self, keep, IEN_new, Nnodes):
+        """
+        DofMap of the mesh IEN[keep] + IEN_new after local refinement (nodes appended,
+        existing ids unchanged), updated from this pattern instead of re-sorting all
+        element entries: entries only the removed elements covered are dropped, the new
+        elements' keys are merged in, and the kept elements' perm is remapped.
+        keep: (nelems,) bool mask of surviving elements. Requires perm (no block_size).
+        """
+        if self.perm is None:
+            raise ValueError("refine needs a DofMap built without block_size")
+        keep = np.asarray(keep, dtype=bool)
+        nd2 = self.edofs.shape[1]**2
+        perm = self.perm.reshape(-1, nd2)
+        counts = np.bincount(perm[keep].ravel(), minlength=self.nnz)
+
+        new = DofMap.__new__(DofMap)
+        new.IEN = np.concatenate([self.IEN[keep], np.asarray(IEN_new, dtype=self.IEN.dtype)])
+        new.ndofs_per_node = self.ndofs_per_node
+        new.Nnodes = int(Nnodes)
+        new.N = new.Nnodes*new.ndofs_per_node
+        new.edofs = element_dofs(new.IEN, new.ndofs_per_node)
+        new._keys = None
+
+        # re-key the surviving entries for the grown N (row-major order is unchanged)
+        rows = np.repeat(np.arange(self.N, dtype=np.int64), np.diff(self.indptr))
+        alive = counts > 0
+        old_keys = rows[alive]*new.N + self.indices[alive]
+        add_keys = _block_keys(new.edofs[keep.sum():], new.N)
+        add = np.unique(add_keys)
+        pos = np.searchsorted(old_keys, add)
+        if old_keys.size:
+            found = old_keys[np.minimum(pos, old_keys.size - 1)] == add
+        else:
+            found = np.zeros(add.size, dtype=bool)
+        add, pos = add[~found], pos[~found]
+        ukeys = np.insert(old_keys, pos, add)
+
+        remap = np.full(self.nnz, -1, dtype=np.int64)
+        remap[alive] = np.searchsorted(ukeys, old_keys)
+        perm_new = np.searchsorted(ukeys, add_keys)
+        idx = _index_dtype(max(new.N, ukeys.size))
+        new.perm = np.concatenate([remap[perm[keep]].ravel(), perm_new]).astype(idx)
+        new.indices = (ukeys % new.N).astype(idx)
+        counts = np.bincount(ukeys // new.N, minlength=new.N)
+        new.indptr = np.concatenate(([0], np.cumsum(counts))).astype(idx)
+        new.nnz = ukeys.size
+        return new
+
+    @property
+    def shape(self):
+        return (self.N, self.N)
+
+    @instrument('dofmap.DofMap.fill')
+    def fill(self, Ks):
+        """
+        Sum element matrices (nelems, nd, nd) into CSR data (nnz,). Without perm
+        (block_size / from_pattern(perm=None)) entries are scattered per element block.
+        """
+        if self.perm is None:
+            nelems, nd = self.edofs.shape
+            Ks = np.asarray(Ks, dtype=float).reshape(nelems, nd, nd)
+            data = np.zeros(self.nnz)
+            for s in range(0, nelems, BLOCK_SIZE):
+                self.scatter_add(data, self.edofs[s:s+BLOCK_SIZE], Ks[s:s+BLOCK_SIZE])
+            return data
+        return np.bincount(self.perm, weights=np.asarray(Ks, dtype=float).ravel(),
+                           minlength=self.nnz)
+
+    def assemble(self, Ks):
+        """Element matrices -> CSR global matrix sharing this map's pattern."""
+        K = sp.csr_matrix((self.fill(Ks), self.indices, self.indptr), shape=self.shape)
+        K.has_sorted_indices = True
+        return K
+
+    @instrument('dofmap.DofMap.assemble_vector')
+    def assemble_vector(self, Fs):
+        """Element vectors (nelems, nd) -> global vector (N,)."""
+        Fs = np.asarray(Fs, dtype=float).reshape(self.edofs.shape)
+        return np.bincount(self.edofs.ravel(), weights=Fs.ravel(), minlength=self.N)
+
+    @property
+    def keys(self):
+        """Sorted CSR keys row*N + col of the pattern (nnz,), built on first use."""
+        if self._keys is None:
+            rows = np.repeat(np.arange(self.N, dtype=np.int64), np.diff(self.indptr))
+            self._keys = rows*self.N + self.indices
+        return self._keys
+
+    def positions(self, edofs_block):
+        """CSR data positions of the element entries of an (nb, nd) edofs block."""
+        return np.searchsorted(self.keys, _block_keys(np.asarray(edofs_block), self.N))
+
+    def scatter_add(self, data, edofs_block, Ks_block):
+        """data (nnz,) += element matrices of one block; temporaries are O(block)."""
+        pos, inv = np.unique(self.positions(edofs_block), return_inverse=True)
+        data[pos] += np.bincount(inv.ravel(), weights=np.asarray(Ks_block, dtype=float).ravel())
+        return data
+
+    def gather(self, u):
+        """Global vector (N,) -> element vectors (nelems, nd)."""
+        return np.asarray(u)[self.edofs]
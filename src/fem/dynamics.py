@@ -0,0 +1,186 @@
+"""
+Structural dynamics  M d2u/dt2 + K u = F(t)  (plane Q4/T3/T6/Q8/Q9).
+
+ModalSolver: lowest modes K phi = omega^2 M phi by shift-invert Lanczos (scipy eigsh).
+(K - sigma M) is factored once and reused for every eigsh call, so asking for more
+modes, or restarting with a new v0, costs only triangular solves.
+
+CentralDifference: explicit leapfrog with a lumped (diagonal) mass vector,
+    u_{n+1} = u_n + dt v_{n+1/2},  a_{n+1} = M^-1 (F_{n+1} - f_int(u_{n+1})),
+    v_{n+3/2} = v_{n+1/2} + dt a_{n+1}.
+f_int is evaluated element by element (matfree.MatrixFreeOperator.apply), so K is never
+assembled and each step costs O(nelem). Stable for dt < 2/omega_max (stable_time_step).
+"""
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from .dofmap import element_dofs
+from .elements import (M_structural_Q4_batch, M_structural_T3_batch, M_structural_T6_batch,
+                       M_structural_Q8_batch, M_structural_Q9_batch)
+from .solvers import Factorization, array_key, matrix_nbytes
+from .profiling import instrument
+
+_MASS_KERNELS = {'Q4': M_structural_Q4_batch, 'T3': M_structural_T3_batch,
+                 'T6': M_structural_T6_batch, 'Q8': M_structural_Q8_batch, 'Q9': M_structural_Q9_batch}
+
+@instrument('dynamics.lumped_mass')
+def lumped_mass(xy, IEN, rho=1.0, t=1.0, etype='Q4'):
+    """Lumped mass vector (2*Nnodes,) (row-sum, HRZ for quadratic elements); rho, t scalar or (nelem,)."""
+    if etype not in _MASS_KERNELS:
+        raise ValueError(f"No mass kernel for element type {etype!r}")
+    xy = np.asarray(xy, dtype=float)
+    IEN = np.asarray(IEN)
+    Me = _MASS_KERNELS[etype](xy[IEN], rho, t, lumped=True)
+    me = np.diagonal(Me, axis1=1, axis2=2)
+    return np.bincount(element_dofs(IEN, 2).ravel(), weights=me.ravel(), minlength=2*xy.shape[0])
+
+class ModalSolver:
+    """
+    Shift-invert eigen-solver for the lowest modes of (K, M).
+    K, M:   (N, N) sparse stiffness and (consistent or lumped) mass
+    sigma:  shift; eigenvalues nearest sigma are found first. Use sigma < 0 for an
+            unconstrained (singular) K so that the rigid-body modes come out as ~0.
+    bc:     optional bc.Dirichlet; fixed DOFs are removed and returned as zeros
+    method: factorization of K_ff - sigma M_ff ('splu', 'cholesky', 'dense')
+    cache:  optional solvers.FactorCache shared between solvers, as in SolverSession;
+            key defaults to a hash of the reduced (K, M) and sigma
+    """
+    @instrument('dynamics.ModalSolver.__init__')
+    def __init__(self, K, M, sigma=0.0, bc=None, method='splu', cache=None, key=None):
+        K = sp.csr_matrix(K)
+        M = sp.csr_matrix(M)
+        self.bc = bc
+        self.sigma = float(sigma)
+        if bc is not None:
+            K = K[bc.free][:, bc.free]
+            M = M[bc.free][:, bc.free]
+        self.K = K.tocsr()
+        self.M = M.tocsr()
+        if cache is not None and key is None:
+            key = array_key(self.K, self.M, np.array(self.sigma))
+        self.key = key
+        fact = cache.get(key) if cache is not None else None
+        if fact is None:
+            fact = Factorization((self.K - self.sigma*self.M).tocsc(), method)
+            if cache is not None:
+                cache.put(key, fact, fact.nbytes + matrix_nbytes(self.M))
+        self.factorization = fact
+        n = self.K.shape[0]
+        self._OPinv = spla.LinearOperator((n, n), matvec=fact.solve, dtype=float)
+
+    @instrument('dynamics.ModalSolver.solve')
+    def solve(self, k=6, tol=0.0, v0=None, maxiter=None):
+        """
+        Lowest k modes. Returns omega (k,) angular frequencies [rad/s], ascending, and
+        Phi (N, k) mass-normalized mode shapes (Phi^T M Phi = I), zero on fixed DOFs.
+        """
+        lam, V = spla.eigsh(self.K, k=k, M=self.M, sigma=self.sigma, which='LM',
+                            OPinv=self._OPinv, tol=tol, v0=v0, maxiter=maxiter)
+        idx = np.argsort(lam)
+        lam, V = lam[idx], V[:, idx]
+        if self.bc is not None:
+            V = self.bc.expand(V)
+        return np.sqrt(np.clip(lam, 0.0, None)), V
+
+def modes(K, M, k=6, sigma=0.0, bc=None, method='splu'):
+    """One-shot ModalSolver(K, M, sigma, bc, method).solve(k) -> (omega, Phi)."""
+    return ModalSolver(K, M, sigma, bc, method).solve(k)
+
+def _internal_force(op):
+    return op.apply if hasattr(op, 'apply') else (lambda u: op @ u)
+
+@instrument('dynamics.stable_time_step')
+def stable_time_step(op, m, bc=None, iters=50, seed=0):
+    """
+    Critical central-difference step 2/omega_max of (K, diag(m)), omega_max from power
+    iteration on M^-1 K. The Rayleigh quotient approaches omega_max^2 from below, so the
+    returned value is an upper estimate: run with a safety factor (e.g. 0.9*dt_crit).
+    op: internal-force operator (MatrixFreeOperator, or anything supporting op @ u).
+    """
+    f_int = _internal_force(op)
+    m = np.asarray(m, dtype=float)
+    mask = np.ones(m.size, dtype=bool)
+    if bc is not None:
+        mask[bc.fixed] = False
+    x = np.where(mask, np.random.default_rng(seed).standard_normal(m.size), 0.0)
+    lam = 0.0
+    for _ in range(iters):
+        x /= np.sqrt(x @ (m*x))
+        Kx = np.where(mask, f_int(x), 0.0)
+        lam = x @ Kx
+        x = Kx/m
+    return 2.0/np.sqrt(lam)
+
+class CentralDifference:
+    """
+    Explicit central-difference integrator with lumped mass.
+    op: internal-force operator K u, evaluated matrix-free; build it without fixed_dofs,
+        e.g. MatrixFreeOperator(xy, IEN, D, t=t), or pass any object supporting op @ u.
+    m:  (N,) lumped mass vector (lumped_mass); dt: time step (see stable_time_step).
+    bc: optional bc.Dirichlet; prescribed displacements are passed to run().
+    """
+    def __init__(self, op, m, dt, bc=None):
+        self.op = op
+        self.m = np.asarray(m, dtype=float)
+        self.dt = float(dt)
+        self.bc = bc
+        self._f_int = _internal_force(op)
+        self._minv = 1.0/self.m
+        if bc is not None:
+            self._minv[bc.fixed] = 0.0
+
+    def _load(self, F, t):
+        return np.asarray(F(t) if callable(F) else F, dtype=float)
+
+    def _values(self, values, t):
+        return values(t) if callable(values) else values
+
+    def acceleration(self, u, f):
+        """M^-1 (f - K u), zero on fixed DOFs."""
+        return self._minv*(f - self._f_int(u))
+
+    @instrument('dynamics.CentralDifference.run')
+    def run(self, u0, nsteps, v0=0.0, F=0.0, values=0.0, t0=0.0, stride=1, store=None,
+            name='u', callback=None):
+        """
+        March nsteps from (u0, v0) at t0.
+        F: load (N,) or callable F(t) -> (N,); values: prescribed displacements or callable of t.
+        Output every `stride` steps as in transient.ThetaMethod.run: rows of `name` in
+        store (times in `name + '_t'`) and/or callback(step, t, u, v).
+        Returns (u_final (N,), v_final (N,), times (nout,)).
+        """
+        N = self.m.size
+        dt = self.dt
+        out_steps = list(range(0, nsteps + 1, stride))
+        if out_steps[-1] != nsteps:
+            out_steps.append(nsteps)
+        times = t0 + dt*np.asarray(out_steps, dtype=float)
+        hist = store.create(name, (len(out_steps), N)) if store is not None else None
+
+        u = np.array(u0, dtype=float).reshape(N)
+        v = np.array(np.broadcast_to(np.asarray(v0, dtype=float), (N,)))
+        if self.bc is not None:
+            u[self.bc.fixed] = self.bc.prescribed(self._values(values, t0))
+        a = self.acceleration(u, np.broadcast_to(self._load(F, t0), (N,)))
+        v_half = v + 0.5*dt*a
+        k = 0
+        for n in range(nsteps + 1):
+            if n > 0:
+                t = t0 + n*dt
+                u += dt*v_half
+                if self.bc is not None:
+                    u[self.bc.fixed] = self.bc.prescribed(self._values(values, t))
+                a = self.acceleration(u, np.broadcast_to(self._load(F, t), (N,)))
+                v = v_half + 0.5*dt*a
+                v_half = v_half + dt*a
+            if n == out_steps[k]:
+                if hist is not None:
+                    hist[k] = u
+                if callback is not None:
+                    callback(n, times[k], u, v)
+                k += 1
+        if hist is not None:
+            hist.flush()
+            del hist
+            store.save(name + '_t', times)
+        return u, v, times
@@ -1,8 +1,13 @@
+import inspect
 import numpy as np
-from .shapes import shape_Q4, shape_T3
-from .jacobian import jacobian_2D
-from .quadrature import gauss_quad_2x2, triangle_area_rule
+from collections import OrderedDict
+from functools import lru_cache
+from .shapes import shape_Q4, shape_T3, shape_T6, shape_Q8, shape_Q9, shape_L2, shape_L3
+from .jacobian import jacobian_2D, jacobian_2D_batch
+from .quadrature import Rule, gauss_legendre_1D, gauss_quad, gauss_quad_2x2, triangle_area_rule, _RULE_CACHES
+from .profiling import instrument
 
+@instrument('elements.K_structural_Q4')
 def K_structural_Q4(xy_e, D, t=1.0):
     """
     Plane stress/strain Q4, 2x2 Gauss.
@@ -24,6 +29,7 @@ def K_structural_Q4(xy_e, D, t=1.0):
         K += (B.T @ D @ B) * detJ * t * w
     return K
 
+@instrument('elements.K_structural_T3')
 def K_structural_T3(xy_e, D, t=1.0, order=1):
     K = np.zeros((6,6))
     pts, wts = triangle_area_rule(order=order)
@@ -41,6 +47,7 @@ def K_structural_T3(xy_e, D, t=1.0, order=1):
         K += (B.T @ D @ B) * detJ * t * w
     return K
 
+@instrument('elements.K_conduction_Q4')
 def K_conduction_Q4(xy_e, k):
     K = np.zeros((4,4))
     pts, wts = gauss_quad_2x2()
@@ -53,6 +60,7 @@ def K_conduction_Q4(xy_e, k):
         K += (gradN.T @ (k* np.eye(2)) @ gradN) * detJ * w
     return K
 
+@instrument('elements.K_conduction_T3')
 def K_conduction_T3(xy_e, k, order=1):
     K = np.zeros((3,3))
     pts, wts = triangle_area_rule(order=order)
@@ -76,3 +84,453 @@ def K_bar_2node(x1, x2, E, A):
     k = (E*A)/L
     return k * np.array([[1.0, -1.0], [-1.0, 1.0]])
 
+# ---------------------------------------------------------------------------
+# Batched kernels: xy_el = xy[IEN] with shape (nelem, nen, 2) -> (nelem, nd, nd)
+# ---------------------------------------------------------------------------
+
+_SHAPES = {'Q4': shape_Q4, 'T3': shape_T3, 'T6': shape_T6, 'Q8': shape_Q8, 'Q9': shape_Q9}
+_QUADS = ('Q4', 'Q8', 'Q9')
+_DEFAULT_ORDER = {'Q4': 2, 'Q8': 3, 'Q9': 3, 'T3': 1, 'T6': 3}
+_CENTROID = {e: ([[0.0, 0.0]], [4.0]) if e in _QUADS else ([[1/3, 1/3]], [0.5]) for e in _SHAPES}
+
+@lru_cache(maxsize=None)
+def parent_tables(etype, order=None):
+    """
+    Shape-function tables at the quadrature points of (etype, order), built once.
+    Q4/Q8/Q9 use order x order Gauss (default 2x2 for Q4, 3x3 for Q8/Q9); T3 uses
+    triangle_area_rule(order) (default 1), T6 uses triangle_area_rule(order) (default 3,
+    exact for straight-sided stiffness); order='centroid' gives
+    the one-point centroid rule and a quadrature.Rule (e.g. Rule('dunavant', 4)) any
+    registered rule, for every element type.
+    Returns N (nqp,nen), dN_dxi (nqp,nen), dN_deta (nqp,nen), wts (nqp,), read-only.
+    """
+    if etype not in _SHAPES:
+        raise ValueError(f"Unknown element type {etype!r}")
+    if order == 'centroid':
+        pts, wts = (np.array(a) for a in _CENTROID[etype])
+    elif isinstance(order, Rule):
+        pts, wts = order
+    elif etype in _QUADS:
+        pts, wts = gauss_quad(_DEFAULT_ORDER[etype] if order is None else order)
+    else:
+        pts, wts = triangle_area_rule(order=_DEFAULT_ORDER[etype] if order is None else order)
+    N, dN_dxi, dN_deta = (np.array(a) for a in zip(*(_SHAPES[etype](xi, eta) for xi, eta in pts)))
+    tables = (N, dN_dxi, dN_deta, np.array(wts, dtype=float))
+    for a in tables:
+        a.flags.writeable = False
+    return tables
+
+def shape_batch(etype, xi, eta):
+    """N, dN_dxi, dN_deta (npts,nen) at arbitrary parent points xi, eta (npts,)."""
+    xi = np.atleast_1d(np.asarray(xi, dtype=float))
+    eta = np.atleast_1d(np.asarray(eta, dtype=float))
+    out = _SHAPES[etype](xi, eta)
+    nen = np.shape(out[0])[-1] if etype in ('Q8', 'Q9') else len(out[0])
+    # Q8/Q9 broadcast points on leading axes, Q4/T3/T6 stack nodes first
+    return tuple(np.broadcast_to(a if etype in ('Q8', 'Q9') else np.asarray(a).T, (xi.size, nen))
+                 for a in out)
+
+_RULE_CACHES.append(parent_tables)
+
+def gradients_batch(xy_el, etype, order=None):
+    """
+    Physical shape-function gradients at every quadrature point of every element.
+    Returns dN_dx (nelem,nqp,2,nen) with [...,0,:]=dN/dx, [...,1,:]=dN/dy,
+    and wdetJ (nelem,nqp) = detJ * quadrature weight.
+    """
+    xy_el = np.asarray(xy_el, dtype=float)
+    _, dN_dxi, dN_deta, wts = parent_tables(etype, order)
+    _, detJ, invJ = jacobian_2D_batch(xy_el, dN_dxi, dN_deta)
+    dN_dx = invJ[..., :, :1]*dN_dxi[:, None, :] + invJ[..., :, 1:]*dN_deta[:, None, :]
+    return dN_dx, detJ*wts
+
+def B_structural_batch(dN_dx):
+    """(nelem,nqp,2,nen) gradients -> (nelem,nqp,3,2*nen) strain-displacement B."""
+    dNx, dNy = dN_dx[..., 0, :], dN_dx[..., 1, :]
+    B = np.zeros(dN_dx.shape[:-2] + (3, 2*dN_dx.shape[-1]))
+    B[..., 0, 0::2] = dNx
+    B[..., 1, 1::2] = dNy
+    B[..., 2, 0::2] = dNy
+    B[..., 2, 1::2] = dNx
+    return B
+
+def _per_element(c, nelem):
+    """Scalar or (nelem,) coefficient -> broadcastable against (nelem, nd, nd)."""
+    c = np.asarray(c, dtype=float)
+    return c if c.ndim == 0 else c.reshape(nelem, 1, 1)
+
+def _K_structural_batch(xy_el, D, t, etype, order=None):
+    dN_dx, wdet = gradients_batch(xy_el, etype, order)
+    B = B_structural_batch(dN_dx)
+    D = np.asarray(D, dtype=float)
+    DB = np.matmul(D[:, None] if D.ndim == 3 else D, B)   # D: (3,3) or (nelem,3,3)
+    K = np.einsum('eqki,eqkj,eq->eij', B, DB, wdet, optimize=True)
+    return K * _per_element(t, K.shape[0])
+
+def _K_conduction_batch(xy_el, k, etype, order=None):
+    dN_dx, wdet = gradients_batch(xy_el, etype, order)
+    K = np.einsum('eqia,eqib,eq->eab', dN_dx, dN_dx, wdet, optimize=True)
+    return K * _per_element(k, K.shape[0])
+
+@instrument('elements.K_structural_Q4_batch')
+def K_structural_Q4_batch(xy_el, D, t=1.0):
+    """Batched K_structural_Q4. xy_el: (nelem,4,2); D (3,3) or (nelem,3,3); t scalar or (nelem,)."""
+    return _K_structural_batch(xy_el, D, t, 'Q4')
+
+@instrument('elements.K_structural_T3_batch')
+def K_structural_T3_batch(xy_el, D, t=1.0, order=1):
+    """Batched K_structural_T3. xy_el: (nelem,3,2)."""
+    return _K_structural_batch(xy_el, D, t, 'T3', order)
+
+@instrument('elements.K_conduction_Q4_batch')
+def K_conduction_Q4_batch(xy_el, k):
+    """Batched K_conduction_Q4. xy_el: (nelem,4,2); k scalar or (nelem,)."""
+    return _K_conduction_batch(xy_el, k, 'Q4')
+
+@instrument('elements.K_conduction_T3_batch')
+def K_conduction_T3_batch(xy_el, k, order=1):
+    """Batched K_conduction_T3. xy_el: (nelem,3,2)."""
+    return _K_conduction_batch(xy_el, k, 'T3', order)
+
+def _mass_batch(xy_el, rho, etype, order=None, lumped=False):
+    """
+    Scalar mass-type matrices int rho N^T N dA (nelem,nen,nen). lumped: row-sum diagonal
+    for T3/Q4; HRZ (diagonal scaled to the element total) for T6/Q8/Q9, whose row sums
+    vanish or go negative at the corners.
+    """
+    N = parent_tables(etype, order)[0]
+    _, wdet = gradients_batch(xy_el, etype, order)
+    M = np.einsum('qa,qb,eq->eab', N, N, wdet, optimize=True)
+    M = M * _per_element(rho, M.shape[0])
+    if lumped:
+        if etype in ('T3', 'Q4'):
+            d = M.sum(axis=2)
+        else:
+            d = np.diagonal(M, axis1=1, axis2=2)
+            d = d * (M.sum(axis=(1, 2))/d.sum(axis=1))[:, None]
+        M = d[:, :, None] * np.eye(M.shape[1])
+    return M
+
+@instrument('elements.C_conduction_Q4_batch')
+def C_conduction_Q4_batch(xy_el, rho_c=1.0, lumped=False):
+    """
+    Capacitance int rho*c N^T N dA for Q4 (2x2 Gauss, exact on parallelograms).
+    rho_c: scalar or (nelem,); lumped=True: row-sum diagonal. Returns (nelem,4,4).
+    """
+    return _mass_batch(xy_el, rho_c, 'Q4', None, lumped)
+
+@instrument('elements.C_conduction_T3_batch')
+def C_conduction_T3_batch(xy_el, rho_c=1.0, lumped=False, order=3):
+    """Capacitance for T3 (3-point rule, exact); lumped: row-sum (= area/3). Returns (nelem,3,3)."""
+    return _mass_batch(xy_el, rho_c, 'T3', order, lumped)
+
+def _vector_mass(M):
+    """Scalar (nelem,nen,nen) -> interleaved 2-DOF (nelem,2nen,2nen): M_ab * I_2."""
+    ne, nen, _ = M.shape
+    return (M[:, :, None, :, None]*np.eye(2)[None, None, :, None, :]).reshape(ne, 2*nen, 2*nen)
+
+@instrument('elements.M_structural_Q4_batch')
+def M_structural_Q4_batch(xy_el, rho=1.0, t=1.0, lumped=False):
+    """
+    Plane Q4 mass int rho*t N^T N dA on the (u_x, u_y) DOFs (2x2 Gauss).
+    rho, t: scalar or (nelem,); lumped=True: row-sum diagonal. Returns (nelem,8,8).
+    """
+    rho_t = np.asarray(rho, dtype=float)*np.asarray(t, dtype=float)
+    return _vector_mass(_mass_batch(xy_el, rho_t, 'Q4', None, lumped))
+
+@instrument('elements.M_structural_T3_batch')
+def M_structural_T3_batch(xy_el, rho=1.0, t=1.0, lumped=False, order=3):
+    """Plane T3 mass (3-point rule, exact); lumped: row-sum (= m_e/3 per node). Returns (nelem,6,6)."""
+    rho_t = np.asarray(rho, dtype=float)*np.asarray(t, dtype=float)
+    return _vector_mass(_mass_batch(xy_el, rho_t, 'T3', order, lumped))
+
+# Quadratic elements (T6, Q8, Q9): same kernels, higher-order tables. Straight-sided T6
+# stiffness is exact with the 3-point rule; T6 mass needs degree 4 (6-point Dunavant).
+_T6_MASS_RULE = Rule('dunavant', 4)
+
+@instrument('elements.K_structural_T6_batch')
+def K_structural_T6_batch(xy_el, D, t=1.0, order=3):
+    """Batched plane T6 stiffness. xy_el: (nelem,6,2) -> (nelem,12,12)."""
+    return _K_structural_batch(xy_el, D, t, 'T6', order)
+
+@instrument('elements.K_structural_Q8_batch')
+def K_structural_Q8_batch(xy_el, D, t=1.0, order=None):
+    """Batched plane Q8 stiffness (3x3 Gauss; order=2 for reduced integration) -> (nelem,16,16)."""
+    return _K_structural_batch(xy_el, D, t, 'Q8', order)
+
+@instrument('elements.K_structural_Q9_batch')
+def K_structural_Q9_batch(xy_el, D, t=1.0, order=None):
+    """Batched plane Q9 stiffness (3x3 Gauss) -> (nelem,18,18)."""
+    return _K_structural_batch(xy_el, D, t, 'Q9', order)
+
+@instrument('elements.K_conduction_T6_batch')
+def K_conduction_T6_batch(xy_el, k, order=3):
+    """Batched T6 conduction. xy_el: (nelem,6,2); k scalar or (nelem,)."""
+    return _K_conduction_batch(xy_el, k, 'T6', order)
+
+@instrument('elements.K_conduction_Q8_batch')
+def K_conduction_Q8_batch(xy_el, k, order=None):
+    """Batched Q8 conduction (3x3 Gauss)."""
+    return _K_conduction_batch(xy_el, k, 'Q8', order)
+
+@instrument('elements.K_conduction_Q9_batch')
+def K_conduction_Q9_batch(xy_el, k, order=None):
+    """Batched Q9 conduction (3x3 Gauss)."""
+    return _K_conduction_batch(xy_el, k, 'Q9', order)
+
+@instrument('elements.M_structural_T6_batch')
+def M_structural_T6_batch(xy_el, rho=1.0, t=1.0, lumped=False, order=_T6_MASS_RULE):
+    """Plane T6 mass (6-point rule, exact); lumped: HRZ. Returns (nelem,12,12)."""
+    rho_t = np.asarray(rho, dtype=float)*np.asarray(t, dtype=float)
+    return _vector_mass(_mass_batch(xy_el, rho_t, 'T6', order, lumped))
+
+@instrument('elements.M_structural_Q8_batch')
+def M_structural_Q8_batch(xy_el, rho=1.0, t=1.0, lumped=False, order=None):
+    """Plane Q8 mass (3x3 Gauss); lumped: HRZ. Returns (nelem,16,16)."""
+    rho_t = np.asarray(rho, dtype=float)*np.asarray(t, dtype=float)
+    return _vector_mass(_mass_batch(xy_el, rho_t, 'Q8', order, lumped))
+
+@instrument('elements.M_structural_Q9_batch')
+def M_structural_Q9_batch(xy_el, rho=1.0, t=1.0, lumped=False, order=None):
+    """Plane Q9 mass (3x3 Gauss); lumped: HRZ. Returns (nelem,18,18)."""
+    rho_t = np.asarray(rho, dtype=float)*np.asarray(t, dtype=float)
+    return _vector_mass(_mass_batch(xy_el, rho_t, 'Q9', order, lumped))
+
+@instrument('elements.C_conduction_T6_batch')
+def C_conduction_T6_batch(xy_el, rho_c=1.0, lumped=False, order=_T6_MASS_RULE):
+    """Capacitance for T6 (6-point rule, exact); lumped: HRZ. Returns (nelem,6,6)."""
+    return _mass_batch(xy_el, rho_c, 'T6', order, lumped)
+
+@instrument('elements.C_conduction_Q8_batch')
+def C_conduction_Q8_batch(xy_el, rho_c=1.0, lumped=False, order=None):
+    """Capacitance for Q8 (3x3 Gauss); lumped: HRZ. Returns (nelem,8,8)."""
+    return _mass_batch(xy_el, rho_c, 'Q8', order, lumped)
+
+@instrument('elements.C_conduction_Q9_batch')
+def C_conduction_Q9_batch(xy_el, rho_c=1.0, lumped=False, order=None):
+    """Capacitance for Q9 (3x3 Gauss); lumped: HRZ. Returns (nelem,9,9)."""
+    return _mass_batch(xy_el, rho_c, 'Q9', order, lumped)
+
+# ---------------------------------------------------------------------------
+# Consistent element load vectors (any element type)
+# ---------------------------------------------------------------------------
+
+def _load_values(q, x, ncomp):
+    """
+    Load data -> (nitem|1, nqp|1, ncomp, nrhs) and whether a load-case axis was given.
+    q: constant (ncomp,), per item (nitem, ncomp), per item and load case
+       (nitem, ncomp, nrhs) -- for ncomp=1: scalar, (nitem,), (nitem, nrhs) -- or a
+       callable of the quadrature-point coordinates x (nitem,nqp,2) returning
+       (nitem, nqp, ncomp[, nrhs]) ((nitem, nqp[, nrhs]) for ncomp=1).
+    """
+    if callable(q):
+        q = np.asarray(q(x), dtype=float)
+        q = q[:, :, None] if ncomp == 1 else q
+        multi = q.ndim == 4
+    else:
+        q = np.asarray(q, dtype=float)
+        if ncomp == 1:
+            q = q[..., None] if q.ndim < 2 else q[:, None, :]
+        multi = q.ndim == 3
+        q = (q[None] if q.ndim == 1 else q)[:, None]
+    return (q if multi else q[..., None]), multi
+
+def _integrate_load(N, wdet, q, multi):
+    """int N_a q over items: N (nqp,nen), wdet (nitem,nqp) -> (nitem, nen*ncomp[, nrhs])."""
+    q = np.broadcast_to(q, wdet.shape + q.shape[2:])
+    F = np.einsum('qa,eq,eqcr->eacr', N, wdet, q, optimize=True)
+    F = F.reshape(F.shape[0], -1, F.shape[-1])
+    return F if multi else F[..., 0]
+
+def _scale(F, t):
+    t = np.asarray(t, dtype=float)
+    return F * (t if t.ndim == 0 else t.reshape((-1,) + (1,)*(F.ndim - 1)))
+
+def _load_batch(xy_el, q, etype, ncomp, order=None):
+    N = parent_tables(etype, order)[0]
+    _, wdet = gradients_batch(xy_el, etype, order)
+    x = np.einsum('qa,eai->eqi', N, xy_el) if callable(q) else None
+    return _integrate_load(N, wdet, *_load_values(q, x, ncomp))
+
+@instrument('elements.F_body_batch')
+def F_body_batch(xy_el, b, etype, t=1.0, order=None):
+    """
+    Consistent body-force vectors int N^T b t dA, interleaved (f_x, f_y) per node.
+    b: (2,), (nelem,2), (nelem,2,nrhs) force per unit volume, or b(x) at the quadrature
+    points (see _load_values); t scalar or (nelem,). Returns (nelem,2*nen[,nrhs]).
+    """
+    return _scale(_load_batch(xy_el, b, etype, 2, order), t)
+
+@instrument('elements.F_source_batch')
+def F_source_batch(xy_el, s, etype, order=None):
+    """
+    Consistent heat-source vectors int N^T s dA; s scalar, (nelem,), (nelem,nrhs) or s(x).
+    Returns (nelem,nen[,nrhs]).
+    """
+    return _load_batch(xy_el, s, etype, 1, order)
+
+# ---------------------------------------------------------------------------
+# Boundary edges: xy_edge = xy[edges] with shape (nedges, 2|3, 2), nodes (end, end[, mid])
+# ---------------------------------------------------------------------------
+
+_EDGE_SHAPES = {2: shape_L2, 3: shape_L3}
+
+@lru_cache(maxsize=None)
+def edge_tables(nen, order=None):
+    """
+    1D tables of 2-node / 3-node edges at order-point Gauss-Legendre (default nen points).
+    Returns N (nqp,nen), dN_dxi (nqp,nen), wts (nqp,), read-only.
+    """
+    if nen not in _EDGE_SHAPES:
+        raise ValueError(f"Edges have 2 or 3 nodes, got {nen}")
+    pts, wts = gauss_legendre_1D(nen if order is None else order)
+    N, dN_dxi = (np.array(a) for a in zip(*(_EDGE_SHAPES[nen](xi) for xi in pts)))
+    tables = (N, dN_dxi, np.array(wts, dtype=float))
+    for a in tables:
+        a.flags.writeable = False
+    return tables
+
+def _edge_geometry(xy_edge, order):
+    """N (nqp,nen), points x (nedges,nqp,2), tangents dx/dxi (nedges,nqp,2), wts (nqp,)."""
+    xy_edge = np.asarray(xy_edge, dtype=float)
+    N, dN_dxi, wts = edge_tables(xy_edge.shape[1], order)
+    return (N, np.einsum('qa,eai->eqi', N, xy_edge),
+            np.einsum('qa,eai->eqi', dN_dxi, xy_edge), wts)
+
+@instrument('elements.F_traction_edge_batch')
+def F_traction_edge_batch(xy_edge, traction, t=1.0, order=None):
+    """
+    Consistent edge-traction vectors int N^T tr t ds, interleaved (f_x, f_y) per edge node.
+    traction: (2,), (nedges,2), (nedges,2,nrhs) force per unit area, or tr(x) at the
+    quadrature points; t scalar or (nedges,). Returns (nedges,2*nen[,nrhs]).
+    """
+    N, x, tan, wts = _edge_geometry(xy_edge, order)
+    wdet = np.linalg.norm(tan, axis=-1)*wts
+    return _scale(_integrate_load(N, wdet, *_load_values(traction, x, 2)), t)
+
+@instrument('elements.F_pressure_edge_batch')
+def F_pressure_edge_batch(xy_edge, p, t=1.0, order=None):
+    """
+    Normal pressure p (traction -p n) on edges running counter-clockwise around the
+    domain, so n = (ty, -tx)/|t| points outwards. p: scalar, (nedges,), (nedges,nrhs)
+    or p(x). Returns (nedges,2*nen[,nrhs]).
+    """
+    N, x, tan, wts = _edge_geometry(xy_edge, order)
+    pv, multi = _load_values(p, x, 1)                           # (ne|1, nqp|1, 1, nrhs)
+    q = pv*np.stack([-tan[..., 1], tan[..., 0]], axis=-1)[..., None]
+    return _scale(_integrate_load(N, np.broadcast_to(wts, tan.shape[:2]), q, multi), t)
+
+@instrument('elements.F_flux_edge_batch')
+def F_flux_edge_batch(xy_edge, q, order=None):
+    """
+    Consistent boundary heat-flux vectors int N^T q ds with q = -q_vec . n the flux into
+    the body; q: scalar, (nedges,), (nedges,nrhs) or q(x). Returns (nedges,nen[,nrhs]).
+    """
+    N, x, tan, wts = _edge_geometry(xy_edge, order)
+    wdet = np.linalg.norm(tan, axis=-1)*wts
+    return _integrate_load(N, wdet, *_load_values(q, x, 1))
+
+# ---------------------------------------------------------------------------
+# Memoized element matrices for meshes with repeated cells
+# ---------------------------------------------------------------------------
+
+# ndim of the batch-shared form of the kernels' material parameters; one more axis
+# (leading nelem) is the per-element form, which cannot be memoized
+_SHARED_NDIM = {'D': 2, 't': 0, 'k': 0, 'rho': 0, 'rho_c': 0}
+
+def _material_key(params):
+    """
+    Hashable key of the kernel's material arguments {name: value}: numeric scalars /
+    shared arrays by value, other objects (e.g. order=Rule(...)) by themselves or
+    their repr. Per-element forms of D, t, k, rho, rho_c -> ValueError.
+    """
+    parts = []
+    for name in sorted(params, key=str):
+        a = params[name]
+        try:
+            v = np.asarray(a, dtype=float)
+        except (TypeError, ValueError):
+            try:
+                hash(a)
+                parts.append((name, 'obj', a))
+            except TypeError:
+                parts.append((name, 'repr', repr(a)))
+            continue
+        if v.ndim > _SHARED_NDIM.get(name, v.ndim):
+            raise ValueError(f"ElementCache needs material arguments shared by the batch, "
+                             f"got {name} of shape {v.shape}")
+        parts.append((name, v.shape, v.tobytes()))
+    return tuple(parts)
+
+class ElementCache:
+    """
+    LRU memoization of a batched kernel, e.g.
+        Kc = ElementCache(K_structural_Q4_batch)
+        Ks = Kc(xy[IEN], D, t)
+    Element geometry is canonicalized as the edge vectors x_a - x_0 quantized to `tol`
+    (absolute, coordinate units), so translated copies of a cell share one entry; the
+    material arguments (D, t, k, order, ...) are part of the key and must be shared by
+    the whole batch (per-element arrays raise ValueError). Each distinct geometry is computed once
+    in one batched kernel call; all other elements are hits.
+    hits / misses count elements served from the cache / computed.
+    """
+    def __init__(self, kernel, max_entries=4096, tol=1e-9):
+        self.kernel = kernel
+        try:
+            self._signature = inspect.signature(kernel)
+        except (TypeError, ValueError):
+            self._signature = None
+        self.max_entries = int(max_entries)
+        self.tol = float(tol)
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        n = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries),
+                'hit_rate': self.hits/n if n else 0.0}
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def _params(self, xy_el, args, kwargs):
+        """Material arguments by kernel parameter name (positional index if unknown)."""
+        if self._signature is not None:
+            bound = self._signature.bind(xy_el, *args, **kwargs)
+            params = dict(bound.arguments)
+            params.pop(next(iter(self._signature.parameters)))
+            return params
+        return {**{i: a for i, a in enumerate(args)}, **kwargs}
+
+    @instrument('elements.ElementCache')
+    def __call__(self, xy_el, *args, **kwargs):
+        xy_el = np.asarray(xy_el, dtype=float)
+        ne = xy_el.shape[0]
+        if ne == 0:
+            return self.kernel(xy_el, *args, **kwargs)
+        rel = np.round((xy_el[:, 1:] - xy_el[:, :1])/self.tol).astype(np.int64).reshape(ne, -1)
+        geoms, first, inv = np.unique(rel, axis=0, return_index=True, return_inverse=True)
+        mat = _material_key(self._params(xy_el, args, kwargs))
+
+        keys = [(mat, g.tobytes()) for g in geoms]
+        found = [self._entries.get(k) for k in keys]
+        miss = [i for i, K in enumerate(found) if K is None]
+        if miss:
+            Knew = self.kernel(xy_el[first[miss]], *args, **kwargs)
+            for i, K in zip(miss, Knew):
+                found[i] = K
+        for k, K in zip(keys, found):
+            self._entries[k] = K
+            self._entries.move_to_end(k)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        self.misses += len(miss)
+        self.hits += ne - len(miss)
+        return np.stack(found)[inv.ravel()]
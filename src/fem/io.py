@@ -0,0 +1,293 @@
+"""
+On-disk mesh / matrix / result storage and interchange formats.
+
+A store is a directory of .npy files plus manifest.json:
+
+    store/
+      manifest.json          format, version, arrays, sparse matrices, metadata
+      xy.npy  IEN.npy        mesh
+      dofmap/*.npy           DofMap scatter pattern (indptr, indices, perm)
+      K/{data,indices,indptr}.npy
+      results/u.npy          solution vectors / streamed time histories
+
+Every array is opened with np.load(mmap_mode='r') by default, so a 10M-node mesh is
+paged in block by block instead of read into RAM. read_msh / write_vtu connect the
+store to Gmsh pre-processing and ParaView post-processing.
+"""
+import base64
+import json
+import os
+import numpy as np
+import scipy.sparse as sp
+from .dofmap import DofMap
+
+FORMAT = 'fem-store'
+VERSION = 1
+
+class Store:
+    """
+    Directory store of named arrays, CSR matrices and metadata.
+    mode: 'r' read-only, 'a' read/write (created if missing), 'w' truncate manifest.
+    """
+    def __init__(self, path, mode='r'):
+        self.path = path
+        self.mode = mode
+        mpath = os.path.join(path, 'manifest.json')
+        if mode == 'r' or (mode == 'a' and os.path.exists(mpath)):
+            with open(mpath) as fh:
+                self.manifest = json.load(fh)
+            if self.manifest.get('format') != FORMAT:
+                raise ValueError(f"{path} is not a {FORMAT} directory")
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.manifest = {'format': FORMAT, 'version': VERSION,
+                             'arrays': {}, 'sparse': {}, 'meta': {}}
+            self._flush()
+
+    def _flush(self):
+        tmp = os.path.join(self.path, 'manifest.json.tmp')
+        with open(tmp, 'w') as fh:
+            json.dump(self.manifest, fh, indent=1)
+        os.replace(tmp, os.path.join(self.path, 'manifest.json'))
+
+    def _writable(self):
+        if self.mode == 'r':
+            raise ValueError("store opened read-only")
+
+    @property
+    def meta(self):
+        return self.manifest['meta']
+
+    def set_meta(self, **kv):
+        self._writable()
+        self.manifest['meta'].update(kv)
+        self._flush()
+
+    def __contains__(self, name):
+        return name in self.manifest['arrays'] or name in self.manifest['sparse']
+
+    # ---- dense arrays -----------------------------------------------------
+    def save(self, name, a):
+        """Write array `name` (may contain '/', e.g. 'results/u')."""
+        self._writable()
+        a = np.ascontiguousarray(a)
+        fname = name + '.npy'
+        os.makedirs(os.path.dirname(os.path.join(self.path, fname)), exist_ok=True)
+        np.save(os.path.join(self.path, fname), a)
+        self.manifest['arrays'][name] = {'file': fname, 'shape': list(a.shape), 'dtype': a.dtype.str}
+        self._flush()
+
+    def load(self, name, mmap=True):
+        """Array `name`, memory-mapped read-only unless mmap=False."""
+        entry = self.manifest['arrays'][name]
+        return np.load(os.path.join(self.path, entry['file']), mmap_mode='r' if mmap else None)
+
+    def create(self, name, shape, dtype=float):
+        """
+        Preallocate array `name` on disk and return a writable memmap, for streaming
+        results (e.g. one row per time step) without holding them in memory.
+        """
+        self._writable()
+        fname = name + '.npy'
+        os.makedirs(os.path.dirname(os.path.join(self.path, fname)), exist_ok=True)
+        mm = np.lib.format.open_memmap(os.path.join(self.path, fname), mode='w+',
+                                       dtype=dtype, shape=tuple(shape))
+        self.manifest['arrays'][name] = {'file': fname, 'shape': list(shape),
+                                         'dtype': np.dtype(dtype).str}
+        self._flush()
+        return mm
+
+    # ---- sparse matrices --------------------------------------------------
+    def save_sparse(self, name, K):
+        self._writable()
+        K = sp.csr_matrix(K)
+        for part in ('data', 'indices', 'indptr'):
+            self.save(f"{name}/{part}", getattr(K, part))
+        self.manifest['sparse'][name] = {'shape': list(K.shape), 'format': 'csr'}
+        self._flush()
+
+    def load_sparse(self, name, mmap=True):
+        shape = tuple(self.manifest['sparse'][name]['shape'])
+        parts = [self.load(f"{name}/{p}", mmap) for p in ('data', 'indices', 'indptr')]
+        return sp.csr_matrix(tuple(parts), shape=shape, copy=False)
+
+    # ---- mesh / DOF map / results -----------------------------------------
+    def save_mesh(self, xy, IEN, etype=None, **groups):
+        """xy (N,2), IEN (nelem,nen); groups: named node or edge sets, e.g. left=..."""
+        self.save('xy', np.asarray(xy, dtype=np.float64))
+        self.save('IEN', IEN)
+        for gname, g in groups.items():
+            self.save(f"groups/{gname}", g)
+        self.set_meta(etype=etype, nnodes=int(len(xy)), nelem=int(len(IEN)))
+
+    @property
+    def xy(self):
+        return self.load('xy')
+
+    @property
+    def IEN(self):
+        return self.load('IEN')
+
+    def group(self, name):
+        return self.load(f"groups/{name}")
+
+    def save_dofmap(self, dm, name='dofmap'):
+        """CSR pattern of dm; perm is skipped for a block-mode DofMap (perm None)."""
+        for part in ('indptr', 'indices'):
+            self.save(f"{name}/{part}", getattr(dm, part))
+        if dm.perm is not None:
+            self.save(f"{name}/perm", dm.perm)
+        else:
+            self.manifest['arrays'].pop(f"{name}/perm", None)
+        self.set_meta(**{name: {'ndofs_per_node': dm.ndofs_per_node, 'Nnodes': dm.Nnodes}})
+
+    def load_dofmap(self, name='dofmap', mmap=True):
+        info = self.meta[name]
+        parts = [self.load(f"{name}/{p}", mmap) for p in ('indptr', 'indices')]
+        perm = self.load(f"{name}/perm", mmap) if f"{name}/perm" in self.manifest['arrays'] else None
+        return DofMap.from_pattern(self.IEN, info['ndofs_per_node'], info['Nnodes'], *parts, perm)
+
+    def save_result(self, name, u):
+        self.save(f"results/{name}", u)
+
+    def result(self, name, mmap=True):
+        return self.load(f"results/{name}", mmap)
+
+    def element_blocks(self, block_size=65536):
+        """Yield (start, stop, IEN_block, xy_el_block) streaming over the stored mesh."""
+        xy, IEN = self.xy, self.IEN
+        for start in range(0, IEN.shape[0], block_size):
+            stop = min(start + block_size, IEN.shape[0])
+            ien = np.asarray(IEN[start:stop])
+            yield start, stop, ien, xy[ien]
+
+# ---------------------------------------------------------------------------
+# Gmsh .msh v4.1 (ASCII) reader
+# ---------------------------------------------------------------------------
+
+# gmsh element type -> (name, nodes, permutation to this package's node order)
+_GMSH_TYPES = {
+    1: ('L2', 2, None), 8: ('L3', 3, None),
+    2: ('T3', 3, None), 3: ('Q4', 4, None),
+    9: ('T6', 6, [0, 1, 2, 4, 5, 3]),       # gmsh mids 01,12,20 -> shape_T6 mids 12,20,01
+    16: ('Q8', 8, None), 10: ('Q9', 9, None),
+}
+
+def read_msh(path):
+    """
+    Read a Gmsh MSH 4.1 ASCII file.
+    Returns xy (N,2), cells {etype: IEN}, groups {physical name (or tag): {etype: IEN}}.
+    Node tags are renumbered to 0..N-1 in file order; 1D line elements (L2/L3) appear
+    in cells/groups as boundary edge connectivity.
+    """
+    with open(path) as fh:
+        lines = iter(fh.read().split('\n'))
+    names, entity_phys = {}, {}
+    tags, coords = [], []
+    cells, groups = {}, {}
+    for line in lines:
+        line = line.strip()
+        if line == '$MeshFormat':
+            version, ftype, _ = next(lines).split()
+            if version != '4.1' or ftype != '0':
+                raise ValueError(f"read_msh supports MSH 4.1 ASCII only, got version {version} "
+                                 f"file-type {ftype}")
+        elif line == '$PhysicalNames':
+            for _ in range(int(next(lines))):
+                dim, tag, name = next(lines).split(maxsplit=2)
+                names[(int(dim), int(tag))] = name.strip('"')
+        elif line == '$Entities':
+            counts = [int(c) for c in next(lines).split()]
+            for dim, n in enumerate(counts):
+                for _ in range(n):
+                    parts = next(lines).split()
+                    k = 4 if dim == 0 else 7
+                    nphys = int(parts[k])
+                    entity_phys[(dim, int(parts[0]))] = [int(p) for p in parts[k+1:k+1+nphys]]
+        elif line == '$Nodes':
+            nblocks = int(next(lines).split()[0])
+            for _ in range(nblocks):
+                _, _, parametric, n = (int(v) for v in next(lines).split())
+                tags.extend(int(next(lines)) for _ in range(n))
+                coords.extend([float(v) for v in next(lines).split()[:2]] for _ in range(n))
+        elif line == '$Elements':
+            nblocks = int(next(lines).split()[0])
+            for _ in range(nblocks):
+                dim, etag, gtype, n = (int(v) for v in next(lines).split())
+                rows = np.array([next(lines).split()[1:] for _ in range(n)], dtype=np.int64)
+                if gtype not in _GMSH_TYPES:
+                    continue
+                ename, _, perm = _GMSH_TYPES[gtype]
+                if perm is not None:
+                    rows = rows[:, perm]
+                cells.setdefault(ename, []).append(rows)
+                for ptag in entity_phys.get((dim, etag), []):
+                    key = names.get((dim, ptag), ptag)
+                    groups.setdefault(key, {}).setdefault(ename, []).append(rows)
+    tags = np.array(tags, dtype=np.int64)
+    lookup = np.full(tags.max() + 1, -1, dtype=np.int64)
+    lookup[tags] = np.arange(tags.size)
+    renum = lambda blocks: lookup[np.concatenate(blocks)].astype(np.int32)
+    xy = np.ascontiguousarray(coords, dtype=np.float64)
+    cells = {k: renum(v) for k, v in cells.items()}
+    groups = {g: {k: renum(v) for k, v in d.items()} for g, d in groups.items()}
+    return xy, cells, groups
+
+# ---------------------------------------------------------------------------
+# VTK XML unstructured grid (.vtu) writer
+# ---------------------------------------------------------------------------
+
+# etype -> (VTK cell type, permutation from this package's node order to VTK order)
+_VTK_TYPES = {
+    'T3': (5, None), 'Q4': (9, None),
+    'T6': (22, [0, 1, 2, 5, 3, 4]),         # shape_T6 mids 12,20,01 -> VTK mids 01,12,20
+    'Q8': (23, None), 'Q9': (28, None),
+}
+
+def _b64(a):
+    """Inline binary DataArray payload: base64 of (UInt64 byte count + raw data)."""
+    a = np.ascontiguousarray(a)
+    header = np.array([a.nbytes], dtype=np.uint64).tobytes()
+    return base64.b64encode(header + a.tobytes()).decode()
+
+def _vtk_array(name, a):
+    a = np.asarray(a)
+    ncomp = 1 if a.ndim == 1 else a.shape[1]
+    if ncomp == 2:     # VTK vectors are 3D
+        a = np.column_stack([a, np.zeros(len(a))])
+        ncomp = 3
+    vtype = {'f': 'Float64', 'i': 'Int64', 'u': 'UInt64'}[a.dtype.kind]
+    a = a.astype({'Float64': np.float64, 'Int64': np.int64, 'UInt64': np.uint64}[vtype])
+    return (f'<DataArray type="{vtype}" Name="{name}" NumberOfComponents="{ncomp}" '
+            f'format="binary">{_b64(a)}</DataArray>')
+
+def write_vtu(path, xy, IEN, etype, point_data=None, cell_data=None):
+    """
+    Write a single-cell-type mesh with nodal / element fields as binary VTK XML (.vtu).
+    point_data / cell_data: {name: (N,) or (N, k) arrays}; 2-component fields are
+    written as 3D vectors (e.g. displacement).
+    """
+    vtk_type, perm = _VTK_TYPES[etype]
+    IEN = np.asarray(IEN)
+    conn = IEN if perm is None else IEN[:, perm]
+    nelem, nen = conn.shape
+    pts = np.column_stack([np.asarray(xy, dtype=np.float64), np.zeros(len(xy))])
+    out = ['<?xml version="1.0"?>',
+           '<VTKFile type="UnstructuredGrid" version="1.0" byte_order="LittleEndian" header_type="UInt64">',
+           '<UnstructuredGrid>',
+           f'<Piece NumberOfPoints="{len(pts)}" NumberOfCells="{nelem}">',
+           '<Points>', _vtk_array('Points', pts), '</Points>',
+           '<Cells>',
+           _vtk_array('connectivity', conn.ravel().astype(np.int64)),
+           _vtk_array('offsets', nen*np.arange(1, nelem + 1, dtype=np.int64)),
+           f'<DataArray type="UInt8" Name="types" format="binary">'
+           f'{_b64(np.full(nelem, vtk_type, dtype=np.uint8))}</DataArray>',
+           '</Cells>']
+    for tag, data in (('PointData', point_data), ('CellData', cell_data)):
+        if data:
+            out.append(f'<{tag}>')
+            out.extend(_vtk_array(k, v) for k, v in data.items())
+            out.append(f'</{tag}>')
+    out += ['</Piece>', '</UnstructuredGrid>', '</VTKFile>']
+    with open(path, 'w') as fh:
+        fh.write('\n'.join(out))
@@ -16,3 +16,24 @@ def jacobian_2D(xy_e, dN_dxi, dN_deta):
         raise ValueError("Non-positive detJ (check element mapping / node order)")
     invJ = np.linalg.inv(J)
     return J, detJ, invJ
+
+def jacobian_2D_batch(xy_el, dN_dxi, dN_deta):
+    """
+    Batched jacobian_2D over elements and quadrature points.
+    xy_el: (nelem, nen, 2) nodal coordinates, i.e. xy[IEN]
+    dN_dxi, dN_deta: (nqp, nen) parent-derivative tables
+    Returns J (nelem,nqp,2,2), detJ (nelem,nqp), invJ (nelem,nqp,2,2);
+    the 2x2 inverse is closed form (adjugate / detJ).
+    """
+    J = np.empty(xy_el.shape[:1] + dN_dxi.shape[:1] + (2, 2))
+    J[..., 0, :] = np.einsum('qa,eai->eqi', dN_dxi,  xy_el)
+    J[..., 1, :] = np.einsum('qa,eai->eqi', dN_deta, xy_el)
+    detJ = J[..., 0, 0]*J[..., 1, 1] - J[..., 0, 1]*J[..., 1, 0]
+    if np.any(detJ <= 0):
+        raise ValueError("Non-positive detJ (check element mapping / node order)")
+    invJ = np.empty_like(J)
+    invJ[..., 0, 0] =  J[..., 1, 1] / detJ
+    invJ[..., 0, 1] = -J[..., 0, 1] / detJ
+    invJ[..., 1, 0] = -J[..., 1, 0] / detJ
+    invJ[..., 1, 1] =  J[..., 0, 0] / detJ
+    return J, detJ, invJ
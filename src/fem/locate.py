@@ -0,0 +1,188 @@
+"""
+Point location and field interpolation on solved meshes.
+
+GridIndex bins element bounding boxes on a uniform grid (about one element per
+cell) stored CSR-style, so the candidate elements of a query point are the contents
+of its cell. Candidates are checked with a batched inverse isoparametric map:
+closed form for T3, vectorized Newton iterations for Q4/T6/Q8/Q9. Queries are
+processed in chunks, so memory stays bounded for millions of points.
+
+    interp = Interpolator(xy, IEN, 'Q4')
+    T, gradT = interp.interpolate(T_nodal, points)          # (npts,), (npts, 2)
+    u, gradu = interp.interpolate(u, points)                 # (npts, 2), (npts, 2, 2)
+
+Points outside the mesh get element -1 and NaN values.
+"""
+from dataclasses import dataclass
+import numpy as np
+from .elements import shape_batch, _QUADS
+from .profiling import instrument, annotate
+
+CHUNK_SIZE = 1 << 18   # query points per batch
+
+class GridIndex:
+    """
+    Uniform grid over element bounding boxes.
+    cell_size: bin edge length (default sqrt(mesh bbox area / nelem)).
+    bin_ptr, bin_elems: CSR map bin -> elements whose bbox overlaps the bin.
+    """
+    @instrument('locate.GridIndex.__init__')
+    def __init__(self, xy_el, cell_size=None):
+        xy_el = np.asarray(xy_el, dtype=float)
+        self.lo, self.hi = xy_el.min(axis=1), xy_el.max(axis=1)       # (nelem, 2)
+        nelem = xy_el.shape[0]
+        self.origin = self.lo.min(axis=0)
+        extent = np.maximum(self.hi.max(axis=0) - self.origin, 1e-300)
+        h = np.sqrt(extent.prod()/nelem) if cell_size is None else float(cell_size)
+        h = h if h > 0 else extent.max()
+        self.h = h
+        self.shape = np.maximum(np.ceil(extent/h).astype(np.int64), 1)   # (nbx, nby)
+
+        i0, i1 = self._cell(self.lo), self._cell(self.hi)
+        w = i1 - i0 + 1
+        cnt = w[:, 0]*w[:, 1]
+        e = np.repeat(np.arange(nelem), cnt)
+        k = np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        bins = (i0[e, 1] + k // w[e, 0])*self.shape[0] + i0[e, 0] + k % w[e, 0]
+        order = np.argsort(bins, kind='stable')
+        self.bin_elems = e[order]
+        counts = np.bincount(bins, minlength=int(self.shape.prod()))
+        self.bin_ptr = np.concatenate(([0], np.cumsum(counts)))
+
+    def _cell(self, x):
+        return np.clip(np.floor((x - self.origin)/self.h).astype(np.int64), 0, self.shape - 1)
+
+    def candidates(self, points, tol=0.0):
+        """
+        (point index, element) pairs whose element bbox, padded by tol, contains the point;
+        pairs are grouped by point in input order.
+        """
+        points = np.asarray(points, dtype=float)
+        c = self._cell(points)
+        b = c[:, 1]*self.shape[0] + c[:, 0]
+        start = self.bin_ptr[b]
+        cnt = self.bin_ptr[b + 1] - start
+        p = np.repeat(np.arange(points.shape[0]), cnt)
+        k = np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+        e = self.bin_elems[np.repeat(start, cnt) + k]
+        x = points[p]
+        inside = np.all((x >= self.lo[e] - tol) & (x <= self.hi[e] + tol), axis=1)
+        return p[inside], e[inside]
+
+def inverse_map(xy_el, points, etype, maxiter=10, tol=1e-12):
+    """
+    Parent coordinates (npts, 2) of points (npts, 2) in elements xy_el (npts, nen, 2):
+    closed form for T3 (affine map), Newton iterations started at the element centre
+    otherwise. Also returns a converged mask.
+    """
+    xy_el = np.asarray(xy_el, dtype=float)
+    points = np.asarray(points, dtype=float)
+    x0 = xy_el[:, 0]
+    if etype == 'T3':
+        a, b = xy_el[:, 1] - x0, xy_el[:, 2] - x0
+        d = points - x0
+        det = a[:, 0]*b[:, 1] - a[:, 1]*b[:, 0]
+        xi = np.stack([(d[:, 0]*b[:, 1] - d[:, 1]*b[:, 0])/det,
+                       (a[:, 0]*d[:, 1] - a[:, 1]*d[:, 0])/det], axis=1)
+        return xi, np.isfinite(xi).all(axis=1)
+    xi = np.zeros_like(points) if etype in _QUADS else np.full_like(points, 1/3)
+    size = np.ptp(xy_el, axis=1).max(axis=1)
+    ok = np.zeros(points.shape[0], dtype=bool)
+    act = np.arange(points.shape[0])                 # iterate only unconverged pairs
+    for it in range(maxiter + 1):
+        xe, x = xy_el[act], xi[act]
+        N, dN_dxi, dN_deta = shape_batch(etype, x[:, 0], x[:, 1])
+        r = points[act] - np.einsum('pa,pai->pi', N, xe)
+        conv = np.linalg.norm(r, axis=1) <= tol*size[act]
+        ok[act[conv]] = True
+        if conv.all() or it == maxiter:
+            break
+        act, xe, x, r = act[~conv], xe[~conv], x[~conv], r[~conv]
+        dN_dxi, dN_deta = dN_dxi[~conv], dN_deta[~conv]
+        J = np.stack([np.einsum('pa,pai->pi', dN_dxi, xe),
+                      np.einsum('pa,pai->pi', dN_deta, xe)], axis=-1)     # dx_i/dxi_j
+        det = J[:, 0, 0]*J[:, 1, 1] - J[:, 0, 1]*J[:, 1, 0]
+        det = np.where(det == 0, np.nan, det)
+        dxi = np.stack([J[:, 1, 1]*r[:, 0] - J[:, 0, 1]*r[:, 1],
+                        J[:, 0, 0]*r[:, 1] - J[:, 1, 0]*r[:, 0]], axis=1)/det[:, None]
+        xi[act] = np.clip(x + np.nan_to_num(dxi), -3.0, 3.0)
+    return xi, ok
+
+def _inside(xi, etype, tol):
+    if etype in _QUADS:
+        return np.all(np.abs(xi) <= 1 + tol, axis=1)
+    return (xi[:, 0] >= -tol) & (xi[:, 1] >= -tol) & (xi.sum(axis=1) <= 1 + tol)
+
+@dataclass
+class Location:
+    """Located query points: element (npts,) (-1 outside) and parent coordinates (npts, 2)."""
+    elem: np.ndarray
+    xi: np.ndarray
+
+    @property
+    def found(self):
+        return self.elem >= 0
+
+class Interpolator:
+    """
+    Point location and interpolation of nodal fields on a mesh (T3/Q4/T6/Q8/Q9).
+    tol: relative tolerance of the inside test (points on shared edges go to the
+         first candidate element).
+    """
+    def __init__(self, xy, IEN, etype='Q4', cell_size=None, tol=1e-9):
+        self.xy = np.asarray(xy, dtype=float)
+        self.IEN = np.asarray(IEN)
+        self.etype = etype
+        self.tol = float(tol)
+        self.index = GridIndex(self.xy[self.IEN], cell_size)
+
+    @instrument('locate.Interpolator.locate')
+    def locate(self, points, chunk_size=CHUNK_SIZE):
+        """Containing element and parent coordinates of every point -> Location."""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        elem = np.full(points.shape[0], -1, dtype=np.int64)
+        xi = np.full(points.shape, np.nan)
+        pad = self.tol*self.index.h
+        for s in range(0, points.shape[0], chunk_size):
+            pts = points[s:s + chunk_size]
+            p, e = self.index.candidates(pts, pad)
+            xi_c, ok = inverse_map(self.xy[self.IEN[e]], pts[p], self.etype)
+            hit = ok & _inside(xi_c, self.etype, self.tol)
+            first = np.unique(p[hit], return_index=True)[1]
+            sel = np.flatnonzero(hit)[first]
+            elem[s + p[sel]] = e[sel]
+            xi[s + p[sel]] = xi_c[sel]
+        annotate(points=points.shape[0], found=int((elem >= 0).sum()))
+        return Location(elem, xi)
+
+    @instrument('locate.Interpolator.interpolate')
+    def interpolate(self, u, points):
+        """
+        Values and gradients of the nodal field u at points (npts, 2) or a Location from
+        locate() (reuse it for time histories at fixed sensors).
+        u: (Nnodes,) scalar field -> values (npts,), gradients (npts, 2);
+           (Nnodes, k) or interleaved (Nnodes*k,) -> (npts, k), (npts, k, 2).
+        """
+        loc = points if isinstance(points, Location) else self.locate(points)
+        u = np.asarray(u, dtype=float)
+        scalar = u.size == self.xy.shape[0] and u.ndim == 1
+        U = u.reshape(self.xy.shape[0], -1)
+        npts, k = loc.elem.size, U.shape[1]
+        vals = np.full((npts, k), np.nan)
+        grads = np.full((npts, k, 2), np.nan)
+        f = np.flatnonzero(loc.found)
+        if f.size:
+            nodes = self.IEN[loc.elem[f]]
+            N, dN_dxi, dN_deta = shape_batch(self.etype, loc.xi[f, 0], loc.xi[f, 1])
+            xe = self.xy[nodes]
+            J = np.stack([np.einsum('pa,pai->pi', dN_dxi, xe),
+                          np.einsum('pa,pai->pi', dN_deta, xe)], axis=1)     # J[p, j, i] = dx_i/dxi_j
+            det = (J[:, 0, 0]*J[:, 1, 1] - J[:, 0, 1]*J[:, 1, 0])[:, None]
+            dN_dx = np.stack([J[:, 1, 1, None]*dN_dxi - J[:, 0, 1, None]*dN_deta,
+                              J[:, 0, 0, None]*dN_deta - J[:, 1, 0, None]*dN_dxi], axis=1)/det[:, None]
+            ue = U[nodes]                                                    # (p, nen, k)
+            vals[f] = np.einsum('pa,pak->pk', N, ue)
+            grads[f] = np.einsum('pia,pak->pki', dN_dx, ue)
+        if scalar:
+            return vals[:, 0], grads[:, 0]
+        return vals, grads
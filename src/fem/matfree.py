@@ -0,0 +1,151 @@
+"""
+Matrix-free stiffness operators.
+
+The action K u is evaluated element by element without assembling K:
+gather u_e = u[edofs] -> gradients at the quadrature points -> flux / stress ->
+weighted B^T sigma -> np.bincount scatter. Only the mesh, the material and (optionally)
+the quadrature-point gradients are stored, so memory is O(nelem*nqp*nen) instead of
+O(nnz), and the operator plugs into solvers.solve(..., method='cg') directly.
+"""
+import numpy as np
+import scipy.sparse.linalg as spla
+from .dofmap import element_dofs
+from .elements import gradients_batch
+from .profiling import instrument
+
+class MatrixFreeOperator(spla.LinearOperator):
+    """
+    K as a scipy LinearOperator for Q4/T3/T6/Q8/Q9 meshes.
+    physics: 'structural' (2 DOFs/node; coef = D, (3,3) or (nelem,3,3); t thickness)
+             or 'conduction' (1 DOF/node; coef = k, scalar or (nelem,))
+    order: quadrature order as in elements.parent_tables (None = element default)
+    fixed_dofs: optional Dirichlet DOFs; the operator then acts as K with those rows and
+                columns replaced by the identity (as bc.apply_dirichlet does for sparse K),
+                and rhs() builds the matching lifted right-hand side.
+    store_gradients: keep dN/dx and w*detJ per quadrature point (fast matvec); if False
+                     they are recomputed from xy block by block in every product.
+    block_size: elements per block in matvec (bounds temporaries).
+    """
+    def __init__(self, xy, IEN, coef, physics='structural', etype='Q4', t=1.0, order=None,
+                 fixed_dofs=None, store_gradients=True, block_size=65536):
+        if physics not in ('structural', 'conduction'):
+            raise ValueError(f"Unknown physics {physics!r}")
+        self.xy = np.asarray(xy, dtype=float)
+        self.IEN = np.asarray(IEN)
+        self.physics = physics
+        self.etype = etype
+        self.order = order
+        self.ndofs_per_node = 2 if physics == 'structural' else 1
+        self.block_size = int(block_size)
+        nelem = self.IEN.shape[0]
+        N = self.xy.shape[0]*self.ndofs_per_node
+        super().__init__(dtype=np.float64, shape=(N, N))
+
+        coef = np.asarray(coef, dtype=float)
+        scale = np.broadcast_to(np.asarray(t, dtype=float), (nelem,))
+        if physics == 'conduction':
+            scale = scale*np.broadcast_to(coef, (nelem,))
+            coef = None
+        self.coef = coef
+        self.scale = scale
+        self.edofs = element_dofs(self.IEN, self.ndofs_per_node)
+        self._grads = [self._gradients(s, e) for s, e in self._blocks()] if store_gradients else None
+
+        self.fixed = None
+        self._mask = None
+        if fixed_dofs is not None:
+            fixed_dofs = np.asarray(fixed_dofs, dtype=int).ravel()
+            self.fixed, self._order = np.unique(fixed_dofs, return_index=True)
+            self._nvals = fixed_dofs.size
+            self._mask = np.ones(N, dtype=bool)
+            self._mask[self.fixed] = False
+
+    def _blocks(self):
+        n = self.IEN.shape[0]
+        return [(s, min(s + self.block_size, n)) for s in range(0, n, self.block_size)]
+
+    def _gradients(self, start, stop):
+        dN_dx, wdet = gradients_batch(self.xy[self.IEN[start:stop]], self.etype, self.order)
+        return dN_dx, wdet*self.scale[start:stop, None]
+
+    def _D(self, start, stop):
+        return self.coef[start:stop, None] if self.coef.ndim == 3 else self.coef
+
+    def _element_action(self, ue, dN_dx, w, start, stop):
+        """Element vectors K_e u_e for one block; ue: (ne, nd) -> (ne, nd)."""
+        if self.physics == 'conduction':
+            g = np.einsum('eqia,ea->eqi', dN_dx, ue)
+            return np.einsum('eqia,eqi,eq->ea', dN_dx, g, w)
+        dNx, dNy = dN_dx[..., 0, :], dN_dx[..., 1, :]
+        gx = np.einsum('eqia,ea->eqi', dN_dx, ue[:, 0::2])      # grad u_x
+        gy = np.einsum('eqia,ea->eqi', dN_dx, ue[:, 1::2])      # grad u_y
+        eps = np.stack([gx[..., 0], gy[..., 1], gx[..., 1] + gy[..., 0]], axis=-1)
+        sig = np.matmul(self._D(start, stop), eps[..., None])[..., 0]*w[..., None]
+        out = np.empty_like(ue)
+        out[:, 0::2] = np.einsum('eqa,eq->ea', dNx, sig[..., 0]) + np.einsum('eqa,eq->ea', dNy, sig[..., 2])
+        out[:, 1::2] = np.einsum('eqa,eq->ea', dNy, sig[..., 1]) + np.einsum('eqa,eq->ea', dNx, sig[..., 2])
+        return out
+
+    def _apply(self, u):
+        """Unmasked K u for u (N,)."""
+        y = np.zeros(self.shape[0])
+        for i, (s, e) in enumerate(self._blocks()):
+            dN_dx, w = self._grads[i] if self._grads is not None else self._gradients(s, e)
+            edofs = self.edofs[s:e]
+            fe = self._element_action(u[edofs], dN_dx, w, s, e)
+            y += np.bincount(edofs.ravel(), weights=fe.ravel(), minlength=y.size)
+        return y
+
+    @instrument('matfree.MatrixFreeOperator.matvec')
+    def _matvec(self, u):
+        u = np.asarray(u, dtype=float).ravel()
+        if self._mask is None:
+            return self._apply(u)
+        y = self._apply(np.where(self._mask, u, 0.0))
+        y[self.fixed] = u[self.fixed]
+        return y
+
+    def _rmatvec(self, u):
+        return self._matvec(u)           # K is symmetric
+
+    def apply(self, u):
+        """K u without Dirichlet masking (e.g. internal forces / reactions)."""
+        return self._apply(np.asarray(u, dtype=float).ravel())
+
+    @instrument('matfree.MatrixFreeOperator.diagonal')
+    def diagonal(self):
+        """diag(K) from the element diagonals (masked rows -> 1); used for Jacobi."""
+        d = np.zeros(self.shape[0])
+        for i, (s, e) in enumerate(self._blocks()):
+            dN_dx, w = self._grads[i] if self._grads is not None else self._gradients(s, e)
+            dNx, dNy = dN_dx[..., 0, :], dN_dx[..., 1, :]
+            if self.physics == 'conduction':
+                de = np.einsum('eqa,eq->ea', dNx**2 + dNy**2, w)
+            else:
+                D = np.broadcast_to(self._D(s, e), w.shape + (3, 3))
+                de = np.empty((e - s, self.edofs.shape[1]))
+                de[:, 0::2] = np.einsum('eqa,eq->ea', dNx**2, D[..., 0, 0]*w) \
+                    + np.einsum('eqa,eq->ea', 2*dNx*dNy, D[..., 0, 2]*w) \
+                    + np.einsum('eqa,eq->ea', dNy**2, D[..., 2, 2]*w)
+                de[:, 1::2] = np.einsum('eqa,eq->ea', dNy**2, D[..., 1, 1]*w) \
+                    + np.einsum('eqa,eq->ea', 2*dNx*dNy, D[..., 1, 2]*w) \
+                    + np.einsum('eqa,eq->ea', dNx**2, D[..., 2, 2]*w)
+            d += np.bincount(self.edofs[s:e].ravel(), weights=de.ravel(), minlength=d.size)
+        if self.fixed is not None:
+            d[self.fixed] = 1.0
+        return d
+
+    def rhs(self, f, values=0.0):
+        """
+        Right-hand side matching the masked operator: f - K u_c on free DOFs and the
+        prescribed values on fixed DOFs. values: scalar or aligned with fixed_dofs.
+        """
+        f = np.asarray(f, dtype=float).copy()
+        if self.fixed is None:
+            return f
+        u_c = np.zeros(self.shape[0])
+        u_c[self.fixed] = np.broadcast_to(np.asarray(values, dtype=float), (self._nvals,))[self._order]
+        if np.any(u_c[self.fixed]):
+            f -= self._apply(u_c)
+        f[self.fixed] = u_c[self.fixed]
+        return f
@@ -0,0 +1,124 @@
+import numpy as np
+
+class StructuredMesh:
+    """
+    Structured mesh on [0,Lx] x [0,Ly].
+    xy:    (Nnodes, 2) float64, C-contiguous
+    IEN:   (nelems, nen) int32 connectivity
+    X, Y:  node coordinates on the (rows, cols) node grid, for pcolormesh / reshape
+    nodes: {'left','right','bottom','top'} -> node ids along that side
+    edges: {'left','right','bottom','top'} -> (nedges, 2) boundary edges (end, end),
+           or (nedges, 3) (end, end, mid) for quadratic meshes; edges run
+           counter-clockwise around the domain, so the outward normal is on the right
+    """
+    def __init__(self, xy, IEN, X, Y, nodes, edges, nx, ny, etype):
+        self.xy = xy
+        self.IEN = IEN
+        self.X = X
+        self.Y = Y
+        self.nodes = nodes
+        self.edges = edges
+        self.nx = nx
+        self.ny = ny
+        self.etype = etype
+
+    @property
+    def grid_shape(self):
+        return self.X.shape
+
+def graded_coords(n, L, ratio=1.0):
+    """
+    n+1 coordinates on [0, L]; element sizes grow geometrically so that
+    last/first size = ratio (ratio=1: uniform).
+    """
+    if ratio == 1.0 or n == 1:
+        return np.linspace(0.0, L, n+1)
+    h = ratio**(np.arange(n)/(n - 1))
+    return L*np.concatenate(([0.0], np.cumsum(h)/h.sum()))
+
+def _grid(nx, ny, Lx, Ly, ratio, refine):
+    """Node grid with `refine` sub-intervals per element (1: linear, 2: quadratic)."""
+    xs = graded_coords(nx, Lx, ratio[0])
+    ys = graded_coords(ny, Ly, ratio[1])
+    if refine == 2:
+        xs = np.insert(xs, np.arange(1, nx+1), 0.5*(xs[:-1] + xs[1:]))
+        ys = np.insert(ys, np.arange(1, ny+1), 0.5*(ys[:-1] + ys[1:]))
+    X, Y = np.meshgrid(xs, ys, indexing="xy")
+    xy = np.ascontiguousarray(np.column_stack([X.ravel(), Y.ravel()]), dtype=np.float64)
+    return xy, X, Y
+
+def _boundary(nxn, nyn, step):
+    """Side node sets and CCW edge connectivity for a (nyn, nxn) node grid."""
+    ids = np.arange(nxn*nyn, dtype=np.int32).reshape(nyn, nxn)
+    nodes = {'bottom': ids[0, :], 'right': ids[:, -1], 'top': ids[-1, :], 'left': ids[:, 0]}
+    ccw = {'bottom': ids[0, :], 'right': ids[:, -1], 'top': ids[-1, ::-1], 'left': ids[::-1, 0]}
+    edges = {}
+    for side, line in ccw.items():
+        a, b = line[:-1:step], line[step::step]
+        edges[side] = np.column_stack([a, b] if step == 1 else [a, b, line[1::step]])
+    return {k: v.copy() for k, v in nodes.items()}, edges
+
+def _cells(nx, ny, nxn, step):
+    """Corner node ids of every grid cell, element order j-major: (c1, c2, c3, c4) ccw."""
+    i, j = np.meshgrid(np.arange(nx, dtype=np.int32)*step, np.arange(ny, dtype=np.int32)*step)
+    c1 = (j*nxn + i).ravel()
+    return c1, c1 + step, c1 + step*nxn + step, c1 + step*nxn
+
+def make_structured_Q4_mesh(nx, ny, Lx=1.0, Ly=1.0, ratio=(1.0, 1.0)):
+    """nx*ny Q4 elements; node id = j*(nx+1) + i. ratio: (x, y) grading ratios."""
+    xy, X, Y = _grid(nx, ny, Lx, Ly, ratio, 1)
+    IEN = np.column_stack(_cells(nx, ny, nx+1, 1))
+    nodes, edges = _boundary(nx+1, ny+1, 1)
+    return StructuredMesh(xy, IEN, X, Y, nodes, edges, nx, ny, 'Q4')
+
+def make_structured_T3_mesh(nx, ny, Lx=1.0, Ly=1.0, ratio=(1.0, 1.0)):
+    """2*nx*ny T3 elements; each cell split along c1-c3 into (c1,c2,c3), (c1,c3,c4)."""
+    xy, X, Y = _grid(nx, ny, Lx, Ly, ratio, 1)
+    c1, c2, c3, c4 = _cells(nx, ny, nx+1, 1)
+    IEN = np.stack([np.column_stack([c1, c2, c3]), np.column_stack([c1, c3, c4])], axis=1)
+    nodes, edges = _boundary(nx+1, ny+1, 1)
+    return StructuredMesh(xy, IEN.reshape(-1, 3), X, Y, nodes, edges, nx, ny, 'T3')
+
+def make_structured_T6_mesh(nx, ny, Lx=1.0, Ly=1.0, ratio=(1.0, 1.0)):
+    """
+    2*nx*ny T6 elements on a (2nx+1) x (2ny+1) node grid, same split as T3.
+    Node order per element follows shapes.shape_T6: corners 1,2,3 then mids of 2-3, 3-1, 1-2.
+    """
+    nxn = 2*nx + 1
+    xy, X, Y = _grid(nx, ny, Lx, Ly, ratio, 2)
+    c1, c2, c3, c4 = _cells(nx, ny, nxn, 2)
+    m12, m23, m34, m41 = c1 + 1, c2 + nxn, c4 + 1, c1 + nxn
+    m13 = c1 + nxn + 1
+    A = np.column_stack([c1, c2, c3, m23, m13, m12])
+    B = np.column_stack([c1, c3, c4, m34, m41, m13])
+    IEN = np.stack([A, B], axis=1).reshape(-1, 6)
+    nodes, edges = _boundary(nxn, 2*ny + 1, 2)
+    return StructuredMesh(xy, IEN, X, Y, nodes, edges, nx, ny, 'T6')
+
+def _quadratic_quads(nx, ny, Lx, Ly, ratio):
+    """Q9 connectivity on the (2nx+1) x (2ny+1) grid: corners ccw, mids 12,23,34,41, centre."""
+    nxn = 2*nx + 1
+    xy, X, Y = _grid(nx, ny, Lx, Ly, ratio, 2)
+    c1, c2, c3, c4 = _cells(nx, ny, nxn, 2)
+    IEN = np.column_stack([c1, c2, c3, c4, c1 + 1, c2 + nxn, c4 + 1, c1 + nxn, c1 + nxn + 1])
+    nodes, edges = _boundary(nxn, 2*ny + 1, 2)
+    return xy, X, Y, IEN, nodes, edges
+
+def make_structured_Q9_mesh(nx, ny, Lx=1.0, Ly=1.0, ratio=(1.0, 1.0)):
+    """nx*ny Q9 elements on a (2nx+1) x (2ny+1) node grid; node order as shapes.shape_Q9."""
+    xy, X, Y, IEN, nodes, edges = _quadratic_quads(nx, ny, Lx, Ly, ratio)
+    return StructuredMesh(xy, IEN, X, Y, nodes, edges, nx, ny, 'Q9')
+
+def make_structured_Q8_mesh(nx, ny, Lx=1.0, Ly=1.0, ratio=(1.0, 1.0)):
+    """
+    nx*ny Q8 elements: the Q9 grid without the cell centres, which are dropped and the
+    remaining nodes renumbered in grid order. X, Y keep the full grid (centres included).
+    """
+    xy, X, Y, IEN, nodes, edges = _quadratic_quads(nx, ny, Lx, Ly, ratio)
+    keep = np.ones(xy.shape[0], dtype=bool)
+    keep[IEN[:, 8]] = False
+    new = (np.cumsum(keep) - 1).astype(np.int32)
+    nodes = {k: new[v] for k, v in nodes.items()}
+    edges = {k: new[v] for k, v in edges.items()}
+    return StructuredMesh(np.ascontiguousarray(xy[keep]), new[IEN[:, :8]], X, Y, nodes, edges,
+                          nx, ny, 'Q8')
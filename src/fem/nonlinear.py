@@ -0,0 +1,238 @@
+"""
+Nonlinear quasi-static structural analysis  f_int(u) = lambda f_ext.
+
+NonlinearStructure evaluates internal forces and consistent tangents for a whole mesh in
+batched form: shape-function gradients are computed once in the reference configuration,
+material state lives in (nelem, nqp, ...) Gauss-point arrays, and the tangent is
+refilled into a fixed DofMap CSR pattern. kinematics='small' uses the linear strain;
+'green' is total Lagrangian (Green-Lagrange strain E, second Piola-Kirchhoff S) and adds
+the geometric stiffness, for large displacements and rotations.
+
+NewtonSolver marches the load factor with full or modified Newton-Raphson and an
+optional secant line search; one iteration costs one data refill plus one solve
+(modified Newton keeps the factorization of the step's first tangent).
+"""
+import numpy as np
+from .dofmap import DofMap
+from .elements import gradients_batch
+from .solvers import Factorization
+from .profiling import instrument, annotate
+
+_M = np.array([1.0, 1.0, 0.0])
+_I_SYM = np.diag([1.0, 1.0, 0.5])       # engineering Voigt [xx, yy, xy(gamma)]
+
+class LinearElastic:
+    """Stateless linear material, sigma = D eps; D (3,3)."""
+    def __init__(self, D):
+        self.D = np.asarray(D, dtype=float)
+
+    def initial_state(self, shape):
+        return {}
+
+    def update(self, eps, state):
+        return eps @ self.D.T, np.broadcast_to(self.D, eps.shape[:-1] + (3, 3)), state
+
+class J2PlaneStrain:
+    """
+    Von Mises plasticity with linear isotropic hardening H in plane strain: radial return
+    and the consistent (algorithmic) tangent. State per Gauss point: plastic strain
+    'ep' (tensor components xx, yy, zz, xy) and equivalent plastic strain 'alpha'.
+    """
+    def __init__(self, E, nu, sigma_y, H=0.0):
+        self.mu = E/(2*(1 + nu))
+        self.kappa = E/(3*(1 - 2*nu))
+        self.sigma_y = float(sigma_y)
+        self.H = float(H)
+
+    def initial_state(self, shape):
+        return {'ep': np.zeros(shape + (4,)), 'alpha': np.zeros(shape)}
+
+    def update(self, eps, state):
+        mu, kappa, H = self.mu, self.kappa, self.H
+        e = np.stack([eps[..., 0], eps[..., 1], np.zeros(eps.shape[:-1]), 0.5*eps[..., 2]], axis=-1)
+        e_el = e - state['ep']
+        vol = e_el[..., 0] + e_el[..., 1] + e_el[..., 2]
+        s = 2*mu*(e_el - vol[..., None]/3*np.array([1.0, 1.0, 1.0, 0.0]))
+        snorm = np.sqrt(s[..., 0]**2 + s[..., 1]**2 + s[..., 2]**2 + 2*s[..., 3]**2)
+        f = snorm - np.sqrt(2/3)*(self.sigma_y + H*state['alpha'])
+        yld = f > 0
+        dgam = np.where(yld, f/(2*mu + 2*H/3), 0.0)
+        n = s/np.where(snorm > 0, snorm, 1.0)[..., None]
+        s = s - 2*mu*dgam[..., None]*n
+        new = {'ep': state['ep'] + dgam[..., None]*n,
+               'alpha': state['alpha'] + np.sqrt(2/3)*dgam}
+        p = kappa*vol
+        sig = np.stack([s[..., 0] + p, s[..., 1] + p, s[..., 3]], axis=-1)
+
+        theta = 1 - np.where(yld, 2*mu*dgam/np.where(snorm > 0, snorm, 1.0), 0.0)
+        theta_bar = np.where(yld, 1/(1 + H/(3*mu)) - (1 - theta), 0.0)
+        nv = n[..., [0, 1, 3]]
+        C = (kappa*np.outer(_M, _M)
+             + 2*mu*theta[..., None, None]*(_I_SYM - np.outer(_M, _M)/3)
+             - 2*mu*theta_bar[..., None, None]*nv[..., :, None]*nv[..., None, :])
+        return sig, C, new
+
+class NonlinearStructure:
+    """
+    Plane structural model with a (possibly nonlinear, path-dependent) material.
+    material: object with initial_state(shape) -> dict and
+              update(eps (...,3), state) -> (sigma (...,3), C (...,3,3), new_state)
+    kinematics: 'small' or 'green' (total Lagrangian)
+    """
+    def __init__(self, xy, IEN, material, etype='Q4', t=1.0, kinematics='small', order=None):
+        if kinematics not in ('small', 'green'):
+            raise ValueError(f"Unknown kinematics {kinematics!r}")
+        self.xy = np.asarray(xy, dtype=float)
+        self.IEN = np.asarray(IEN)
+        self.material = material
+        self.kinematics = kinematics
+        self.dN_dx, wdet = gradients_batch(self.xy[self.IEN], etype, order)
+        self.w = wdet*np.reshape(np.asarray(t, dtype=float), (-1, 1))
+        self.dofmap = DofMap(self.IEN, 2, self.xy.shape[0])
+        self.N = self.dofmap.N
+        self.state = material.initial_state(self.w.shape)
+
+    def _B(self, ue):
+        """Strain (nelem,nqp,3) and B (nelem,nqp,3,2nen) at displacement ue (nelem,2nen)."""
+        dN = self.dN_dx                                  # (ne, nq, 2, nen)
+        dNx, dNy = dN[..., 0, :], dN[..., 1, :]
+        # H_ij = d u_i / d X_j
+        Hx = np.einsum('eqja,ea->eqj', dN, ue[:, 0::2])
+        Hy = np.einsum('eqja,ea->eqj', dN, ue[:, 1::2])
+        B = np.zeros(dN.shape[:2] + (3, 2*dN.shape[-1]))
+        if self.kinematics == 'small':
+            eps = np.stack([Hx[..., 0], Hy[..., 1], Hx[..., 1] + Hy[..., 0]], axis=-1)
+            F11 = F22 = np.ones(Hx.shape[:2])
+            F12 = F21 = np.zeros(Hx.shape[:2])
+        else:
+            F11, F12, F21, F22 = 1 + Hx[..., 0], Hx[..., 1], Hy[..., 0], 1 + Hy[..., 1]
+            eps = np.stack([0.5*(F11**2 + F21**2 - 1), 0.5*(F12**2 + F22**2 - 1),
+                            F11*F12 + F21*F22], axis=-1)
+        f = lambda a: a[..., None]
+        B[..., 0, 0::2], B[..., 0, 1::2] = f(F11)*dNx, f(F21)*dNx
+        B[..., 1, 0::2], B[..., 1, 1::2] = f(F12)*dNy, f(F22)*dNy
+        B[..., 2, 0::2] = f(F11)*dNy + f(F12)*dNx
+        B[..., 2, 1::2] = f(F21)*dNy + f(F22)*dNx
+        return eps, B
+
+    @instrument('nonlinear.NonlinearStructure.evaluate')
+    def evaluate(self, u, tangent=True):
+        """
+        Internal forces f_int (N,), tangent K (CSR on the fixed pattern, or None) and the
+        trial Gauss-point state for displacement u, from the last committed state.
+        """
+        ue = np.asarray(u, dtype=float)[self.dofmap.edofs]
+        eps, B = self._B(ue)
+        sig, C, trial = self.material.update(eps, self.state)
+        fe = np.einsum('eqki,eqk,eq->ei', B, sig, self.w, optimize=True)
+        f = self.dofmap.assemble_vector(fe)
+        if not tangent:
+            return f, None, trial
+        CB = np.matmul(C, B)
+        Ke = np.einsum('eqki,eqkj,eq->eij', B, CB, self.w, optimize=True)
+        if self.kinematics == 'green':
+            dN = self.dN_dx
+            S = np.stack([np.stack([sig[..., 0], sig[..., 2]], -1),
+                          np.stack([sig[..., 2], sig[..., 1]], -1)], -2)
+            G = np.einsum('eqia,eqij,eqjb,eq->eab', dN, S, dN, self.w, optimize=True)
+            Ke[:, 0::2, 0::2] += G
+            Ke[:, 1::2, 1::2] += G
+        return f, self.dofmap.assemble(Ke), trial
+
+    def commit(self, state):
+        """Accept a converged trial state."""
+        self.state = state
+
+class NewtonSolver:
+    """
+    Incremental-iterative solution of f_int(u) = lambda f_ext, lambda = 1/nsteps ... 1.
+    bc: optional bc.Dirichlet; prescribed values are scaled with lambda as well.
+    modified: factor the tangent once per load step and reuse it for every iteration.
+    line_search: secant line search on s -> du . r(u + s du) when the full step
+                 does not reduce it below ls_tol of its initial value.
+    tol: convergence on ||r_free|| / max(||lambda f_ext||, ||f_int||, 1e-30); f_int
+         includes the reactions, so displacement-driven steps are scaled too.
+    """
+    def __init__(self, model, bc=None, method='splu', modified=False, line_search=False,
+                 tol=1e-8, maxiter=30, ls_tol=0.5, ls_maxiter=5):
+        self.model = model
+        self.bc = bc
+        self.method = method
+        self.modified = modified
+        self.line_search = line_search
+        self.tol = float(tol)
+        self.maxiter = int(maxiter)
+        self.ls_tol = float(ls_tol)
+        self.ls_maxiter = int(ls_maxiter)
+        self.history = []
+        if bc is not None:
+            self._free = bc.free
+        else:
+            self._free = np.arange(model.N)
+
+    def _reduced(self, K):
+        if self.bc is None:
+            return K
+        return self.bc.blocks(K)[0]
+
+    def _residual(self, u, f_ext, lam, tangent):
+        f_int, K, trial = self.model.evaluate(u, tangent)
+        return lam*f_ext - f_int, f_int, K, trial
+
+    @instrument('nonlinear.NewtonSolver.run')
+    def run(self, f_ext, nsteps=1, values=0.0, u0=None, callback=None):
+        """
+        Apply f_ext (N,) and prescribed values in nsteps equal increments.
+        callback(step, lam, u) after every converged step. Returns u (N,); per-step
+        {'lam', 'iterations', 'residuals'} records are appended to self.history.
+        """
+        N = self.model.N
+        f_ext = np.broadcast_to(np.asarray(f_ext, dtype=float), (N,))
+        u = np.zeros(N) if u0 is None else np.array(u0, dtype=float)
+        free = self._free
+        total = 0
+        for step in range(1, nsteps + 1):
+            lam = step/nsteps
+            if self.bc is not None:
+                u[self.bc.fixed] = lam*self.bc.prescribed(values)
+            r, f_int, K, trial = self._residual(u, f_ext, lam, True)
+            fact = None
+            residuals = []
+            for it in range(self.maxiter + 1):
+                scale = max(np.linalg.norm(lam*f_ext), np.linalg.norm(f_int), 1e-30)
+                residuals.append(np.linalg.norm(r[free])/scale)
+                if residuals[-1] < self.tol:
+                    break
+                if it == self.maxiter:
+                    raise RuntimeError(f"Newton did not converge in load step {step} "
+                                       f"(residual {residuals[-1]:.3e})")
+                if fact is None or not self.modified:
+                    fact = Factorization(self._reduced(K), self.method)
+                du = np.zeros(N)
+                du[free] = fact.solve(r[free])
+                s = 1.0
+                r1, f1, K1, trial1 = self._residual(u + du, f_ext, lam, not self.modified)
+                if self.line_search:
+                    g0 = du[free] @ r[free]
+                    g1 = du[free] @ r1[free]
+                    s_prev, g_prev = 0.0, g0
+                    for _ in range(self.ls_maxiter):
+                        if abs(g1) <= self.ls_tol*abs(g0) or g_prev == g1:
+                            break
+                        s_new = float(np.clip(s - g1*(s - s_prev)/(g1 - g_prev), 0.1, 1.0))
+                        if s_new == s:
+                            break
+                        s_prev, g_prev, s = s, g1, s_new
+                        r1, f1, K1, trial1 = self._residual(u + s*du, f_ext, lam, not self.modified)
+                        g1 = du[free] @ r1[free]
+                u = u + s*du
+                r, f_int, trial = r1, f1, trial1
+                if K1 is not None:
+                    K = K1
+            self.model.commit(trial)
+            total += it
+            self.history.append({'lam': lam, 'iterations': it, 'residuals': residuals})
+            if callback is not None:
+                callback(step, lam, u)
+        annotate(iterations=total)
+        return u
@@ -0,0 +1,130 @@
+"""
+Executor-backed element computation and assembly.
+
+IEN is split into fixed-size chunks; each chunk's element matrices are computed by a
+worker and written straight into one (nelem, nd, nd) value buffer (the COO values;
+rows/cols come from the DofMap). Process workers attach xy, IEN and the output buffer
+through multiprocessing.shared_memory, so neither the mesh nor the results are pickled.
+The merge is a single DofMap bincount in element order, so the assembled matrix does
+not depend on the number of workers (chunk_size is fixed, not derived from n_workers).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory, util
+import numpy as np
+from .dofmap import DofMap
+from .profiling import instrument
+
+CHUNK_SIZE = 4096   # elements per task
+
+_worker = {}
+
+def _chunks(nelem, chunk_size):
+    starts = range(0, nelem, chunk_size)
+    return [(s, min(s + chunk_size, nelem)) for s in starts]
+
+def _attach(name, shape, dtype):
+    """Attach a parent-owned block; only the parent unlinks it."""
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)    # Python >= 3.13
+    except TypeError:
+        # fork, spawn and forkserver workers all inherit the parent's resource tracker,
+        # where this registration duplicates the parent's entry; the parent's unlink
+        # removes it, so the worker must not unregister it
+        shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def _detach_worker():
+    blocks = [_worker.pop(k)[0] for k in ('xy', 'IEN', 'out') if k in _worker]
+    _worker.clear()                          # drop the array views before closing
+    for shm in blocks:
+        shm.close()
+
+def _init_worker(specs, kernel, args, kwargs):
+    for key, spec in specs.items():
+        _worker[key] = _attach(*spec)
+    _worker['task'] = (kernel, args, kwargs)
+    util.Finalize(None, _detach_worker, exitpriority=10)
+
+def _run_chunk(start, stop):
+    kernel, args, kwargs = _worker['task']
+    xy, IEN, out = _worker['xy'][1], _worker['IEN'][1], _worker['out'][1]
+    out[start:stop] = kernel(xy[IEN[start:stop]], *args, **kwargs)
+    return stop - start
+
+def _shared_copy(a, blocks):
+    """Copy a into a new shared-memory block; returns the attach spec for workers."""
+    shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+    blocks.append(shm)
+    np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)[...] = a
+    return shm.name, a.shape, a.dtype.str
+
+def _compute(kernel, xy, IEN, args, kwargs, n_workers, chunk_size, backend, consume):
+    """Fill the (nelem, nd, nd) value buffer chunk by chunk and return consume(buffer)."""
+    xy = np.ascontiguousarray(xy, dtype=float)
+    IEN = np.ascontiguousarray(IEN)
+    nelem = IEN.shape[0]
+    if nelem == 0:
+        return consume(np.zeros((0, 0, 0)))
+    chunks = _chunks(nelem, chunk_size)
+    n_workers = n_workers or os.cpu_count() or 1
+    first = kernel(xy[IEN[:1]], *args, **kwargs)       # probe the element matrix shape
+    out_shape = (nelem,) + first.shape[1:]
+
+    if backend == 'thread' or n_workers == 1:
+        out = np.empty(out_shape)
+        def run(c):
+            out[c[0]:c[1]] = kernel(xy[IEN[c[0]:c[1]]], *args, **kwargs)
+        if n_workers == 1:
+            for c in chunks:
+                run(c)
+        else:
+            with ThreadPoolExecutor(n_workers) as pool:
+                list(pool.map(run, chunks))
+        return consume(out)
+
+    if backend != 'process':
+        raise ValueError(f"Unknown backend {backend!r}")
+    blocks = []
+    try:
+        xy_spec = _shared_copy(xy, blocks)
+        ien_spec = _shared_copy(IEN, blocks)
+        shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(out_shape))*8, 1))
+        blocks.append(shm)
+        out = np.ndarray(out_shape, dtype=float, buffer=shm.buf)
+        specs = {'xy': xy_spec, 'IEN': ien_spec, 'out': (shm.name, out_shape, out.dtype.str)}
+        with ProcessPoolExecutor(n_workers, initializer=_init_worker,
+                                 initargs=(specs, kernel, args, kwargs)) as pool:
+            list(pool.map(_run_chunk, *zip(*chunks)))
+        result = consume(out)
+        del out
+        return result
+    finally:
+        for b in blocks:
+            b.close()
+            b.unlink()
+
+@instrument('parallel.element_matrices')
+def element_matrices(kernel, xy, IEN, *args, n_workers=None, chunk_size=CHUNK_SIZE,
+                     backend='thread', **kwargs):
+    """
+    Batched element matrices kernel(xy[IEN[chunk]], *args, **kwargs) over chunks of IEN.
+    kernel: a batched kernel such as elements.K_structural_Q4_batch (for backend='process'
+            it must be picklable, i.e. a module-level function)
+    backend: 'thread' (numpy releases the GIL inside its kernels) or 'process'
+    Returns (nelem, nd, nd).
+    """
+    consume = (lambda a: a) if backend == 'thread' else np.array
+    return _compute(kernel, xy, IEN, args, kwargs, n_workers, chunk_size, backend, consume)
+
+@instrument('parallel.assemble_parallel')
+def assemble_parallel(kernel, xy, IEN, ndofs_per_node, *args, dofmap=None, n_workers=None,
+                      chunk_size=CHUNK_SIZE, backend='thread', **kwargs):
+    """
+    Parallel element computation + sparse assembly; returns CSR K.
+    The worker-filled value buffer is scattered into the CSR data in place (no copy of
+    the element stack). dofmap: optional DofMap for this mesh, built here if omitted.
+    """
+    if dofmap is None:
+        dofmap = DofMap(IEN, ndofs_per_node, Nnodes=len(xy))
+    return _compute(kernel, xy, IEN, args, kwargs, n_workers, chunk_size, backend, dofmap.assemble)
@@ -1,6 +1,9 @@
 import numpy as np
 from .shapes import shape_Q4
 from .jacobian import jacobian_2D
+from .dofmap import element_dofs
+from .elements import parent_tables, gradients_batch, B_structural_batch
+from .profiling import instrument
 
 def q4_B(xy_e, xi=0.0, eta=0.0):
     """Return B (3x8), detJ at (xi,eta) for a Q4 element."""
@@ -17,29 +20,123 @@ def q4_B(xy_e, xi=0.0, eta=0.0):
     return B, detJ
 
 def von_mises_plane_stress(sig):
-    """sig = [sx, sy, txy] -> von Mises in plane stress."""
-    sx, sy, txy = sig
+    """sig = [sx, sy, txy] (or (..., 3) stack) -> von Mises in plane stress."""
+    sig = np.asarray(sig)
+    sx, sy, txy = sig[..., 0], sig[..., 1], sig[..., 2]
     return np.sqrt(sx**2 - sx*sy + sy**2 + 3.0*txy**2)
 
-def nodal_von_mises_Q4(xy, IEN, D, u):
-    """Compute an approximate nodal von Mises by averaging element-center values."""
-    Nn = xy.shape[0]
-    vm = np.zeros(Nn)
-    cnt = np.zeros(Nn)
-
-    for e, nodes in enumerate(IEN):
-        xy_e = xy[nodes]
-        edofs = []
-        for a in nodes:
-            edofs.extend([2*a, 2*a+1])
-        ue = u[edofs]
-        B, _ = q4_B(xy_e, 0.0, 0.0)  # center point
-        eps = B @ ue  # [ex, ey, gxy]
-        sig = D @ eps
-        vm_e = von_mises_plane_stress(sig)
-        for a in nodes:
-            vm[a] += vm_e
-            cnt[a] += 1.0
+@instrument('post.element_strains')
+def element_strains(xy, IEN, u, etype='Q4', order='centroid'):
+    """
+    Strains [ex, ey, gxy] at the sampling points of every element, in one einsum.
+    order: 'centroid' (one point per element) or a quadrature order as in
+    elements.parent_tables (None = the element's default Gauss rule).
+    Returns eps (nelem, nqp, 3).
+    """
+    dN_dx, _ = gradients_batch(xy[IEN], etype, order)
+    ue = np.asarray(u)[element_dofs(IEN, 2)]
+    return np.einsum('eqkj,ej->eqk', B_structural_batch(dN_dx), ue, optimize=True)
+
+@instrument('post.element_stresses')
+def element_stresses(xy, IEN, D, u, etype='Q4', order='centroid'):
+    """Stresses [sx, sy, txy] = D eps at the sampling points; returns (nelem, nqp, 3)."""
+    return element_strains(xy, IEN, u, etype, order) @ np.asarray(D).T
 
+def sampling_points(xy, IEN, etype='Q4', order='centroid'):
+    """Physical coordinates of the sampling points; returns (nelem, nqp, 2)."""
+    N = parent_tables(etype, order)[0]
+    return np.einsum('qa,eai->eqi', N, xy[IEN])
+
+@instrument('post.nodal_average')
+def nodal_average(values, IEN, Nnodes=None, weights=None):
+    """
+    Average element values (nelem,) or (nelem, k) to nodes with np.bincount.
+    weights: optional (nelem,) weights (e.g. element areas); default counts each element once.
+    """
+    values = np.asarray(values, dtype=float)
+    nelem, nen = IEN.shape
+    Nn = int(np.max(IEN)) + 1 if Nnodes is None else int(Nnodes)
+    w = np.ones(nelem) if weights is None else np.asarray(weights, dtype=float)
+    nodes = np.asarray(IEN).ravel()
+    cnt = np.bincount(nodes, weights=np.repeat(w, nen), minlength=Nn)
     cnt[cnt == 0] = 1.0
-    return vm / cnt
+    cols = values.reshape(nelem, -1)
+    out = np.column_stack([np.bincount(nodes, weights=np.repeat(w*c, nen), minlength=Nn)
+                           for c in cols.T]) / cnt[:, None]
+    return out.reshape((Nn,) + values.shape[1:])
+
+@instrument('post.spr_nodal_stresses')
+def spr_nodal_stresses(xy, IEN, D, u, etype='Q4', order=None):
+    """
+    Superconvergent patch recovery (node-patch variant): for every node a linear
+    polynomial in (x - x_a, y - y_a) is least-squares fitted to the Gauss-point
+    stresses of the elements attached to the node and evaluated at the node.
+    Normal equations are accumulated for all nodes at once with np.bincount; nodes
+    whose patch is too small for a linear fit fall back to the patch mean.
+    Returns nodal stresses (Nnodes, 3).
+    """
+    Nn = xy.shape[0]
+    sig = element_stresses(xy, IEN, D, u, etype, order)             # (ne, nq, 3)
+    xs = sampling_points(xy, IEN, etype, order)                      # (ne, nq, 2)
+    ne, nq, _ = sig.shape
+    nen = IEN.shape[1]
+    h = np.sqrt(np.ptp(xy[:, 0])*np.ptp(xy[:, 1])/ne) or 1.0
+    d = (xs[:, :, None, :] - xy[IEN][:, None, :, :]) / h             # (ne, nq, nen, 2)
+    P = np.concatenate([np.ones(d.shape[:-1] + (1,)), d], axis=-1).reshape(-1, 3)
+    S = np.broadcast_to(sig[:, :, None, :], (ne, nq, nen, 3)).reshape(-1, 3)
+    node = np.broadcast_to(IEN[:, None, :], (ne, nq, nen)).ravel()
+
+    A = np.empty((Nn, 3, 3))
+    b = np.empty((Nn, 3, 3))
+    for i in range(3):
+        for j in range(i, 3):
+            A[:, i, j] = A[:, j, i] = np.bincount(node, weights=P[:, i]*P[:, j], minlength=Nn)
+        for k in range(3):
+            b[:, i, k] = np.bincount(node, weights=P[:, i]*S[:, k], minlength=Nn)
+
+    ok = np.linalg.cond(A) < 1e8
+    out = np.empty((Nn, 3))
+    out[ok] = np.linalg.solve(A[ok], b[ok])[:, 0, :]
+    npts = np.maximum(A[~ok, 0, 0], 1.0)
+    out[~ok] = b[~ok, 0, :] / npts[:, None]
+    return out
+
+@instrument('post.zz_error_indicator')
+def zz_error_indicator(xy, IEN, D, u, etype='Q4', t=1.0, order=None, return_energy=False):
+    """
+    Zienkiewicz-Zhu element error indicator in the energy norm,
+        eta_e^2 = int_e (sig* - sig_h)^T D^-1 (sig* - sig_h) t dA,
+    where sig* is the SPR nodal stress field interpolated with the element shape
+    functions and sig_h the finite-element stress, both at the quadrature points.
+    Returns eta (nelem,); with return_energy also the element energies
+    int_e sig_h^T D^-1 sig_h t dA (nelem,), so that a global relative error is
+    sqrt(sum eta^2 / (sum energy + sum eta^2)).
+    """
+    D = np.asarray(D, dtype=float)
+    sig_star = spr_nodal_stresses(xy, IEN, D, u, etype)
+    N = parent_tables(etype, order)[0]
+    _, wdet = gradients_batch(xy[IEN], etype, order)
+    wdet = wdet*np.reshape(np.asarray(t, dtype=float), (-1, 1))
+    sig_h = element_stresses(xy, IEN, D, u, etype, order)                 # (ne, nq, 3)
+    err = np.einsum('qa,eak->eqk', N, sig_star[IEN]) - sig_h
+    Dinv = np.linalg.inv(D)
+    eta = np.sqrt(np.einsum('eqk,kl,eql,eq->e', err, Dinv, err, wdet, optimize=True))
+    if not return_energy:
+        return eta
+    return eta, np.einsum('eqk,kl,eql,eq->e', sig_h, Dinv, sig_h, wdet, optimize=True)
+
+@instrument('post.nodal_von_mises')
+def nodal_von_mises(xy, IEN, D, u, etype='Q4', method='average'):
+    """
+    Nodal von Mises for Q4/T3/T6 plane-stress meshes.
+    method='average': element-center values averaged to nodes
+    method='spr':     von Mises of SPR-recovered nodal stresses
+    """
+    if method == 'spr':
+        return von_mises_plane_stress(spr_nodal_stresses(xy, IEN, D, u, etype))
+    vm_e = von_mises_plane_stress(element_stresses(xy, IEN, D, u, etype, 'centroid')[:, 0])
+    return nodal_average(vm_e, IEN, Nnodes=xy.shape[0])
+
+def nodal_von_mises_Q4(xy, IEN, D, u):
+    """Compute an approximate nodal von Mises by averaging element-center values."""
+    return nodal_von_mises(xy, IEN, D, u, etype='Q4')
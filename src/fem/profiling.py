@@ -0,0 +1,201 @@
+"""
+Opt-in stage instrumentation for the fem pipeline.
+
+    from fem import profiling
+    with profiling.profile() as report:
+        ...                                 # assemble / apply BCs / solve / post-process
+    print(report.summary())
+
+Instrumented functions record wall time, call count, output bytes, matrix nnz and
+(solvers) iterations per stage; track_memory=True adds tracemalloc peak bytes.
+Stages nest: 'wall' and 'peak_bytes' are inclusive of nested stages, 'self_wall'
+excludes them, so per-module sums (by_module) count every second once.
+When profiling is disabled each instrumented call costs one flag check.
+"""
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+import numpy as np
+import scipy.sparse as sp
+
+_enabled = False
+_track_memory = False
+_started_tracing = False
+_report = None
+_callbacks = []
+_lock = threading.Lock()
+_local = threading.local()
+
+class StageStats:
+    """Accumulated metrics of one stage."""
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.self_wall = 0.0
+        self.bytes = 0
+        self.peak_bytes = 0
+        self.nnz = 0
+        self.iterations = 0
+        self.extra = {}
+
+    def add(self, metrics):
+        self.calls += 1
+        for key, val in metrics.items():
+            if key == 'peak_bytes':
+                self.peak_bytes = max(self.peak_bytes, val)
+            elif key in ('wall', 'self_wall', 'bytes', 'nnz', 'iterations'):
+                setattr(self, key, getattr(self, key) + val)
+            else:
+                self.extra[key] = val
+
+    def as_dict(self):
+        d = {k: getattr(self, k) for k in ('calls', 'wall', 'self_wall', 'bytes', 'peak_bytes',
+                                           'nnz', 'iterations')}
+        d.update(self.extra)
+        return d
+
+class Report:
+    """Per-stage metrics keyed by 'module.function'."""
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, stage, metrics):
+        with _lock:
+            self.stages.setdefault(stage, StageStats()).add(metrics)
+
+    def as_dict(self):
+        return {name: s.as_dict() for name, s in self.stages.items()}
+
+    def by_module(self):
+        """
+        Self time (nested stages excluded) summed per module (elements, assembly, bc,
+        solvers, post, ...), so the modules add up to the instrumented total.
+        """
+        out = {}
+        for name, s in self.stages.items():
+            mod = name.split('.')[0]
+            out[mod] = out.get(mod, 0.0) + s.self_wall
+        return out
+
+    def summary(self):
+        rows = [f"{'stage':<40s}{'calls':>7s}{'self [s]':>11s}{'wall [s]':>11s}{'MB out':>9s}"
+                f"{'nnz':>11s}{'iters':>7s}"]
+        for name, s in sorted(self.stages.items(), key=lambda kv: -kv[1].self_wall):
+            rows.append(f"{name:<40s}{s.calls:>7d}{s.self_wall:>11.4f}{s.wall:>11.4f}"
+                        f"{s.bytes/2**20:>9.2f}{s.nnz:>11d}{s.iterations:>7d}")
+        return "\n".join(rows)
+
+def enable(track_memory=False):
+    """Start recording into a fresh Report (returned)."""
+    global _enabled, _track_memory, _started_tracing, _report
+    _report = Report()
+    _track_memory = track_memory
+    _started_tracing = track_memory and not tracemalloc.is_tracing()
+    if _started_tracing:
+        tracemalloc.start()
+    _enabled = True
+    return _report
+
+def disable():
+    """Stop recording; returns the Report collected since enable()."""
+    global _enabled, _started_tracing
+    _enabled = False
+    if _started_tracing and tracemalloc.is_tracing():
+        tracemalloc.stop()       # only tracing that enable() started; a caller's keeps running
+    _started_tracing = False
+    return _report
+
+def is_enabled():
+    return _enabled
+
+@contextmanager
+def profile(track_memory=False):
+    """Context manager: enable profiling for the block and yield the Report."""
+    report = enable(track_memory)
+    try:
+        yield report
+    finally:
+        disable()
+
+def register_callback(fn):
+    """fn(stage, metrics_dict) is called after every instrumented call while enabled."""
+    _callbacks.append(fn)
+    return fn
+
+def unregister_callback(fn):
+    _callbacks.remove(fn)
+
+def annotate(**metrics):
+    """Attach metrics (e.g. iterations=...) to the innermost running stage; no-op if disabled."""
+    stack = getattr(_local, 'stack', None)
+    if _enabled and stack:
+        stack[-1].metrics.update(metrics)
+
+def record(stage, **metrics):
+    """Record a stage event directly (for code that is not wrapped by instrument)."""
+    if not _enabled:
+        return
+    _report.add(stage, metrics)
+    for cb in _callbacks:
+        cb(stage, metrics)
+
+def _output_metrics(result, metrics):
+    for r in (result if isinstance(result, tuple) else (result,)):
+        if sp.issparse(r):
+            metrics['nnz'] = metrics.get('nnz', 0) + r.nnz
+            metrics['bytes'] = metrics.get('bytes', 0) + r.data.nbytes
+        elif isinstance(r, np.ndarray):
+            metrics['bytes'] = metrics.get('bytes', 0) + r.nbytes
+
+class _Frame:
+    """A running instrumented call: its metrics, nested wall time and running memory peak."""
+    __slots__ = ('metrics', 'child_wall', 'mem0', 'peak')
+
+    def __init__(self):
+        self.metrics = {}
+        self.child_wall = 0.0
+        self.mem0 = self.peak = 0
+
+def _fold_peak(stack):
+    """Fold the tracemalloc peak since the last reset into the innermost frame, then reset."""
+    if stack:
+        stack[-1].peak = max(stack[-1].peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+
+def instrument(stage):
+    """Decorator recording `stage` metrics for each call while profiling is enabled."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            stack = _local.__dict__.setdefault('stack', [])
+            frame = _Frame()
+            if _track_memory:
+                _fold_peak(stack)
+                frame.mem0 = frame.peak = tracemalloc.get_traced_memory()[0]
+            stack.append(frame)
+            t0 = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                wall = time.perf_counter() - t0
+                stack.pop()
+                if stack:
+                    stack[-1].child_wall += wall
+            metrics = frame.metrics
+            metrics['wall'] = wall
+            metrics['self_wall'] = max(wall - frame.child_wall, 0.0)
+            if _track_memory:
+                peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+                metrics['peak_bytes'] = peak - frame.mem0
+                if stack:
+                    stack[-1].peak = max(stack[-1].peak, peak)
+                tracemalloc.reset_peak()
+            _output_metrics(result, metrics)
+            record(stage, **metrics)
+            return result
+        return wrapper
+    return deco
@@ -1,37 +1,166 @@
+"""
+Quadrature rules on the parent domains, built once and cached.
+
+Every rule is returned as read-only (points, weights) arrays that are shared between
+callers, so element routines can ask for a rule per call without rebuilding it:
+
+    gauss_legendre_1D(n)   n-point Gauss-Legendre on [-1, 1] (numpy leggauss), any n
+    gauss_quad(n)          n x n tensor-product Gauss on [-1, 1]^2
+    dunavant(degree)       symmetric triangle rule exact for polynomials of `degree`
+                           on the reference triangle (xi, eta >= 0, xi + eta <= 1)
+
+Rule(family, n) names a registered rule by value (hashable), so it can be passed as
+the `order` of the element kernels and used as a cache key; new families are added
+with register_rule.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
 import numpy as np
 
+def _frozen(pts, wts):
+    pts = np.array(pts, dtype=float)
+    wts = np.array(wts, dtype=float)
+    pts.flags.writeable = False
+    wts.flags.writeable = False
+    return pts, wts
+
+@lru_cache(maxsize=None)
 def gauss_legendre_1D(n):
-    if n == 1:
-        return np.array([0.0]), np.array([2.0])
-    if n == 2:
-        a = 1/np.sqrt(3)
-        return np.array([-a, a]), np.array([1.0, 1.0])
-    if n == 3:
-        a = np.sqrt(3/5)
-        return np.array([-a, 0.0, a]), np.array([5/9, 8/9, 5/9])
-    raise ValueError("Only n=1..3 supported")
+    """n-point Gauss-Legendre points (n,) and weights (n,) on [-1, 1]; exact to degree 2n-1."""
+    if int(n) < 1:
+        raise ValueError("Gauss-Legendre rule needs n >= 1")
+    return _frozen(*np.polynomial.legendre.leggauss(int(n)))
+
+@lru_cache(maxsize=None)
+def gauss_quad(n):
+    """n x n tensor-product Gauss rule: points (n*n, 2) with eta fastest, weights (n*n,)."""
+    x, w = gauss_legendre_1D(n)
+    X, Y = np.meshgrid(x, x, indexing='ij')
+    return _frozen(np.column_stack([X.ravel(), Y.ravel()]), np.outer(w, w).ravel())
 
 def gauss_quad_2x2():
     """2x2 Gauss for Q4"""
-    xi1d, w1d = gauss_legendre_1D(2)
-    pts = []
-    wts = []
-    for i,x in enumerate(xi1d):
-        for j,y in enumerate(xi1d):
-            pts.append((x,y))
-            wts.append(w1d[i]*w1d[j])
-    return np.array(pts), np.array(wts)
+    return gauss_quad(2)
+
+# Dunavant (1985) symmetric rules: degree -> orbits (barycentric point, weight).
+# Weights are normalized to sum to 1 (scaled by the reference area 1/2 on use);
+# every permutation of each barycentric point carries the listed weight.
+_DUNAVANT = {
+    1: [((1/3, 1/3, 1/3), 1.0)],
+    2: [((2/3, 1/6, 1/6), 1/3)],
+    3: [((1/3, 1/3, 1/3), -0.5625),
+        ((0.6, 0.2, 0.2), 25/48)],
+    4: [((0.108103018168070, 0.445948490915965, 0.445948490915965), 0.223381589678011),
+        ((0.816847572980459, 0.091576213509771, 0.091576213509771), 0.109951743655322)],
+    5: [((1/3, 1/3, 1/3), 0.225),
+        ((0.059715871789770, 0.470142064105115, 0.470142064105115), 0.132394152788506),
+        ((0.797426985353087, 0.101286507323456, 0.101286507323456), 0.125939180544827)],
+    6: [((0.501426509658179, 0.249286745170910, 0.249286745170910), 0.116786275726379),
+        ((0.873821971016996, 0.063089014491502, 0.063089014491502), 0.050844906370207),
+        ((0.053145049844817, 0.310352451033784, 0.636502499121399), 0.082851075618374)],
+    8: [((1/3, 1/3, 1/3), 0.144315607677787),
+        ((0.081414823414554, 0.459292588292723, 0.459292588292723), 0.095091634267285),
+        ((0.658861384496480, 0.170569307751760, 0.170569307751760), 0.103217370534718),
+        ((0.898905543365938, 0.050547228317031, 0.050547228317031), 0.032458497623198),
+        ((0.008394777409958, 0.263112829634638, 0.728492392955404), 0.027230314174435)],
+}
+
+def _orbit(L):
+    """Distinct permutations of a barycentric point."""
+    a, b, c = L
+    perms = {(a, b, c), (a, c, b), (b, a, c), (b, c, a), (c, a, b), (c, b, a)}
+    return sorted(perms, reverse=True)
+
+def _collapsed_triangle(degree):
+    """Duffy-collapsed Gauss product rule exact to `degree` (used above the tabulated range)."""
+    n = (degree + 3)//2
+    x, w = gauss_legendre_1D(n)
+    u, wu = 0.5*(x + 1), 0.5*w
+    U, V = np.meshgrid(u, u, indexing='ij')
+    W = np.outer(wu, wu)*(1 - U)
+    return np.column_stack([U.ravel(), ((1 - U)*V).ravel()]), W.ravel()
+
+@lru_cache(maxsize=None)
+def dunavant(degree):
+    """
+    Triangle rule exact for total degree `degree`: points (nqp, 2) as (xi, eta), weights
+    summing to the reference area 1/2. Dunavant rules for degree 1-6 and 8 (7 uses 8);
+    higher degrees fall back to a collapsed Gauss product rule with positive weights.
+    """
+    degree = int(degree)
+    if degree < 1:
+        raise ValueError("triangle rule needs degree >= 1")
+    if degree == 7:
+        degree = 8
+    if degree not in _DUNAVANT:
+        return _frozen(*_collapsed_triangle(degree))
+    pts, wts = [], []
+    for L, w in _DUNAVANT[degree]:
+        for p in _orbit(L):
+            pts.append((p[1], p[2]))
+            wts.append(0.5*w)
+    return _frozen(pts, wts)
 
 def triangle_area_rule(order=1):
     """
     Simple area rules on reference triangle (xi>=0, eta>=0, xi+eta<=1).
     order=1: one-point rule at (1/3,1/3) with weight 1/2
     order=3: three-point rule at (1/6,1/6),(2/3,1/6),(1/6,2/3), each weight 1/6
+    Higher-degree rules: dunavant(degree).
     """
     if order == 1:
-        return np.array([[1/3, 1/3]]), np.array([0.5])
+        return dunavant(1)
     if order == 3:
-        pts = np.array([[1/6, 1/6],[2/3, 1/6],[1/6, 2/3]])
-        wts = np.array([1/6, 1/6, 1/6])
-        return pts, wts
+        return _THREE_POINT
     raise ValueError("triangle_area_rule supports order=1 or 3")
+
+_THREE_POINT = _frozen([[1/6, 1/6], [2/3, 1/6], [1/6, 2/3]], [1/6, 1/6, 1/6])
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+_FAMILIES = {
+    'gauss': gauss_legendre_1D,
+    'gauss2': gauss_quad,
+    'dunavant': dunavant,
+}
+
+_RULE_CACHES = []    # lru_caches of tables keyed by Rule (elements.parent_tables)
+
+def register_rule(family, builder):
+    """
+    Register builder(n) -> (points, weights) under `family` (results are cached).
+    Re-registering a family clears the rule cache and every table built from rules.
+    """
+    _FAMILIES[family] = builder
+    get_rule.cache_clear()
+    for cache in _RULE_CACHES:
+        cache.cache_clear()
+
+@lru_cache(maxsize=None)
+def get_rule(family, n):
+    """Cached read-only (points, weights) of a registered rule family."""
+    if family not in _FAMILIES:
+        raise ValueError(f"Unknown quadrature family {family!r}")
+    return _frozen(*_FAMILIES[family](n))
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Hashable handle of a registered rule, e.g. Rule('gauss2', 3) for 3x3 Gauss or
+    Rule('dunavant', 4); unpacks as points, weights = Rule(...).
+    """
+    family: str
+    n: int
+
+    @property
+    def points(self):
+        return get_rule(self.family, self.n)[0]
+
+    @property
+    def weights(self):
+        return get_rule(self.family, self.n)[1]
+
+    def __iter__(self):
+        return iter(get_rule(self.family, self.n))
@@ -73,3 +73,52 @@ def shape_T6(xi, eta):
     ], dtype=float)
 
     return N, dN_dxi, dN_deta
+
+# Quadratic quads: corners 1-4 ccw, then mids of 1-2, 2-3, 3-4, 4-1 (and centre for Q9),
+# the same node order as Gmsh and VTK.
+_QUAD_XI  = np.array([-1.0, 1.0, 1.0, -1.0, 0.0, 1.0, 0.0, -1.0, 0.0])
+_QUAD_ETA = np.array([-1.0, -1.0, 1.0, 1.0, -1.0, 0.0, 1.0, 0.0, 0.0])
+
+def shape_Q8(xi, eta):
+    """
+    Serendipity quad (Q8). Corners: N = (1+xi xi_a)(1+eta eta_a)(xi xi_a + eta eta_a - 1)/4,
+    mids on xi_a=0: (1-xi^2)(1+eta eta_a)/2, mids on eta_a=0: (1+xi xi_a)(1-eta^2)/2.
+    Returns N(8,), dN_dxi(8,), dN_deta(8,); arrays of points give (..., 8).
+    """
+    xi = np.asarray(xi, dtype=float)[..., None]
+    eta = np.asarray(eta, dtype=float)[..., None]
+    xa, ea = _QUAD_XI[:8], _QUAD_ETA[:8]
+    px, pe = 1 + xi*xa, 1 + eta*ea
+    mx, me = xa == 0, ea == 0                       # mids on xi_a = 0 / eta_a = 0
+    N = np.where(mx, 0.5*(1 - xi**2)*pe,
+                 np.where(me, 0.5*px*(1 - eta**2), 0.25*px*pe*(xi*xa + eta*ea - 1)))
+    dN_dxi = np.where(mx, -xi*pe,
+                      np.where(me, 0.5*xa*(1 - eta**2), 0.25*xa*pe*(2*xi*xa + eta*ea)))
+    dN_deta = np.where(mx, 0.5*(1 - xi**2)*ea,
+                       np.where(me, -eta*px, 0.25*ea*px*(xi*xa + 2*eta*ea)))
+    return N, dN_dxi, dN_deta
+
+def _lagrange3(s, sa):
+    """1D quadratic Lagrange functions on nodes -1, 0, 1 evaluated for node coords sa."""
+    l = np.where(sa == 0, 1 - s**2, 0.5*s*(s + sa))
+    dl = np.where(sa == 0, -2*s, s + 0.5*sa)
+    return l, dl
+
+def shape_Q9(xi, eta):
+    """
+    Biquadratic Lagrange quad (Q9): N_a = l_a(xi) l_a(eta), node order as Q8 plus the centre.
+    Returns N(9,), dN_dxi(9,), dN_deta(9,); arrays of points give (..., 9).
+    """
+    lx, dlx = _lagrange3(np.asarray(xi, dtype=float)[..., None], _QUAD_XI)
+    le, dle = _lagrange3(np.asarray(eta, dtype=float)[..., None], _QUAD_ETA)
+    return lx*le, dlx*le, lx*dle
+
+_EDGE_XI = np.array([-1.0, 1.0, 0.0])
+
+def shape_L2(xi):
+    """Linear 2-node edge on [-1, 1]. Returns N (2,), dN_dxi (2,)."""
+    return np.array([0.5*(1 - xi), 0.5*(1 + xi)]), np.array([-0.5, 0.5])
+
+def shape_L3(xi):
+    """Quadratic 3-node edge on [-1, 1], node order (end, end, mid) as mesh edge sets."""
+    return _lagrange3(xi, _EDGE_XI)
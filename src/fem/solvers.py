@@ -0,0 +1,285 @@
+import time
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+import numpy as np
+import scipy.linalg as sla
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from .profiling import instrument, annotate
+
+DENSE_MAX_DOFS = 4000       # auto: dense LAPACK below this size (dense input only)
+DIRECT_MAX_DOFS = 250_000   # auto: sparse direct below this size, preconditioned CG above
+
+@dataclass
+class SolveInfo:
+    method: str
+    iterations: int
+    residual: float          # ||f - K u|| / ||f||
+    time: float              # wall seconds (factorization + solve)
+    converged: bool = True
+
+class Factorization:
+    """
+    Reusable factorization of K; solve(b) accepts b of shape (N,) or (N, nrhs).
+    method: 'splu' (SuperLU), 'cholesky' (CHOLMOD via scikit-sparse when available,
+    otherwise SuperLU in symmetric mode; LAPACK Cholesky for dense K) or 'dense' (LAPACK LU).
+    permc_spec: SuperLU column ordering override, e.g. 'NATURAL' to keep a fill-reducing
+    node ordering from fem.reorder (default: COLAMD for splu, MMD_AT_PLUS_A for cholesky).
+    """
+    @instrument('solvers.Factorization.__init__')
+    def __init__(self, K, method='splu', permc_spec=None):
+        t0 = time.perf_counter()
+        self.method = method
+        self.K = K
+        self.shape = K.shape
+        if method == 'dense':
+            self._lu = sla.lu_factor(K.toarray() if sp.issparse(K) else K)
+            self._solve = lambda b: sla.lu_solve(self._lu, b)
+            self.nbytes = self._lu[0].nbytes
+        elif method == 'cholesky' and not sp.issparse(K):
+            self._c = sla.cho_factor(K)
+            self._solve = lambda b: sla.cho_solve(self._c, b)
+            self.nbytes = self._c[0].nbytes
+        elif method == 'cholesky' and _cholmod() is not None:
+            self._f = _cholmod()(K.tocsc())
+            self._solve = self._f
+            L = self._f.L()
+            self.nbytes = L.data.nbytes + L.indices.nbytes
+        elif method in ('splu', 'cholesky'):
+            opts = dict(permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.0,
+                        options=dict(SymmetricMode=True)) if method == 'cholesky' else {}
+            if permc_spec is not None:
+                opts['permc_spec'] = permc_spec
+            self._lu = spla.splu(sp.csc_matrix(K), **opts)
+            self._solve = self._lu.solve
+            self.nbytes = (self._lu.L.nnz + self._lu.U.nnz)*12
+        else:
+            raise ValueError(f"Unknown factorization method {method!r}")
+        self.time = time.perf_counter() - t0
+
+    def solve(self, b):
+        b = np.asarray(b, dtype=float)
+        return self._solve(b)
+
+def factorize(K, method='splu', permc_spec=None):
+    """Factor K once; returns a Factorization reusable for many right-hand sides."""
+    return Factorization(K, method, permc_spec)
+
+def _cholmod():
+    try:
+        from sksparse.cholmod import cholesky
+    except ImportError:
+        return None
+    return cholesky
+
+def preconditioner(K, kind='jacobi', **opts):
+    """
+    Preconditioner M ~ K^-1 as a LinearOperator, or None for kind=None.
+    'jacobi': inverse diagonal
+    'ilu':    scipy spilu incomplete factorization (stands in for incomplete Cholesky,
+              which scipy does not provide); opts: drop_tol, fill_factor
+    'amg':    smoothed-aggregation AMG V-cycle (requires pyamg)
+    """
+    if kind is None:
+        return None
+    N = K.shape[0]
+    if kind == 'jacobi':
+        dinv = 1.0/K.diagonal()
+        return spla.LinearOperator((N, N), matvec=lambda x: dinv*x.ravel(), dtype=float)
+    if kind == 'ilu':
+        ilu = spla.spilu(sp.csc_matrix(K), drop_tol=opts.get('drop_tol', 1e-4),
+                         fill_factor=opts.get('fill_factor', 10))
+        return spla.LinearOperator((N, N), matvec=ilu.solve, dtype=float)
+    if kind == 'amg':
+        try:
+            import pyamg
+        except ImportError as exc:
+            raise ImportError("precond='amg' requires pyamg") from exc
+        return pyamg.smoothed_aggregation_solver(sp.csr_matrix(K)).aspreconditioner()
+    raise ValueError(f"Unknown preconditioner {kind!r}")
+
+def select_method(K):
+    """Automatic backend choice by storage and problem size."""
+    N = K.shape[0]
+    if isinstance(K, spla.LinearOperator):
+        return 'cg'                     # matrix-free: only the action K @ x is available
+    if not sp.issparse(K):
+        return 'dense' if N <= DENSE_MAX_DOFS else 'splu'
+    return 'splu' if N <= DIRECT_MAX_DOFS else 'cg'
+
+def _residual(K, f, u):
+    nf = np.linalg.norm(f)
+    r = np.linalg.norm(f - K @ u)
+    return r/nf if nf > 0 else r
+
+@instrument('solvers.solve')
+def solve(K, f, method='auto', precond='jacobi', tol=1e-10, maxiter=None, x0=None,
+          return_info=False):
+    """
+    Solve K u = f.
+    K: dense array, scipy.sparse matrix, Factorization or LinearOperator (iterative only)
+    f: (N,) or (N, nrhs)
+    method: 'auto', 'dense', 'spsolve', 'splu', 'cholesky', 'cg', 'minres'
+    precond: for 'cg'/'minres': 'jacobi', 'ilu', 'amg', None, or a LinearOperator
+    Returns u, or (u, SolveInfo) if return_info.
+    """
+    t0 = time.perf_counter()
+    f = np.asarray(f, dtype=float)
+    iters = 0
+    converged = True
+    if isinstance(K, Factorization):
+        method, u = K.method, K.solve(f)
+    else:
+        if method == 'auto':
+            method = select_method(K)
+        if method == 'spsolve':
+            u = spla.spsolve(sp.csc_matrix(K), f)
+        elif method in ('dense', 'splu', 'cholesky'):
+            if method == 'dense' and not sp.issparse(K):
+                u = np.linalg.solve(K, f)
+            else:
+                u = Factorization(K, method).solve(f)
+        elif method in ('cg', 'minres'):
+            M = precond if isinstance(precond, spla.LinearOperator) else preconditioner(K, precond)
+            krylov = spla.cg if method == 'cg' else spla.minres
+            cols = f.reshape(f.shape[0], -1)
+            x0s = None if x0 is None else np.asarray(x0, dtype=float).reshape(cols.shape)
+            u = np.empty_like(cols)
+            for j in range(cols.shape[1]):
+                count = [0]
+                def cb(xk):
+                    count[0] += 1
+                u[:, j], status = krylov(K, cols[:, j], x0=None if x0s is None else x0s[:, j],
+                                         rtol=tol, maxiter=maxiter, M=M, callback=cb)
+                iters += count[0]
+                converged &= status == 0
+            u = u.reshape(f.shape)
+        else:
+            raise ValueError(f"Unknown solver method {method!r}")
+    annotate(iterations=iters)
+    if not return_info:
+        return u
+    A = K.K if isinstance(K, Factorization) else K
+    info = SolveInfo(method, iters, _residual(A, f, u), time.perf_counter() - t0, bool(converged))
+    return u, info
+
+# ---------------------------------------------------------------------------
+# Factorization reuse across load cases / parametric re-solves
+# ---------------------------------------------------------------------------
+
+def array_key(*parts):
+    """
+    Stable content hash of arrays, sparse matrices and scalars, e.g.
+    array_key(xy, IEN, D, t, fixed_dofs) for a (mesh, material, BC) cache key.
+    """
+    h = hashlib.sha1()
+    for p in parts:
+        if sp.issparse(p):
+            p = p.tocsr()
+            parts_ = (np.asarray(p.shape), p.indptr, p.indices, p.data)
+        else:
+            parts_ = (p,)
+        for a in parts_:
+            a = np.ascontiguousarray(a)
+            h.update(f"{a.dtype}{a.shape}".encode())
+            h.update(a.tobytes())
+    return h.hexdigest()
+
+class FactorCache:
+    """
+    LRU cache of factorizations, evicted oldest-first to stay within max_bytes.
+    Entries are stored with their memory footprint (Factorization.nbytes by default).
+    """
+    def __init__(self, max_bytes=2**30, max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (value, nbytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, nbytes=None):
+        self.invalidate(key)
+        nbytes = int(value.nbytes if nbytes is None else nbytes)
+        self._entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+        while len(self._entries) > 1 and (self.nbytes > self.max_bytes or
+              (self.max_entries is not None and len(self._entries) > self.max_entries)):
+            _, (_, nb) = self._entries.popitem(last=False)
+            self.nbytes -= nb
+
+    def invalidate(self, key=None):
+        """Drop one entry, or everything when key is None."""
+        if key is None:
+            self._entries.clear()
+            self.nbytes = 0
+        elif key in self._entries:
+            self.nbytes -= self._entries.pop(key)[1]
+
+class SolverSession:
+    """
+    Factor a (constrained) stiffness once and solve many right-hand sides as a block.
+
+    K:      global matrix, or a zero-argument callable building it (only called on a
+            cache miss, so cached sessions skip assembly as well as factorization)
+    bc:     optional fem.bc.Dirichlet; the reduced K_ff is factored and prescribed
+            values are lifted through K_fc
+    cache:  optional FactorCache shared between sessions; key identifies the system
+            (e.g. array_key(xy, IEN, D, t, bc.fixed)); defaults to a hash of K
+    """
+    def __init__(self, K, bc=None, method='splu', cache=None, key=None):
+        self.bc = bc
+        self.method = method
+        self.cache = cache
+        self.key = key
+        entry = cache.get(key) if (cache is not None and key is not None) else None
+        if entry is None:
+            K = K() if callable(K) else K
+            if cache is not None and key is None:
+                self.key = key = array_key(K, *(() if bc is None else (bc.fixed,)))
+                entry = cache.get(key)
+        if entry is None:
+            if bc is None:
+                K_ff, K_fc = K, None
+            else:
+                K_ff, K_fc = bc.blocks(K)
+            fact = Factorization(K_ff, method)
+            nbytes = fact.nbytes + (0 if K_fc is None else matrix_nbytes(K_fc))
+            entry = (fact, K_fc)
+            if cache is not None:
+                cache.put(key, entry, nbytes)
+        self.factorization, self._K_fc = entry
+        self.nsolves = 0
+
+    def solve(self, F, values=0.0):
+        """F: (N,) or (N, nrhs) -> U of the same shape (one triangular solve per column)."""
+        F = np.asarray(F, dtype=float)
+        self.nsolves += 1 if F.ndim == 1 else F.shape[1]
+        if self.bc is None:
+            return self.factorization.solve(F)
+        lift = self._K_fc @ self.bc.prescribed(values)
+        rhs = F[self.bc.free] - (lift[:, None] if F.ndim == 2 else lift)
+        return self.bc.expand(self.factorization.solve(rhs), values)
+
+def matrix_nbytes(A):
+    """Memory footprint of a dense or sparse (counted as CSR) matrix, e.g. for FactorCache.put."""
+    if sp.issparse(A):
+        A = A.tocsr()
+        return A.data.nbytes + A.indices.nbytes + A.indptr.nbytes
+    return np.asarray(A).nbytes
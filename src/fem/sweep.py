@@ -0,0 +1,245 @@
+"""
+Parameter sweeps / design studies over a process pool.
+
+A sweep is a list of parameter dicts (see grid) and a problem builder: a picklable
+module-level function builder(**params) -> Problem. Cases are grouped into tasks
+(by the `group` parameters, or in consecutive chunks) and each task runs in one
+worker, which keeps per-process caches: a DofMap per mesh and a FactorCache of
+constrained factorizations, so cases on the same mesh share the DOF map and CSR
+pattern, and cases that differ only in the right-hand side share the factorization.
+
+Every finished case is written by its worker to its own part file,
+
+    path/
+      cases.json             the parameter list (checked on resume)
+      part-000012.npz        outputs of case 12, written atomically
+
+so a crashed or interrupted sweep is resumed by running it again: cases whose part
+file exists are skipped. SweepStore.columns() gathers the parts into columns.
+"""
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+import numpy as np
+from .dofmap import DofMap
+from .bc import Dirichlet
+from .solvers import FactorCache, SolverSession, array_key
+from .profiling import instrument
+
+def grid(**axes):
+    """Cartesian product of parameter axes, last axis fastest: grid(E=[..], t=[..]) -> [dict]."""
+    names = list(axes)
+    return [dict(zip(names, vals)) for vals in itertools.product(*axes.values())]
+
+@dataclass
+class Problem:
+    """
+    One linear case  K u = F  with K = sum of kernel(xy[IEN]) element matrices.
+    kernel:     batched element kernel of xy_el (e.g. functools.partial(
+                K_structural_Q4_batch, D=D, t=t)); only called when K is not cached
+    fixed, values: prescribed DOFs and their values (bc.Dirichlet order)
+    mesh_key:   identifies the mesh (default: hash of xy, IEN)
+    system_key: identifies K for a mesh (e.g. (E, nu, t)); default: hash of assembled K
+    outputs:    u -> dict of arrays/scalars to store (default {'u': u})
+    """
+    xy: Any
+    IEN: Any
+    kernel: Callable
+    F: Any
+    fixed: Any
+    values: Any = 0.0
+    ndofs_per_node: int = 2
+    mesh_key: Any = None
+    system_key: Any = None
+    outputs: Optional[Callable] = None
+
+class _Cache:
+    """Per-process DofMaps, Dirichlet partitions and factorizations."""
+    def __init__(self, max_bytes=2**30):
+        self.dofmaps = {}
+        self.bcs = {}
+        self.factors = FactorCache(max_bytes)
+
+_process_cache = None
+
+def _worker_cache():
+    global _process_cache
+    if _process_cache is None:
+        _process_cache = _Cache()
+    return _process_cache
+
+def solve_problem(p, cache, method='splu'):
+    """
+    Solve Problem p with the DofMap / factorization caches of cache (a _Cache).
+    Returns (outputs dict, info) with info flags 'dofmap', 'assembled', 'factored'
+    telling which of the three were built for this case rather than reused.
+    """
+    info = {'dofmap': False, 'assembled': False, 'factored': False}
+    mkey = p.mesh_key if p.mesh_key is not None else array_key(p.xy, p.IEN)
+    dm = cache.dofmaps.get(mkey)
+    if dm is None:
+        dm = cache.dofmaps[mkey] = DofMap(p.IEN, p.ndofs_per_node, Nnodes=len(p.xy))
+        info['dofmap'] = True
+    fixed = np.asarray(p.fixed, dtype=int).ravel()
+    bkey = (mkey, array_key(fixed))
+    bc = cache.bcs.get(bkey)
+    if bc is None:
+        bc = cache.bcs[bkey] = Dirichlet(dm.N, fixed)
+
+    def assemble():
+        info['assembled'] = True
+        return dm.assemble(p.kernel(np.asarray(p.xy)[dm.IEN]))
+    key = None if p.system_key is None else (bkey, p.system_key)
+    misses = cache.factors.misses
+    session = SolverSession(assemble if key is not None else assemble(), bc, method,
+                            cache.factors, key)
+    info['factored'] = cache.factors.misses > misses
+    u = session.solve(p.F, p.values)
+    return ({'u': u} if p.outputs is None else p.outputs(u)), info
+
+def _part(path, index):
+    return os.path.join(path, f"part-{index:06d}.npz")
+
+def _run_task(builder, tasks, path, method, cache=None):
+    """
+    Run (index, params) cases in order. With a path each case is written to its part
+    file and not returned; returns [(index, info, outputs or None)].
+    """
+    cache = _worker_cache() if cache is None else cache
+    done = []
+    for index, params in tasks:
+        out, info = solve_problem(builder(**params), cache, method)
+        if path is not None:
+            tmp = _part(path, index) + '.tmp'
+            with open(tmp, 'wb') as fh:
+                np.savez(fh, **{k: np.asarray(v) for k, v in out.items()})
+            os.replace(tmp, _part(path, index))
+        done.append((index, info, None if path is not None else out))
+    return done
+
+def _jsonable(o):
+    if isinstance(o, np.generic):
+        return o.item()
+    raise TypeError(f"sweep parameter {o!r} is not JSON serializable")
+
+def _columns(cases, indices, rows):
+    cols = {'index': np.asarray(indices, dtype=int)}
+    for name in (cases[0] if cases else {}):
+        cols[name] = np.asarray([cases[i][name] for i in indices])
+    for name in (rows[0] if rows else {}):
+        cols[name] = np.stack([np.asarray(r[name]) for r in rows])
+    return cols
+
+class SweepStore:
+    """
+    Directory of per-case part files for a fixed parameter list.
+    Opening an existing directory checks that it was written for the same cases.
+    """
+    def __init__(self, path, cases=None):
+        self.path = path
+        cpath = os.path.join(path, 'cases.json')
+        if os.path.exists(cpath):
+            with open(cpath) as fh:
+                stored = json.load(fh)
+            if cases is not None and stored != json.loads(json.dumps(cases, default=_jsonable)):
+                raise ValueError(f"{path} holds results of a different sweep")
+            self.cases = stored
+        else:
+            if cases is None:
+                raise FileNotFoundError(cpath)
+            os.makedirs(path, exist_ok=True)
+            tmp = cpath + '.tmp'
+            with open(tmp, 'w') as fh:
+                json.dump(cases, fh, default=_jsonable)
+            os.replace(tmp, cpath)
+            self.cases = json.loads(json.dumps(cases, default=_jsonable))
+
+    def done(self):
+        """Indices of the cases whose results are on disk."""
+        return [i for i in range(len(self.cases)) if os.path.exists(_part(self.path, i))]
+
+    def load(self, index):
+        """Outputs of one case as a dict of arrays."""
+        with np.load(_part(self.path, index)) as z:
+            return {k: z[k] for k in z.files}
+
+    def columns(self, indices=None):
+        """
+        {'index', parameter names..., output names...} columns over the finished cases
+        (or indices): parameters as (ncases,) arrays, outputs stacked along axis 0.
+        """
+        indices = self.done() if indices is None else list(indices)
+        return _columns(self.cases, indices, [self.load(i) for i in indices])
+
+class Sweep:
+    """
+    builder: picklable builder(**params) -> Problem
+    cases:   list of parameter dicts (e.g. grid(E=..., t=..., P=...))
+    path:    optional SweepStore directory; results are streamed there and the sweep
+             resumes from it. Without a path results are collected in memory.
+    """
+    def __init__(self, builder, cases, path=None, method='splu'):
+        self.builder = builder
+        self.cases = list(cases)
+        self.path = path
+        self.method = method
+        self.store = None if path is None else SweepStore(path, self.cases)
+        self.results = {}
+        self.stats = {'cases': 0, 'dofmap': 0, 'assembled': 0, 'factored': 0}
+
+    def tasks(self, group=None, chunk_size=8, todo=None):
+        """
+        Split case indices into tasks. group: parameter names whose values select the
+        system (mesh, material, thickness...); each distinct value set is one task.
+        Otherwise consecutive chunks of chunk_size cases.
+        """
+        todo = range(len(self.cases)) if todo is None else todo
+        if group is None:
+            todo = list(todo)
+            return [todo[s:s + chunk_size] for s in range(0, len(todo), chunk_size)]
+        buckets = {}
+        for i in todo:
+            k = json.dumps([self.cases[i][g] for g in group], default=_jsonable)
+            buckets.setdefault(k, []).append(i)
+        return list(buckets.values())
+
+    def _collect(self, done):
+        for index, info, out in done:
+            self.stats['cases'] += 1
+            for k in ('dofmap', 'assembled', 'factored'):
+                self.stats[k] += info[k]
+            if out is not None:
+                self.results[index] = out
+
+    @instrument('sweep.Sweep.run')
+    def run(self, n_workers=None, group=None, chunk_size=8, resume=True):
+        """
+        Run all outstanding cases; n_workers=1 runs in this process. Returns the result
+        columns (SweepStore.columns, or the same layout built in memory).
+        resume=False recomputes cases whose part files already exist.
+        """
+        done = set(self.store.done()) if (self.store is not None and resume) else set()
+        todo = [i for i in range(len(self.cases)) if i not in done]
+        tasks = [[(i, self.cases[i]) for i in t] for t in self.tasks(group, chunk_size, todo)]
+        n_workers = n_workers or os.cpu_count() or 1
+        if n_workers == 1:
+            cache = _Cache()
+            for t in tasks:
+                self._collect(_run_task(self.builder, t, self.path, self.method, cache))
+        elif tasks:
+            with ProcessPoolExecutor(min(n_workers, len(tasks))) as pool:
+                futures = [pool.submit(_run_task, self.builder, t, self.path, self.method)
+                           for t in tasks]
+                for fut in as_completed(futures):
+                    self._collect(fut.result())
+        return self.columns()
+
+    def columns(self):
+        """Result columns of the finished cases, from the store or from memory."""
+        if self.store is not None:
+            return self.store.columns()
+        indices = sorted(self.results)
+        return _columns(self.cases, indices, [self.results[i] for i in indices])
@@ -0,0 +1,97 @@
+"""
+First-order transient problems  C du/dt + K u = F(t)  (heat conduction).
+
+theta-method with constant dt:
+    (C/dt + theta K) u_{n+1} = (C/dt - (1-theta) K) u_n + theta F_{n+1} + (1-theta) F_n
+theta = 1: backward Euler, 1/2: Crank-Nicolson, 0: forward Euler (use lumped C).
+The left-hand matrix is factored once; each step costs one sparse mat-vec and one
+forward/back substitution. Histories are written row by row to a Store memmap (or
+handed to a callback) every `stride` steps instead of being accumulated in memory.
+"""
+import numpy as np
+import scipy.sparse as sp
+from .solvers import Factorization
+from .profiling import instrument
+
+BACKWARD_EULER = 1.0
+CRANK_NICOLSON = 0.5
+
+class ThetaMethod:
+    """
+    K, C: (N, N) sparse stiffness/conductance and capacitance matrices.
+    bc: optional bc.Dirichlet; prescribed values are passed to step()/run().
+    method: factorization of the left-hand matrix ('splu', 'cholesky', 'dense').
+    """
+    @instrument('transient.ThetaMethod.__init__')
+    def __init__(self, K, C, dt, theta=CRANK_NICOLSON, bc=None, method='splu'):
+        if not 0.0 <= theta <= 1.0:
+            raise ValueError("theta must lie in [0, 1]")
+        self.K = sp.csr_matrix(K)
+        self.C = sp.csr_matrix(C)
+        self.dt = float(dt)
+        self.theta = float(theta)
+        self.bc = bc
+        self.A = (self.C/self.dt + self.theta*self.K).tocsr()
+        self.B = (self.C/self.dt - (1.0 - self.theta)*self.K).tocsr()
+        if bc is None:
+            self._A_fc = None
+            self.factorization = Factorization(self.A, method)
+        else:
+            A_ff, self._A_fc = bc.blocks(self.A)
+            self.factorization = Factorization(A_ff, method)
+
+    def _load(self, F, t):
+        return np.asarray(F(t) if callable(F) else F, dtype=float)
+
+    def _values(self, values, t):
+        return values(t) if callable(values) else values
+
+    def step(self, u, f_n, f_np1, values=0.0):
+        """One step from u (N,) with loads f_n, f_{n+1}; values: prescribed u at t_{n+1}."""
+        rhs = self.B @ u + self.theta*f_np1 + (1.0 - self.theta)*f_n
+        if self.bc is None:
+            return self.factorization.solve(rhs)
+        rhs_f = rhs[self.bc.free] - self._A_fc @ self.bc.prescribed(values)
+        return self.bc.expand(self.factorization.solve(rhs_f), values)
+
+    @instrument('transient.ThetaMethod.run')
+    def run(self, u0, nsteps, F=0.0, values=0.0, t0=0.0, stride=1, store=None, name='u',
+            callback=None):
+        """
+        March nsteps from u0 at t0.
+        F: load (N,) or callable F(t) -> (N,); values: prescribed values or callable of t.
+        Every `stride` steps (and at the last step) the state is emitted: written to
+        store (fem.io.Store) as rows of `name` (nout, N) with times in `name + '_t'`,
+        and/or passed to callback(step, t, u).
+        Returns (u_final (N,), times (nout,)); the history is read back with
+        store.load(name).
+        """
+        N = self.A.shape[0]
+        out_steps = list(range(0, nsteps + 1, stride))
+        if out_steps[-1] != nsteps:
+            out_steps.append(nsteps)
+        times = t0 + self.dt*np.asarray(out_steps, dtype=float)
+        hist = store.create(name, (len(out_steps), N)) if store is not None else None
+
+        u = np.array(u0, dtype=float).reshape(N)
+        if self.bc is not None:
+            u[self.bc.fixed] = self.bc.prescribed(self._values(values, t0))
+        f_n = np.broadcast_to(self._load(F, t0), (N,))
+        k = 0
+        for n in range(nsteps + 1):
+            if n > 0:
+                t = t0 + n*self.dt
+                f_np1 = np.broadcast_to(self._load(F, t), (N,)) if callable(F) else f_n
+                u = self.step(u, f_n, f_np1, self._values(values, t))
+                f_n = f_np1
+            if n == out_steps[k]:
+                if hist is not None:
+                    hist[k] = u
+                if callback is not None:
+                    callback(n, times[k], u)
+                k += 1
+        if hist is not None:
+            hist.flush()
+            del hist
+            store.save(name + '_t', times)
+        return u, times
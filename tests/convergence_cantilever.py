@@ -5,52 +5,30 @@ Saves docs/convergence_cantilever.png
 import numpy as np
 import os
 import matplotlib.pyplot as plt
-from fem.elements import K_structural_Q4
+from fem.elements import K_structural_Q4_batch, F_traction_edge_batch
 from fem.materials import D_plane_stress
-from fem.assembly import assemble_global
-from fem.bc import apply_dirichlet
-
-def make_structured_Q4_mesh(nx, ny, Lx=1.0, Ly=0.2):
-    xs = np.linspace(0, Lx, nx+1)
-    ys = np.linspace(0, Ly, ny+1)
-    X, Y = np.meshgrid(xs, ys, indexing="xy")
-    xy = np.column_stack([X.ravel(), Y.ravel()])
-    IEN = []
-    def nid(i,j): return j*(nx+1) + i
-    for j in range(ny):
-        for i in range(nx):
-            n1 = nid(i, j)
-            n2 = nid(i+1, j)
-            n3 = nid(i+1, j+1)
-            n4 = nid(i, j+1)
-            IEN.append([n1,n2,n3,n4])
-    return xy, np.array(IEN, dtype=int), X, Y
+from fem.mesh import make_structured_Q4_mesh
+from fem.assembly import assemble_global_sparse, LoadScatter
+from fem.bc import Dirichlet
 
 def solve_disp(nx, ny, Ty=-1e5, t=0.01, Lx=1.0, Ly=0.2, E=210e9, nu=0.3):
     D = D_plane_stress(E, nu)
-    xy, IEN, X, Y = make_structured_Q4_mesh(nx, ny, Lx=Lx, Ly=Ly)
-
-    Ks = []
-    for e in range(IEN.shape[0]):
-        nodes = IEN[e]
-        xy_e = xy[nodes]
-        ke = K_structural_Q4(xy_e, D, t=t)
-        Ks.append(ke)
+    mesh = make_structured_Q4_mesh(nx, ny, Lx=Lx, Ly=Ly)
+    xy, IEN = mesh.xy, mesh.IEN
 
-    K = assemble_global(Ks, IEN, ndofs_per_node=2)
-    f = np.zeros(K.shape[0])
+    Ks = K_structural_Q4_batch(xy[IEN], D, t=t)
 
-    nxn = nx+1
-    left_nodes = [j*(nxn) + 0 for j in range(ny+1)]
-    clamp_dofs = np.array([n*2 for n in left_nodes] + [n*2+1 for n in left_nodes])
+    K = assemble_global_sparse(Ks, IEN, ndofs_per_node=2)
 
-    right_nodes = [j*(nxn) + nx for j in range(ny+1)]
-    for n in right_nodes:
-        f[n*2+1] += Ty * (Ly / len(right_nodes)) * t
+    left_nodes = mesh.nodes['left']
+    clamp_dofs = np.concatenate([2*left_nodes, 2*left_nodes+1])
 
-    apply_dirichlet(K, f, clamp_dofs, np.zeros_like(clamp_dofs, dtype=float))
+    right_nodes = mesh.nodes['right']
+    right_edges = mesh.edges['right']
+    f = LoadScatter(right_edges, 2, len(xy)).assemble(
+        F_traction_edge_batch(xy[right_edges], [0.0, Ty], t=t))
 
-    u = np.linalg.solve(K, f)
+    u = Dirichlet(K.shape[0], clamp_dofs).solve(K, f, values=0.0)
     U = u.reshape(-1,2)
 
     # Tip vertical displacement: mean Uy on right edge
@@ -0,0 +1,75 @@
+import numpy as np
+from fem.mesh import make_structured_T3_mesh, make_structured_Q4_mesh
+from fem.materials import D_plane_stress
+from fem.dofmap import DofMap
+from fem.adapt import AdaptiveMesh, AdaptiveSolver, mark_bulk
+
+def _linear(xy):
+    return 1e-3*np.column_stack([xy[:, 0] + 2*xy[:, 1], 3*xy[:, 0] - xy[:, 1]]).ravel()
+
+def _boundary_bc(m):
+    b = np.unique(np.concatenate(list(m.nodes.values())))
+    dofs = np.concatenate([2*b, 2*b + 1])
+    return dofs, _linear(m.xy)[dofs]
+
+def test_local_refinement_patch_test_and_incremental_dofmap():
+    D = D_plane_stress(100.0, 0.3)
+    rng = np.random.default_rng(3)
+    for make in (make_structured_T3_mesh, make_structured_Q4_mesh):
+        mesh = AdaptiveMesh.from_structured(make(4, 3, Lx=2.0))
+        s = AdaptiveSolver(mesh, D, _boundary_bc, lambda m: np.zeros(2*m.Nnodes))
+        for it in range(4):
+            u, info = s.solve(x0=s.u)
+            # hanging-node constraints / conforming bisection keep the patch test exact,
+            # and the interpolated previous solution is already the answer
+            assert np.allclose(u, _linear(mesh.xy), atol=1e-14)
+            assert it == 0 or info.iterations == 0
+            ref = DofMap(mesh.IEN, 2, mesh.Nnodes)
+            assert np.array_equal(s.dofmap.indptr, ref.indptr)
+            assert np.array_equal(s.dofmap.indices, ref.indices)
+            assert np.array_equal(s.dofmap.perm, ref.perm)
+            s.refine(rng.random(mesh.IEN.shape[0]) < 0.25)
+        c = mesh.xy[mesh.IEN]
+        x, y = c[..., 0], c[..., 1]
+        area = 0.5*np.sum(x*np.roll(y, -1, 1) - np.roll(x, -1, 1)*y, axis=1)
+        assert (area > 0).all() and np.isclose(area.sum(), 2.0)
+        if mesh.etype == 'T3':        # conforming: every edge has one or two elements
+            e = np.sort(np.concatenate([mesh.IEN[:, [i, (i + 1) % 3]] for i in range(3)]), axis=1)
+            assert np.unique(e, axis=0, return_counts=True)[1].max() == 2
+        else:
+            assert mesh.hanging.shape[0] > 0
+
+def test_dofmap_refine_replacing_every_element():
+    m = make_structured_Q4_mesh(2, 1)
+    dm = DofMap(m.IEN, 2).refine(np.zeros(2, dtype=bool), m.IEN[::-1], m.xy.shape[0])
+    ref = DofMap(m.IEN[::-1], 2)
+    assert dm.nnz == ref.nnz and np.array_equal(dm.indices, ref.indices)
+    assert np.array_equal(dm.perm, ref.perm)
+
+def test_adaptive_cantilever_beats_uniform():
+    D = D_plane_stress(1000.0, 0.3)
+    def clamp(m):
+        left = m.nodes['left']
+        return np.concatenate([2*left, 2*left + 1]), 0.0
+    def tip_shear(m):
+        r = m.nodes['right'][np.argsort(m.xy[m.nodes['right'], 1])]
+        L = np.diff(m.xy[r, 1])
+        f = np.zeros(2*m.Nnodes)
+        np.add.at(f, 2*r[:-1] + 1, -0.5*L)
+        np.add.at(f, 2*r[1:] + 1, -0.5*L)
+        return f
+    uniform = AdaptiveSolver(AdaptiveMesh.from_structured(make_structured_T3_mesh(64, 32, Lx=2.0)),
+                             D, clamp, tip_shear)
+    uniform.run(max_steps=1)
+    target = uniform.history[-1]['error']
+    s = AdaptiveSolver(AdaptiveMesh.from_structured(make_structured_T3_mesh(4, 2, Lx=2.0)),
+                       D, clamp, tip_shear)
+    s.run(target=target, max_steps=30)
+    assert s.history[-1]['error'] <= target
+    assert s.ndofs < 0.5*uniform.ndofs
+    assert np.all(np.diff([h['error'] for h in s.history]) < 0)
+
+def test_mark_bulk():
+    eta = np.array([1.0, 3.0, 0.5, 2.0])
+    assert np.array_equal(mark_bulk(eta, 0.6), [False, True, False, False])
+    assert mark_bulk(eta, 0.7).sum() == 2
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from fem.elements import K_structural_Q4, K_structural_Q4_batch
+from fem.materials import D_plane_stress
+from fem.assembly import assemble_global, assemble_global_sparse, assemble_force_RHS, stream_element_matrices
+from fem.mesh import make_structured_Q4_mesh
+from fem.dofmap import DofMap
+
+def two_quad_mesh():
+    xy = np.array([[0,0],[1,0],[2,0],[0,1],[1,1],[2,1]], dtype=float)
+    IEN = np.array([[0,1,4,3],[1,2,5,4]], dtype=int)
+    return xy, IEN
+
+def test_sparse_matches_dense():
+    xy, IEN = two_quad_mesh()
+    D = D_plane_stress(210e3, 0.3)
+    Ks = [K_structural_Q4(xy[nodes], D) for nodes in IEN]
+    Kd = assemble_global(Ks, IEN, ndofs_per_node=2)
+    Ks_ = assemble_global_sparse(Ks, IEN, ndofs_per_node=2)
+    assert Ks_.format == "csr"
+    assert np.allclose(Ks_.toarray(), Kd)
+
+def test_force_rhs_bincount():
+    xy, IEN = two_quad_mesh()
+    Fs = np.ones((2, 4))
+    f = assemble_force_RHS(Fs, IEN, ndofs_per_node=1)
+    assert np.allclose(f, [1, 2, 1, 1, 2, 1])
+
+def test_dofmap_reassembly_matches_coo():
+    xy, IEN = two_quad_mesh()
+    dm = DofMap(IEN, ndofs_per_node=2)
+    for E in (210e3, 70e3):
+        Ks = K_structural_Q4_batch(xy[IEN], D_plane_stress(E, 0.3))
+        K_ref = assemble_global_sparse(Ks, IEN, ndofs_per_node=2)
+        K = assemble_global_sparse(Ks, IEN, ndofs_per_node=2, dofmap=dm)
+        assert K.nnz == dm.nnz == K_ref.nnz
+        assert np.allclose(K.toarray(), K_ref.toarray())
+
+def test_block_mode_dofmap_assembles_without_perm():
+    m = make_structured_Q4_mesh(5, 3)
+    Ks = K_structural_Q4_batch(m.xy[m.IEN], D_plane_stress(1.0, 0.3))
+    K_ref = DofMap(m.IEN, 2).assemble(Ks)
+    dm = DofMap(m.IEN, 2, block_size=4)
+    assert dm.perm is None
+    assert np.allclose(dm.assemble(Ks).toarray(), K_ref.toarray())
+    assert np.allclose(assemble_global_sparse(Ks, m.IEN, 2, dofmap=dm).toarray(), K_ref.toarray())
+    dm = DofMap.from_pattern(m.IEN, 2, len(m.xy), K_ref.indptr, K_ref.indices)
+    assert np.allclose(dm.fill(Ks), K_ref.data)
+
+def test_streamed_assembly_matches_batch():
+    m = make_structured_Q4_mesh(9, 5)
+    D = D_plane_stress(210e3, 0.3)
+    K_ref = assemble_global_sparse(K_structural_Q4_batch(m.xy[m.IEN], D), m.IEN, 2)
+    stream = lambda: stream_element_matrices(K_structural_Q4_batch, m.xy, m.IEN, D, block_size=7)
+    K = assemble_global_sparse(stream(), m.IEN, 2)
+    assert np.allclose(K.toarray(), K_ref.toarray())
+    K = assemble_global_sparse(stream(), None, 2, Nnodes=len(m.xy))
+    assert np.allclose(K.toarray(), K_ref.toarray())
+    with pytest.raises(ValueError):
+        assemble_global(stream(), m.IEN, 2)
+    Fs = ((ien, np.ones((len(ien), 8))) for ien in np.array_split(m.IEN, 4))
+    assert np.allclose(assemble_force_RHS(Fs, m.IEN, 2), assemble_force_RHS(np.ones((45, 8)), m.IEN, 2))
+    F3 = np.random.default_rng(0).random((45, 8, 3))
+    Fs = ((m.IEN[s], F3[s]) for s in np.array_split(np.arange(45), 4))
+    F = assemble_force_RHS(Fs, None, 2, Nnodes=len(m.xy))
+    assert F.shape == (2*len(m.xy), 3) and np.allclose(F, assemble_force_RHS(F3, m.IEN, 2))
+
+def test_streamed_assembly_from_store(tmp_path):
+    from fem.io import Store
+    m = make_structured_Q4_mesh(6, 4)
+    Store(tmp_path / 's', 'w').save_mesh(m.xy, m.IEN, 'Q4')
+    s = Store(tmp_path / 's')
+    Ks = stream_element_matrices(K_structural_Q4_batch, s.xy, s.IEN, D_plane_stress(1.0, 0.3), block_size=5)
+    K = assemble_global_sparse(Ks, s.IEN, 2)
+    K_ref = assemble_global_sparse(K_structural_Q4_batch(m.xy[m.IEN], D_plane_stress(1.0, 0.3)), m.IEN, 2)
+    assert np.allclose(K.toarray(), K_ref.toarray())
@@ -0,0 +1,45 @@
+import numpy as np
+from fem.elements import K_conduction_Q4_batch
+from fem.assembly import assemble_global, assemble_global_sparse
+from fem.bc import apply_dirichlet, apply_dirichlet_penalty, Dirichlet
+
+def strip_mesh(n=4):
+    xs = np.arange(n+1, dtype=float)
+    xy = np.column_stack([np.tile(xs, 2), np.repeat([0.0, 1.0], n+1)])
+    IEN = np.array([[i, i+1, n+2+i, n+1+i] for i in range(n)])
+    return xy, IEN
+
+def linear_temperature_setup():
+    xy, IEN = strip_mesh()
+    Ks = K_conduction_Q4_batch(xy[IEN], 2.0)
+    dofs = np.flatnonzero((xy[:, 0] == 0) | (xy[:, 0] == 4))
+    vals = np.where(xy[dofs, 0] == 0, 10.0, 30.0)
+    return xy, IEN, Ks, dofs, vals, 10.0 + 5.0*xy[:, 0]
+
+def test_nonzero_prescribed_values_dense_and_sparse():
+    xy, IEN, Ks, dofs, vals, T_exact = linear_temperature_setup()
+    K, f = apply_dirichlet(assemble_global(Ks, IEN, 1), np.zeros(len(xy)), dofs, vals)
+    assert np.allclose(np.linalg.solve(K, f), T_exact)
+    Ks_ = assemble_global_sparse(Ks, IEN, 1)
+    K, f = apply_dirichlet(Ks_, np.zeros(len(xy)), dofs, vals)
+    assert np.allclose(np.linalg.solve(K.toarray(), f), T_exact)
+    K, f = apply_dirichlet_penalty(Ks_, np.zeros(len(xy)), dofs, vals)
+    assert np.allclose(np.linalg.solve(K.toarray(), f), T_exact)
+
+def test_partition_reuses_blocks():
+    xy, IEN, Ks, dofs, vals, T_exact = linear_temperature_setup()
+    K = assemble_global_sparse(Ks, IEN, 1)
+    bc = Dirichlet(K.shape[0], dofs)
+    assert np.allclose(bc.solve(K, np.zeros(len(xy)), vals), T_exact)
+    K_ff = bc.blocks(K)[0]
+    T = bc.solve(K, np.zeros(len(xy)), 2*vals)
+    assert bc.blocks(K)[0] is K_ff
+    assert np.allclose(T, 2*T_exact)
+
+def test_repeated_dofs_lifted_once():
+    K = 2*np.eye(4) - np.eye(4, k=1) - np.eye(4, k=-1)
+    for K0 in (K.copy(), assemble_global_sparse(np.array([K]), np.array([[0, 1, 2, 3]]), 1)):
+        K1, f = apply_dirichlet(K0, np.zeros(4), [0, 0], [1.0, 1.0])
+        assert f[0] == 1.0 and f[1] == 1.0
+        Kd = K1.toarray() if hasattr(K1, 'toarray') else K1
+        assert np.allclose(np.linalg.solve(Kd, f), [1.0, 0.75, 0.5, 0.25])
@@ -0,0 +1,60 @@
+import numpy as np
+from fem.mesh import make_structured_Q4_mesh, make_structured_T3_mesh
+from fem.materials import D_plane_stress
+from fem.elements import K_structural_Q4_batch, M_structural_Q4_batch, M_structural_T3_batch
+from fem.assembly import assemble_global_sparse
+from fem.bc import Dirichlet
+from fem.matfree import MatrixFreeOperator
+from fem.solvers import FactorCache
+from fem.dynamics import ModalSolver, CentralDifference, lumped_mass, stable_time_step
+
+def test_mass_totals_and_rigid_body():
+    m = make_structured_T3_mesh(3, 2, Lx=2.0)
+    for lumped in (False, True):
+        Mt = M_structural_T3_batch(m.xy[m.IEN], 3.0, 0.5, lumped=lumped)
+        ux = np.tile([1.0, 0.0], 3)
+        assert np.isclose(np.einsum('i,eij,j->', ux, Mt, ux), 3.0*0.5*2.0)
+    Mq = M_structural_Q4_batch(np.array([[[0, 0], [2, 0], [2, 1], [0, 1]]], float))
+    assert np.allclose(Mq[0, ::2, 1::2], 0.0) and np.allclose(Mq[0, ::2, ::2], Mq[0, 1::2, 1::2])
+    assert np.isclose(lumped_mass(m.xy, m.IEN, 3.0, 0.5, 'T3').sum(), 2*3.0*0.5*2.0)
+
+def _cantilever():
+    m = make_structured_Q4_mesh(40, 4, Lx=10.0, Ly=1.0)
+    D = D_plane_stress(1000.0, 0.0)
+    K = assemble_global_sparse(K_structural_Q4_batch(m.xy[m.IEN], D), m.IEN, 2)
+    left = m.nodes['left']
+    bc = Dirichlet(K.shape[0], np.concatenate([2*left, 2*left + 1]))
+    return m, D, K, bc
+
+def test_cantilever_modes_match_beam_theory():
+    m, D, K, bc = _cantilever()
+    M = assemble_global_sparse(M_structural_Q4_batch(m.xy[m.IEN], 1.0), m.IEN, 2)
+    cache = FactorCache()
+    omega, Phi = ModalSolver(K, M, bc=bc, cache=cache).solve(k=3)
+    # Euler-Bernoulli: omega_1 = 1.875^2 sqrt(EI / (rho A L^4)), A = 1, I = 1/12
+    w1 = 1.875104**2*np.sqrt(1000.0/12/10.0**4)
+    assert abs(omega[0]/w1 - 1) < 0.03
+    assert np.all(np.diff(omega) > 0) and np.allclose(Phi[bc.fixed], 0.0)
+    assert np.allclose(Phi.T @ M @ Phi, np.eye(3), atol=1e-8)
+    ModalSolver(K, M, bc=bc, cache=cache).solve(k=1)
+    assert cache.hits == 1
+
+def test_central_difference_free_vibration():
+    m, D, K, bc = _cantilever()
+    ml = lumped_mass(m.xy, m.IEN, 1.0)
+    op = MatrixFreeOperator(m.xy, m.IEN, D)
+    omega, Phi = ModalSolver(K, assemble_global_sparse(
+        M_structural_Q4_batch(m.xy[m.IEN], 1.0, lumped=True), m.IEN, 2), bc=bc).solve(k=1)
+    dt_crit = stable_time_step(op, ml, bc=bc, iters=200)
+    dt = 0.5*dt_crit
+    period = 2*np.pi/omega[0]
+    nsteps = int(round(period/dt))
+    u0 = 1e-3*Phi[:, 0]
+    energy = []
+    cd = CentralDifference(op, ml, dt, bc=bc)
+    u, v, t = cd.run(u0, nsteps, stride=nsteps//20,
+                     callback=lambda n, t, u, v: energy.append(0.5*u @ (K @ u) + 0.5*v @ (ml*v)))
+    # after one period of the first lumped-mass mode the beam returns to u0
+    assert np.linalg.norm(u - u0) < 2e-2*np.linalg.norm(u0)
+    assert np.ptp(energy) < 1e-2*energy[0]
+    assert np.allclose(u[bc.fixed], 0.0)
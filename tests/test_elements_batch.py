@@ -0,0 +1,159 @@
+import numpy as np
+from fem.elements import (K_structural_Q4, K_structural_T3, K_conduction_Q4, K_conduction_T3,
+                          K_structural_Q4_batch, K_structural_T3_batch,
+                          K_conduction_Q4_batch, K_conduction_T3_batch)
+from fem.materials import D_plane_stress
+
+def distorted(nen, n=5, seed=0):
+    rng = np.random.default_rng(seed)
+    ref = {4: [[0,0],[1,0],[1,1],[0,1]], 3: [[0,0],[1,0],[0,1]]}[nen]
+    return np.array(ref, dtype=float) + 0.15*rng.standard_normal((n, nen, 2))
+
+def test_batch_matches_scalar_kernels():
+    D = D_plane_stress(210e3, 0.3)
+    q4, t3 = distorted(4), distorted(3)
+    Kq = K_structural_Q4_batch(q4, D, t=0.1)
+    Kt = K_structural_T3_batch(t3, D, t=0.1, order=3)
+    Cq = K_conduction_Q4_batch(q4, 4.0)
+    Ct = K_conduction_T3_batch(t3, 4.0)
+    for e in range(q4.shape[0]):
+        assert np.allclose(Kq[e], K_structural_Q4(q4[e], D, t=0.1))
+        assert np.allclose(Kt[e], K_structural_T3(t3[e], D, t=0.1, order=3))
+        assert np.allclose(Cq[e], K_conduction_Q4(q4[e], 4.0))
+        assert np.allclose(Ct[e], K_conduction_T3(t3[e], 4.0))
+
+def test_element_cache_structured_and_graded():
+    from fem.elements import ElementCache
+    from fem.mesh import make_structured_Q4_mesh
+    D = D_plane_stress(210e3, 0.3)
+    m = make_structured_Q4_mesh(20, 10, Lx=4.0)
+    Kc = ElementCache(K_structural_Q4_batch)
+    Ks = Kc(m.xy[m.IEN], D, t=0.1)
+    assert np.allclose(Ks, K_structural_Q4_batch(m.xy[m.IEN], D, t=0.1))
+    assert Kc.stats['misses'] == 1 and Kc.stats['hits'] == 199
+    Kc(m.xy[m.IEN], D, t=0.2)                    # new material -> new entry
+    assert len(Kc) == 2 and Kc.misses == 2
+
+    g = make_structured_Q4_mesh(6, 5, ratio=(3.0, 2.0))
+    Kc = ElementCache(K_structural_Q4_batch, max_entries=4)
+    assert np.allclose(Kc(g.xy[g.IEN], D), K_structural_Q4_batch(g.xy[g.IEN], D))
+    assert Kc.misses == 30 and len(Kc) == 4
+
+def test_element_cache_rule_kwarg_and_per_element_material():
+    import pytest
+    from fem.elements import ElementCache, K_structural_T6_batch
+    from fem.mesh import make_structured_Q4_mesh, make_structured_T6_mesh
+    from fem.quadrature import Rule
+    D = D_plane_stress(210e3, 0.3)
+    m = make_structured_T6_mesh(4, 3)
+    Kc = ElementCache(K_structural_T6_batch)
+    Ks = Kc(m.xy[m.IEN], D, order=Rule('dunavant', 4))
+    assert np.allclose(Ks, K_structural_T6_batch(m.xy[m.IEN], D, order=Rule('dunavant', 4)))
+    Kc(m.xy[m.IEN], D, order=Rule('dunavant', 4))
+    assert len(Kc) == 2 and Kc.hits == 2*m.IEN.shape[0] - 2
+    q = make_structured_Q4_mesh(4, 3)
+    with pytest.raises(ValueError):
+        ElementCache(K_structural_Q4_batch)(q.xy[q.IEN], D, t=np.linspace(0.1, 0.2, 12))
+    # a shared (2,) body force on a 2-element batch is not a per-element array
+    from fem.elements import F_body_batch
+    two = q.xy[q.IEN[:2]]
+    Fc = ElementCache(F_body_batch)
+    assert np.allclose(Fc(two, np.array([1.0, -2.0]), 'Q4'), F_body_batch(two, np.array([1.0, -2.0]), 'Q4'))
+    assert Kc(m.xy[m.IEN[:0]], D).shape == (0, 12, 12)
+
+def _solve_exact_boundary(m, K, f, u_exact, ndof):
+    from fem.bc import Dirichlet
+    bnodes = np.unique(np.concatenate(list(m.nodes.values())))
+    fixed = (ndof*bnodes[:, None] + np.arange(ndof)).ravel()
+    return Dirichlet(K.shape[0], fixed).solve(K, f, values=u_exact[fixed])
+
+def test_quadratic_elements_reproduce_pure_bending():
+    # plane-stress pure bending: u = -k x y, v = k/2 (x^2 + nu y^2) is quadratic
+    from fem.mesh import make_structured_T6_mesh, make_structured_Q8_mesh, make_structured_Q9_mesh
+    from fem.elements import K_structural_T6_batch, K_structural_Q8_batch, K_structural_Q9_batch
+    from fem.assembly import assemble_global_sparse
+    nu, k = 0.3, 0.01
+    D = D_plane_stress(1.0, nu)
+    for make, kern in ((make_structured_T6_mesh, K_structural_T6_batch),
+                       (make_structured_Q8_mesh, K_structural_Q8_batch),
+                       (make_structured_Q9_mesh, K_structural_Q9_batch)):
+        m = make(4, 3, Lx=2.0, Ly=1.0, ratio=(2.0, 1.0))
+        x, y = m.xy.T
+        u_ex = np.column_stack([-k*x*y, 0.5*k*(x**2 + nu*y**2)]).ravel()
+        K = assemble_global_sparse(kern(m.xy[m.IEN], D, t=0.5), m.IEN, 2)
+        u = _solve_exact_boundary(m, K, np.zeros(K.shape[0]), u_ex, 2)
+        assert np.allclose(u, u_ex, atol=1e-12)
+
+def test_quadratic_conduction_with_source_and_mass_totals():
+    from fem.mesh import make_structured_T6_mesh, make_structured_Q8_mesh, make_structured_Q9_mesh
+    from fem import elements as el
+    from fem.assembly import assemble_global_sparse, assemble_force_RHS
+    for make, et in ((make_structured_T6_mesh, 'T6'), (make_structured_Q8_mesh, 'Q8'),
+                     (make_structured_Q9_mesh, 'Q9')):
+        m = make(3, 4, Lx=1.5, Ly=1.0, ratio=(1.0, 2.0))
+        xy_el = m.xy[m.IEN]
+        # -k lap T = s with T = x^2 + x y, k = 2 -> s = -4
+        T_ex = m.xy[:, 0]**2 + m.xy[:, 0]*m.xy[:, 1]
+        K = assemble_global_sparse(getattr(el, f'K_conduction_{et}_batch')(xy_el, 2.0), m.IEN, 1)
+        f = assemble_force_RHS(el.F_source_batch(xy_el, -4.0, et), m.IEN, 1)
+        assert np.allclose(_solve_exact_boundary(m, K, f, T_ex, 1), T_ex, atol=1e-12)
+        for lumped in (False, True):
+            Mt = getattr(el, f'M_structural_{et}_batch')(xy_el, 2.0, 0.5, lumped=lumped)
+            ux = np.tile([1.0, 0.0], m.IEN.shape[1])
+            assert np.isclose(np.einsum('i,eij,j->', ux, Mt, ux), 2.0*0.5*1.5)
+            if lumped:
+                assert (np.diagonal(Mt, axis1=1, axis2=2) > 0).all()
+        Fb = el.F_body_batch(xy_el, [0.0, -3.0], et, t=0.5)
+        assert np.isclose(Fb[:, 1::2].sum(), -3.0*0.5*1.5) and np.allclose(Fb[:, 0::2], 0.0)
+
+def test_edge_loads_resultants_and_neumann_patch():
+    from fem.mesh import make_structured_Q4_mesh, make_structured_Q9_mesh
+    from fem import elements as el
+    from fem.assembly import assemble_global_sparse, LoadScatter
+    m = make_structured_Q4_mesh(4, 5, Lx=2.0, Ly=1.0, ratio=(1.0, 3.0))
+    right = m.edges['right']
+    # graded right edge: uniform traction lumps to half the edge length per end node
+    Fe = el.F_traction_edge_batch(m.xy[right], [0.0, -2.0], t=0.5)
+    L = np.linalg.norm(np.diff(m.xy[right], axis=1)[:, 0], axis=1)
+    assert np.allclose(Fe[:, 1::2], -2.0*0.5*L[:, None]/2) and np.allclose(Fe[:, 0::2], 0.0)
+    # linearly varying traction as a callable, three load cases at once
+    tr = lambda x: np.stack([x[..., 1], np.ones_like(x[..., 1])], -1)[..., None]*[1.0, 2.0, 3.0]
+    F = LoadScatter(right, 2, len(m.xy)).assemble(el.F_traction_edge_batch(m.xy[right], tr))
+    assert F.shape == (2*len(m.xy), 3)
+    assert np.allclose(F[0::2].sum(0), 0.5*np.array([1, 2, 3]))            # int y dy
+    assert np.allclose((F[0::2]*m.xy[:, 1:2]).sum(0), np.array([1, 2, 3])/3)  # int y^2 dy
+    # uniform pressure on a closed boundary has no resultant; on top it pushes down
+    edges = np.concatenate(list(m.edges.values()))
+    Fp = LoadScatter(edges, 2, len(m.xy)).assemble(el.F_pressure_edge_batch(m.xy[edges], 3.0))
+    assert np.allclose([Fp[0::2].sum(), Fp[1::2].sum()], 0.0)
+    top = m.edges['top']
+    assert np.isclose(el.F_pressure_edge_batch(m.xy[top], 3.0)[:, 1::2].sum(), -3.0*2.0)
+
+    # -k lap T = s, T = x^2 + x y, k = 2, s = -4; flux k grad T . n on the right edge
+    q = make_structured_Q9_mesh(3, 4, Lx=1.5, Ly=1.0, ratio=(1.0, 2.0))
+    T_ex = q.xy[:, 0]**2 + q.xy[:, 0]*q.xy[:, 1]
+    K = assemble_global_sparse(el.K_conduction_Q9_batch(q.xy[q.IEN], 2.0), q.IEN, 1)
+    f = LoadScatter(q.IEN, 1, len(q.xy)).assemble(el.F_source_batch(q.xy[q.IEN], -4.0, 'Q9'))
+    r = q.edges['right']
+    f += LoadScatter(r, 1, len(q.xy)).assemble(
+        el.F_flux_edge_batch(q.xy[r], lambda x: 2.0*(2*x[..., 0] + x[..., 1])))
+    from fem.bc import Dirichlet
+    fixed = np.unique(np.concatenate([q.nodes[s] for s in ('left', 'bottom', 'top')]))
+    T = Dirichlet(K.shape[0], fixed).solve(K, f, values=T_ex[fixed])
+    assert np.allclose(T, T_ex, atol=1e-12)
+
+def test_body_force_load_cases():
+    from fem.mesh import make_structured_T3_mesh
+    from fem import elements as el
+    from fem.assembly import assemble_force_RHS
+    m = make_structured_T3_mesh(3, 2)
+    xy_el = m.xy[m.IEN]
+    b = np.stack([np.tile([1.0, 0.0], (12, 1)), np.tile([0.0, -2.0], (12, 1))], axis=-1)
+    Fb = el.F_body_batch(xy_el, b, 'T3', t=np.full(12, 0.5))
+    assert Fb.shape == (12, 6, 2)
+    for k in range(2):
+        assert np.allclose(Fb[..., k], el.F_body_batch(xy_el, b[0, :, k], 'T3', t=0.5))
+    f = assemble_force_RHS(Fb, m.IEN, 2)
+    assert f.shape == (2*len(m.xy), 2) and np.allclose(f[:, 0], assemble_force_RHS(Fb[..., 0], m.IEN, 2))
+    s = el.F_source_batch(xy_el, lambda x: x[..., 0], 'T3', order=3)
+    assert np.isclose(s.sum(), 0.5)                                          # int x dA
@@ -0,0 +1,105 @@
+import base64
+import xml.etree.ElementTree as ET
+import numpy as np
+from fem.mesh import make_structured_Q4_mesh
+from fem.materials import D_plane_stress
+from fem.elements import K_structural_Q4_batch
+from fem.dofmap import DofMap
+from fem.io import Store, read_msh, write_vtu
+
+MSH = """$MeshFormat
+4.1 0 8
+$EndMeshFormat
+$PhysicalNames
+2
+1 1 "right"
+2 2 "plate"
+$EndPhysicalNames
+$Entities
+0 1 1 0
+1 1 0 0 1 1 0 1 1 0
+1 0 0 0 2 1 0 1 2 0
+$EndEntities
+$Nodes
+1 6 1 6
+2 1 0 6
+1
+2
+3
+4
+5
+6
+0 0 0
+1 0 0
+2 0 0
+0 1 0
+1 1 0
+2 1 0
+$EndNodes
+$Elements
+2 3 1 3
+1 1 1 1
+1 3 6
+2 1 3 2
+2 1 2 5 4
+3 2 3 6 5
+$EndElements
+"""
+
+def test_store_roundtrip_memmapped(tmp_path):
+    m = make_structured_Q4_mesh(4, 2)
+    dm = DofMap(m.IEN, 2)
+    K = dm.assemble(K_structural_Q4_batch(m.xy[m.IEN], D_plane_stress(1.0, 0.3)))
+    st = Store(tmp_path / "plate", mode='w')
+    st.save_mesh(m.xy, m.IEN, etype='Q4', left=m.nodes['left'])
+    st.save_dofmap(dm)
+    st.save_sparse('K', K)
+    u = st.create('results/history', (3, K.shape[0]))
+    u[1] = 1.0
+    u.flush()
+
+    st = Store(tmp_path / "plate")
+    assert isinstance(st.IEN, np.memmap) and st.meta['etype'] == 'Q4'
+    assert np.array_equal(st.group('left'), m.nodes['left'])
+    assert np.allclose(st.load_sparse('K').toarray(), K.toarray())
+    dm2 = st.load_dofmap()
+    assert np.allclose(dm2.assemble(K_structural_Q4_batch(st.xy[st.IEN], D_plane_stress(1.0, 0.3))).toarray(),
+                       K.toarray())
+    assert st.result('history')[1].sum() == K.shape[0]
+    blocks = list(st.element_blocks(block_size=3))
+    assert [b[:2] for b in blocks] == [(0, 3), (3, 6), (6, 8)]
+
+def test_read_msh_and_write_vtu(tmp_path):
+    (tmp_path / "m.msh").write_text(MSH)
+    xy, cells, groups = read_msh(tmp_path / "m.msh")
+    assert xy.shape == (6, 2)
+    assert np.array_equal(cells['Q4'], [[0, 1, 4, 3], [1, 2, 5, 4]])
+    assert np.array_equal(groups['right']['L2'], [[2, 5]])
+    write_vtu(tmp_path / "m.vtu", xy, cells['Q4'], 'Q4',
+              point_data={'u': np.ones((6, 2))}, cell_data={'id': np.arange(2)})
+    root = ET.parse(tmp_path / "m.vtu").getroot()
+    conn = root.find(".//DataArray[@Name='connectivity']").text
+    raw = base64.b64decode(conn)
+    assert np.array_equal(np.frombuffer(raw[8:], dtype=np.int64), cells['Q4'].ravel())
+
+def test_read_msh_rejects_other_versions(tmp_path):
+    import pytest
+    for version in ('4.0', '2.2'):
+        (tmp_path / "m.msh").write_text(MSH.replace("4.1 0 8", f"{version} 0 8"))
+        with pytest.raises(ValueError):
+            read_msh(tmp_path / "m.msh")
+
+def test_store_roundtrip_block_mode_dofmap(tmp_path):
+    m = make_structured_Q4_mesh(4, 2)
+    dm = DofMap(m.IEN, 2, block_size=3)
+    Ks = K_structural_Q4_batch(m.xy[m.IEN], D_plane_stress(1.0, 0.3))
+    st = Store(tmp_path / "plate", mode='w')
+    st.save_mesh(m.xy, m.IEN, etype='Q4')
+    st.save_dofmap(dm)
+
+    dm2 = Store(tmp_path / "plate").load_dofmap()
+    assert dm2.perm is None and dm2.nnz == dm.nnz
+    data = np.zeros(dm2.nnz)
+    for start, stop, ien, xy_el in Store(tmp_path / "plate").element_blocks(block_size=3):
+        dm2.scatter_add(data, dm2.edofs[start:stop], Ks[start:stop])
+    assert np.allclose(data, DofMap(m.IEN, 2).fill(Ks))
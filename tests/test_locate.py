@@ -0,0 +1,50 @@
+import numpy as np
+from fem.mesh import make_structured_Q4_mesh, make_structured_T3_mesh, make_structured_Q9_mesh, make_structured_T6_mesh
+from fem.locate import Interpolator, GridIndex
+
+def _distorted_Q4(nx=12, ny=8, seed=0):
+    m = make_structured_Q4_mesh(nx, ny, Lx=3.0, Ly=2.0)
+    xy = m.xy.copy()
+    inner = np.setdiff1d(np.arange(len(xy)), np.concatenate(list(m.nodes.values())))
+    xy[inner] += 0.3*np.random.default_rng(seed).uniform(-1, 1, (inner.size, 2))*[3/nx, 2/ny]
+    return xy, m.IEN
+
+def test_linear_field_exact_on_distorted_Q4_and_T3():
+    rng = np.random.default_rng(1)
+    pts = rng.uniform([0, 0], [3, 2], (5000, 2))
+    for xy, IEN, et in (_distorted_Q4() + ('Q4',),
+                        (make_structured_T3_mesh(7, 5, Lx=3.0, Ly=2.0).xy,
+                         make_structured_T3_mesh(7, 5, Lx=3.0, Ly=2.0).IEN, 'T3')):
+        interp = Interpolator(xy, IEN, et)
+        u = np.column_stack([1 + 2*xy[:, 0] - xy[:, 1], 3*xy[:, 1]]).ravel()   # interleaved
+        vals, grads = interp.interpolate(u, pts)
+        assert vals.shape == (5000, 2) and grads.shape == (5000, 2, 2)
+        assert np.allclose(vals, np.column_stack([1 + 2*pts[:, 0] - pts[:, 1], 3*pts[:, 1]]))
+        assert np.allclose(grads, [[2, -1], [0, 3]])
+        loc = interp.locate(pts)
+        assert loc.found.all()
+        # the located element really contains the point (map back)
+        T, gT = interp.interpolate(xy[:, 0], loc)
+        assert np.allclose(T, pts[:, 0]) and np.allclose(gT, [1, 0])
+
+def test_quadratic_field_and_outside_points():
+    for make, et in ((make_structured_Q9_mesh, 'Q9'), (make_structured_T6_mesh, 'T6')):
+        m = make(4, 3, Lx=2.0, Ly=1.0, ratio=(2.0, 1.0))
+        T_nodes = m.xy[:, 0]**2 + m.xy[:, 0]*m.xy[:, 1]
+        pts = np.array([[0.3, 0.7], [1.99, 0.01], [2.0, 1.0], [2.5, 0.5], [-0.1, 0.2]])
+        T, g = Interpolator(m.xy, m.IEN, et).interpolate(T_nodes, pts)
+        x, y = pts[:3].T
+        assert np.allclose(T[:3], x**2 + x*y)
+        assert np.allclose(g[:3], np.column_stack([2*x + y, x]))
+        assert np.isnan(T[3:]).all() and np.isnan(g[3:]).all()
+
+def test_grid_index_candidates_cover_containing_element():
+    xy, IEN = _distorted_Q4(20, 20, seed=3)
+    idx = GridIndex(xy[IEN])
+    pts = np.random.default_rng(2).uniform([0, 0], [3, 2], (2000, 2))
+    p, e = idx.candidates(pts)
+    assert np.array_equal(np.unique(p), np.arange(2000))
+    assert len(p) < 8*len(pts)
+    loc = Interpolator(xy, IEN, 'Q4').locate(pts, chunk_size=300)
+    pairs = set(zip(p.tolist(), e.tolist()))
+    assert all((i, el) in pairs for i, el in enumerate(loc.elem.tolist()))
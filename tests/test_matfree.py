@@ -0,0 +1,32 @@
+import numpy as np
+from fem.mesh import make_structured_Q4_mesh, make_structured_T3_mesh
+from fem.materials import D_plane_stress
+from fem.elements import K_structural_Q4_batch, K_conduction_T3_batch
+from fem.assembly import assemble_global_sparse
+from fem.bc import apply_dirichlet
+from fem.matfree import MatrixFreeOperator
+from fem.solvers import solve
+
+def test_structural_action_and_diagonal():
+    m = make_structured_Q4_mesh(7, 4, Lx=3.0, ratio=(2.0, 1.0))
+    D = D_plane_stress(200.0, 0.3)
+    K = assemble_global_sparse(K_structural_Q4_batch(m.xy[m.IEN], D, 0.5), m.IEN, 2)
+    u = np.random.default_rng(0).standard_normal(K.shape[0])
+    for store in (True, False):
+        A = MatrixFreeOperator(m.xy, m.IEN, D, t=0.5, store_gradients=store, block_size=5)
+        assert np.allclose(A @ u, K @ u)
+        assert np.allclose(A.diagonal(), K.diagonal())
+
+def test_masked_conduction_cg_matches_direct():
+    m = make_structured_T3_mesh(8, 6)
+    K = assemble_global_sparse(K_conduction_T3_batch(m.xy[m.IEN], 2.0), m.IEN, 1)
+    f = np.full(K.shape[0], 0.1)
+    fixed = np.concatenate([m.nodes['left'], m.nodes['right']])
+    vals = np.concatenate([np.zeros(7), np.ones(7)])
+    Kd, fd = apply_dirichlet(K.copy(), f.copy(), fixed, vals)
+    u_ref = solve(Kd, fd, method='splu')
+
+    A = MatrixFreeOperator(m.xy, m.IEN, 2.0, physics='conduction', etype='T3', fixed_dofs=fixed)
+    u, info = solve(A, A.rhs(f, vals), method='auto', tol=1e-12, return_info=True)
+    assert info.method == 'cg'
+    assert np.allclose(u, u_ref, atol=1e-8)
@@ -0,0 +1,37 @@
+import numpy as np
+from fem.mesh import make_structured_Q4_mesh, make_structured_T3_mesh, make_structured_T6_mesh
+
+def test_q4_mesh_matches_loop_numbering():
+    nx, ny = 3, 2
+    m = make_structured_Q4_mesh(nx, ny, Lx=1.0, Ly=0.2)
+    nid = lambda i, j: j*(nx+1) + i
+    ref = [[nid(i,j), nid(i+1,j), nid(i+1,j+1), nid(i,j+1)] for j in range(ny) for i in range(nx)]
+    assert m.IEN.dtype == np.int32 and m.xy.flags.c_contiguous
+    assert np.array_equal(m.IEN, ref)
+    assert np.array_equal(m.nodes['left'], [nid(0, j) for j in range(ny+1)])
+    assert np.array_equal(m.nodes['right'], [nid(nx, j) for j in range(ny+1)])
+    assert np.allclose(m.xy[m.nodes['top'], 1], 0.2)
+
+def test_triangle_meshes_cover_domain():
+    for make, nen in ((make_structured_T3_mesh, 3), (make_structured_T6_mesh, 6)):
+        m = make(4, 3, Lx=2.0, Ly=1.0, ratio=(3.0, 1.0))
+        c = m.xy[m.IEN[:, :3]]
+        a, b = c[:, 1] - c[:, 0], c[:, 2] - c[:, 0]
+        area = 0.5*(a[:, 0]*b[:, 1] - a[:, 1]*b[:, 0])
+        assert m.IEN.shape[1] == nen and (area > 0).all()
+        assert np.isclose(area.sum(), 2.0)
+        L = sum(np.linalg.norm(m.xy[e[:, 1]] - m.xy[e[:, 0]], axis=1).sum() for e in m.edges.values())
+        assert np.isclose(L, 6.0)
+
+def test_quadratic_quad_meshes():
+    from fem.mesh import make_structured_Q8_mesh, make_structured_Q9_mesh
+    for make, nen, nnodes in ((make_structured_Q9_mesh, 9, 9*7), (make_structured_Q8_mesh, 8, 9*7 - 12)):
+        m = make(4, 3, Lx=2.0, Ly=1.0, ratio=(2.0, 1.0))
+        assert m.IEN.shape == (12, nen) and m.xy.shape[0] == nnodes
+        assert np.array_equal(np.unique(m.IEN), np.arange(nnodes))
+        # mid-side nodes halve the element edges 1-2, 2-3, 3-4, 4-1 (ccw corners)
+        c = m.xy[m.IEN[:, :4]]
+        assert np.allclose(m.xy[m.IEN[:, 4:8]], 0.5*(c + np.roll(c, -1, axis=1)))
+        assert np.allclose(m.xy[m.nodes['right'], 0], 2.0) and len(m.nodes['top']) == 9
+        L = sum(np.linalg.norm(m.xy[e[:, 1]] - m.xy[e[:, 0]], axis=1).sum() for e in m.edges.values())
+        assert np.isclose(L, 6.0)
@@ -0,0 +1,80 @@
+import numpy as np
+from fem.mesh import make_structured_Q4_mesh, make_structured_Q9_mesh
+from fem.materials import D_plane_stress, D_plane_strain
+from fem.elements import K_structural_Q4_batch
+from fem.assembly import assemble_global_sparse
+from fem.bc import Dirichlet
+from fem.nonlinear import LinearElastic, J2PlaneStrain, NonlinearStructure, NewtonSolver
+
+def _clamped(m):
+    left = m.nodes['left']
+    return Dirichlet(2*m.xy.shape[0], np.concatenate([2*left, 2*left + 1]))
+
+def test_linear_material_matches_linear_solve_in_one_iteration():
+    m = make_structured_Q4_mesh(8, 2, Lx=4.0)
+    D = D_plane_stress(1000.0, 0.3)
+    bc = _clamped(m)
+    f = np.zeros(2*m.xy.shape[0])
+    f[2*m.nodes['right'] + 1] = -1.0
+    model = NonlinearStructure(m.xy, m.IEN, LinearElastic(D))
+    u = NewtonSolver(model, bc).run(f)
+    K = assemble_global_sparse(K_structural_Q4_batch(m.xy[m.IEN], D), m.IEN, 2)
+    assert np.allclose(u, bc.solve(K, f))
+    f_int, Kt, _ = model.evaluate(u)
+    assert np.allclose((Kt - K).data, 0.0) and np.allclose(f_int, K @ u)
+
+def _bar(material, nsteps, **opts):
+    """Homogeneous plane-strain bar stretched in x by prescribed end displacement."""
+    m = make_structured_Q4_mesh(4, 2, Lx=2.0)
+    left, right = m.nodes['left'], m.nodes['right']
+    fixed = np.concatenate([2*left, [2*left[0] + 1], 2*right])
+    bc = Dirichlet(2*m.xy.shape[0], fixed)
+    values = np.concatenate([np.zeros(left.size + 1), np.full(right.size, 0.02)])
+    model = NonlinearStructure(m.xy, m.IEN, material)
+    solver = NewtonSolver(model, bc, **opts)
+    u = solver.run(0.0, nsteps=nsteps, values=values)
+    f_int, _, _ = model.evaluate(u, tangent=False)
+    return f_int[2*right].sum(), solver
+
+def test_j2_limit_stress_and_quadratic_convergence():
+    E, nu, sy = 1000.0, 0.3, 1.0
+    Fx, solver = _bar(J2PlaneStrain(E, nu, sy), nsteps=10)
+    # perfectly plastic plane strain: sigma_xx -> 2/sqrt(3) sigma_y (beam height 1)
+    assert abs(Fx - 2/np.sqrt(3)*sy) < 0.02
+    res = solver.history[-1]['residuals']
+    assert len(res) <= 6
+    # linear hardening lifts the response; modified Newton converges to the same state
+    Fh, hsolver = _bar(J2PlaneStrain(E, nu, sy, H=100.0), nsteps=5)
+    assert Fh > Fx
+    Fm, msolver = _bar(J2PlaneStrain(E, nu, sy, H=100.0), nsteps=5, modified=True, maxiter=200)
+    assert np.isclose(Fm, Fh, rtol=1e-6)
+    assert sum(h['iterations'] for h in msolver.history) > sum(h['iterations'] for h in hsolver.history)
+
+def test_elastic_state_is_linear_elastic():
+    D = D_plane_strain(1000.0, 0.3)
+    eps = np.array([[1e-4, -2e-4, 3e-4]])
+    mat = J2PlaneStrain(1000.0, 0.3, 10.0)
+    sig, C, state = mat.update(eps, mat.initial_state((1,)))
+    assert np.allclose(C[0], D) and np.allclose(sig, eps @ D.T)
+    assert np.all(state['alpha'] == 0.0)
+
+def test_large_deflection_cantilever_bisshopp_drucker():
+    L, h, E = 10.0, 0.5, 1.0e4
+    m = make_structured_Q9_mesh(20, 1, Lx=L, Ly=h)
+    I = h**3/12
+    P = E*I/L**2                                   # P L^2 / EI = 1
+    f = np.zeros(2*m.xy.shape[0])
+    right = m.nodes['right']
+    f[2*right + 1] = -P*np.array([1, 4, 1])/6
+    model = NonlinearStructure(m.xy, m.IEN, LinearElastic(D_plane_stress(E, 0.0)), 'Q9',
+                               kinematics='green')
+    solver = NewtonSolver(model, _clamped(m))
+    u = solver.run(f, nsteps=4)
+    tip = right[1]
+    assert abs(-u[2*tip + 1]/L - 0.3017) < 0.005
+    assert abs(-u[2*tip]/L - 0.0566) < 0.003
+    assert all(h['iterations'] <= 8 for h in solver.history)
+    assert solver.history[-1]['residuals'][-2] < 1e-4      # quadratic tail
+    model.commit(model.material.initial_state(model.w.shape))
+    u_ls = NewtonSolver(model, _clamped(m), line_search=True).run(f, nsteps=4)
+    assert np.allclose(u_ls, u, atol=1e-8*L)
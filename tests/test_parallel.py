@@ -0,0 +1,48 @@
+import numpy as np
+from fem.mesh import make_structured_Q4_mesh
+from fem.materials import D_plane_stress
+from fem.elements import K_structural_Q4_batch
+from fem.assembly import assemble_global_sparse
+from fem.parallel import assemble_parallel
+
+def test_parallel_assembly_deterministic_across_workers():
+    m = make_structured_Q4_mesh(20, 10, ratio=(3.0, 1.0))
+    D = D_plane_stress(210e3, 0.3)
+    K_ref = assemble_global_sparse(K_structural_Q4_batch(m.xy[m.IEN], D, t=0.1), m.IEN, 2)
+    results = [assemble_parallel(K_structural_Q4_batch, m.xy, m.IEN, 2, D, t=0.1,
+                                 n_workers=w, chunk_size=32, backend=b)
+               for w, b in ((1, 'thread'), (4, 'thread'), (2, 'process'), (3, 'process'))]
+    for K in results:
+        assert np.allclose(K.toarray(), K_ref.toarray())
+        assert np.array_equal(K.data, results[0].data)
+
+def test_empty_mesh_gives_empty_results():
+    m = make_structured_Q4_mesh(2, 2)
+    D = D_plane_stress(1.0, 0.3)
+    for b in ('thread', 'process'):
+        K = assemble_parallel(K_structural_Q4_batch, m.xy, m.IEN[:0], 2, D, n_workers=2, backend=b)
+        assert K.shape == (18, 18) and K.nnz == 0
+
+_CHILD = """
+import multiprocessing as mp, sys
+from fem.mesh import make_structured_Q4_mesh
+from fem.materials import D_plane_stress
+from fem.elements import K_structural_Q4_batch
+from fem.parallel import assemble_parallel
+if __name__ == '__main__':
+    mp.set_start_method(sys.argv[1])
+    m = make_structured_Q4_mesh(8, 4)
+    assemble_parallel(K_structural_Q4_batch, m.xy, m.IEN, 2, D_plane_stress(1.0, 0.3),
+                      n_workers=2, chunk_size=8, backend='process')
+"""
+
+def test_process_backend_leaves_resource_tracker_quiet(tmp_path):
+    import multiprocessing as mp, os, subprocess, sys
+    import fem
+    script = tmp_path / "child.py"
+    script.write_text(_CHILD)
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(fem.__file__)))
+    for method in mp.get_all_start_methods():
+        r = subprocess.run([sys.executable, str(script), method], env=env,
+                           capture_output=True, text=True, timeout=120)
+        assert r.returncode == 0 and r.stderr == '', (method, r.stderr)
@@ -0,0 +1,29 @@
+import numpy as np
+from fem.materials import D_plane_stress
+from fem.mesh import make_structured_Q4_mesh, make_structured_T3_mesh
+from fem.post import q4_B, von_mises_plane_stress, nodal_von_mises, nodal_von_mises_Q4, spr_nodal_stresses
+
+def loop_nodal_von_mises_Q4(xy, IEN, D, u):
+    vm, cnt = np.zeros(len(xy)), np.zeros(len(xy))
+    for nodes in IEN:
+        B, _ = q4_B(xy[nodes])
+        ue = u[np.column_stack([2*nodes, 2*nodes+1]).ravel()]
+        vm[nodes] += von_mises_plane_stress(D @ (B @ ue))
+        cnt[nodes] += 1
+    return vm / cnt
+
+def test_batched_von_mises_matches_loop():
+    m = make_structured_Q4_mesh(5, 3, Lx=1.0, Ly=0.4, ratio=(2.0, 1.0))
+    D = D_plane_stress(210e3, 0.3)
+    u = np.random.default_rng(1).standard_normal(2*len(m.xy))
+    assert np.allclose(nodal_von_mises_Q4(m.xy, m.IEN, D, u), loop_nodal_von_mises_Q4(m.xy, m.IEN, D, u))
+
+def test_spr_recovers_linear_stress_field():
+    D = D_plane_stress(1.0, 0.25)
+    for m, etype in ((make_structured_Q4_mesh(4, 3), 'Q4'), (make_structured_T3_mesh(4, 3), 'T3')):
+        x, y = m.xy.T
+        u = np.column_stack([x*y, 0*x]).ravel() if etype == 'Q4' else np.column_stack([x, -0.3*y]).ravel()
+        eps = np.column_stack([y, 0*x, x]) if etype == 'Q4' else np.tile([1.0, -0.3, 0.0], (len(x), 1))
+        sig = spr_nodal_stresses(m.xy, m.IEN, D, u, etype)
+        assert np.allclose(sig, eps @ D.T)
+        assert nodal_von_mises(m.xy, m.IEN, D, u, etype, method='spr').shape == (len(x),)
@@ -0,0 +1,58 @@
+import numpy as np
+from fem import profiling
+from fem.mesh import make_structured_Q4_mesh
+from fem.elements import K_conduction_Q4_batch
+from fem.assembly import assemble_global_sparse
+from fem.bc import Dirichlet
+
+def heat_solve(method='cg'):
+    m = make_structured_Q4_mesh(6, 6)
+    K = assemble_global_sparse(K_conduction_Q4_batch(m.xy[m.IEN], 1.0), m.IEN, 1)
+    return Dirichlet(K.shape[0], m.nodes['left']).solve(K, np.ones(K.shape[0]), method=method)
+
+def test_profile_records_stages_and_callbacks():
+    events = []
+    cb = profiling.register_callback(lambda stage, metrics: events.append(stage))
+    try:
+        with profiling.profile(track_memory=True) as report:
+            heat_solve()
+    finally:
+        profiling.unregister_callback(cb)
+    stats = report.as_dict()
+    assert stats['elements.K_conduction_Q4_batch']['calls'] == 1
+    assert stats['assembly.assemble_global_sparse']['nnz'] > 0
+    assert stats['solvers.solve']['iterations'] > 0
+    assert stats['bc.Dirichlet.solve']['peak_bytes'] > 0
+    assert set(report.by_module()) >= {'elements', 'assembly', 'bc', 'solvers'}
+    assert 'solvers.solve' in events and not profiling.is_enabled()
+
+def test_disabled_records_nothing():
+    report = profiling.enable()
+    profiling.disable()
+    heat_solve()
+    assert report.stages == {}
+
+@profiling.instrument('test.inner')
+def _inner():
+    return np.ones(1000)
+
+@profiling.instrument('test.outer')
+def _outer():
+    big = np.ones(2**20)                  # 8 MB, freed before the inner call returns
+    del big
+    return _inner()
+
+def test_nested_stages_keep_parent_peak_and_self_time():
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        with profiling.profile(track_memory=True) as report:
+            _outer()
+        assert tracemalloc.is_tracing()                    # caller's tracing survives disable()
+    finally:
+        tracemalloc.stop()
+    st = report.as_dict()
+    assert st['test.outer']['peak_bytes'] >= 8*2**20 > st['test.inner']['peak_bytes']
+    outer, inner = report.stages['test.outer'], report.stages['test.inner']
+    assert np.isclose(outer.self_wall + inner.wall, outer.wall)
+    assert np.isclose(sum(report.by_module().values()), outer.wall)
@@ -0,0 +1,38 @@
+import numpy as np
+from math import factorial
+import pytest
+from fem.quadrature import gauss_legendre_1D, gauss_quad, dunavant, triangle_area_rule, Rule, register_rule
+from fem.elements import parent_tables
+
+def test_gauss_legendre_exactness_and_caching():
+    for n in (1, 2, 3, 7, 12):
+        x, w = gauss_legendre_1D(n)
+        for p in range(2*n):
+            assert np.isclose(w @ x**p, (1 + (-1)**p)/(p + 1))
+        assert gauss_legendre_1D(n)[0] is x and not x.flags.writeable
+    pts, wts = gauss_quad(3)
+    assert pts.shape == (9, 2) and np.isclose(wts @ (pts[:, 0]**4*pts[:, 1]**2), 4/15)
+    with pytest.raises(ValueError):
+        x[0] = 1.0
+
+@pytest.mark.parametrize('degree', range(1, 15))
+def test_triangle_rules_integrate_monomials(degree):
+    pts, wts = dunavant(degree)
+    xi, eta = pts.T
+    for i in range(degree + 1):
+        for j in range(degree + 1 - i):
+            exact = factorial(i)*factorial(j)/factorial(i + j + 2)
+            assert np.isclose(wts @ (xi**i*eta**j), exact, rtol=1e-12, atol=1e-14)
+
+def test_rules_as_element_orders():
+    assert np.allclose(triangle_area_rule(3)[1].sum(), 0.5)
+    N, dxi, deta, w = parent_tables('T6', Rule('dunavant', 4))
+    assert N.shape == (6, 6) and np.allclose(N.sum(axis=1), 1.0) and np.isclose(w.sum(), 0.5)
+    assert parent_tables('Q4', 3)[0].shape == (9, 4)
+    assert parent_tables('Q4', Rule('gauss2', 3)) is parent_tables('Q4', Rule('gauss2', 3))
+
+def test_reregistered_family_rebuilds_parent_tables():
+    register_rule('test_gauss2', lambda n: gauss_quad(1))
+    assert parent_tables('Q4', Rule('test_gauss2', 2))[0].shape == (1, 4)
+    register_rule('test_gauss2', gauss_quad)
+    assert parent_tables('Q4', Rule('test_gauss2', 2))[0].shape == (4, 4)
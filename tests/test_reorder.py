@@ -0,0 +1,35 @@
+import numpy as np
+from fem.mesh import make_structured_Q4_mesh
+from fem.materials import D_plane_stress
+from fem.elements import K_structural_Q4_batch
+from fem.assembly import assemble_global_sparse
+from fem.bc import Dirichlet
+from fem.reorder import renumber
+
+def scrambled_mesh(nx=12, ny=8):
+    m = make_structured_Q4_mesh(nx, ny, Lx=3.0)
+    p = np.random.default_rng(1).permutation(len(m.xy))
+    ip = np.empty_like(p)
+    ip[p] = np.arange(p.size)
+    return m.xy[p], ip[m.IEN].astype(m.IEN.dtype), ip[m.nodes['left']], ip[m.nodes['right']]
+
+def solve_cantilever(xy, IEN, left, right):
+    K = assemble_global_sparse(K_structural_Q4_batch(xy[IEN], D_plane_stress(1e3, 0.3)), IEN, 2)
+    f = np.zeros(K.shape[0])
+    f[2*right + 1] = -1.0
+    return Dirichlet(K.shape[0], np.concatenate([2*left, 2*left + 1])).solve(K, f, method='splu')
+
+def test_renumbered_solution_maps_back():
+    xy, IEN, left, right = scrambled_mesh()
+    u_ref = solve_cantilever(xy, IEN, left, right)
+    for method in ('rcm', 'nd'):
+        xy2, IEN2, ren = renumber(xy, IEN, method)
+        assert np.array_equal(np.sort(ren.perm), np.arange(len(xy)))
+        assert np.allclose(xy2[ren.nodes(IEN)], xy[IEN])
+        u = solve_cantilever(xy2, IEN2, ren.nodes(left), ren.nodes(right))
+        assert np.allclose(ren.to_original(u, 2), u_ref)
+        assert np.allclose(ren.to_new(u_ref, 2), u)
+        assert np.array_equal(ren.dofs(2*left + 1, 2), 2*ren.nodes(left) + 1)
+    rep = renumber(xy, IEN, 'rcm')[2].report
+    assert rep['bandwidth_after'] < rep['bandwidth_before'] / 5
+    assert rep['profile_after'] < rep['profile_before']
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from fem.elements import K_conduction_Q4_batch
+from fem.assembly import assemble_global_sparse
+from fem.bc import Dirichlet
+from fem.solvers import solve, factorize, FactorCache, SolverSession
+
+def plate_system(n=12):
+    xs = np.linspace(0, 1, n+1)
+    X, Y = np.meshgrid(xs, xs)
+    xy = np.column_stack([X.ravel(), Y.ravel()])
+    i, j = np.meshgrid(np.arange(n), np.arange(n))
+    n1 = (j*(n+1) + i).ravel()
+    IEN = np.column_stack([n1, n1+1, n1+n+2, n1+n+1])
+    K = assemble_global_sparse(K_conduction_Q4_batch(xy[IEN], 1.0), IEN, 1)
+    bc = Dirichlet(K.shape[0], np.flatnonzero(xy[:, 0] == 0))
+    return bc.reduce(K, np.ones(K.shape[0]))
+
+@pytest.mark.parametrize("method,precond", [("dense", None), ("spsolve", None), ("splu", None),
+                                            ("cholesky", None), ("cg", "jacobi"), ("cg", "ilu"),
+                                            ("minres", "jacobi"), ("auto", None)])
+def test_backends_agree(method, precond):
+    K, f = plate_system()
+    u_ref = np.linalg.solve(K.toarray(), f)
+    u, info = solve(K, f, method=method, precond=precond, tol=1e-12, return_info=True)
+    assert info.converged and info.residual < 1e-8
+    assert np.allclose(u, u_ref, rtol=1e-6)
+
+def test_factorization_reused_for_block_rhs():
+    K, f = plate_system()
+    F = np.column_stack([f, 2*f, -f])
+    lu = factorize(K)
+    U = solve(lu, F)
+    assert U.shape == F.shape
+    assert np.allclose(K @ U, F)
+
+def test_session_cache_reuses_factorization():
+    K, f = plate_system()
+    bc = Dirichlet(K.shape[0], [0, 5])
+    cache = FactorCache(max_bytes=10**9)
+    builds = []
+    def build():
+        builds.append(1)
+        return K
+    s1 = SolverSession(build, bc=bc, cache=cache, key="plate")
+    s2 = SolverSession(build, bc=bc, cache=cache, key="plate")
+    assert len(builds) == 1 and cache.hits == 1
+    assert s2.factorization is s1.factorization
+    F = np.column_stack([np.ones(K.shape[0]), np.arange(K.shape[0], dtype=float)])
+    U = s2.solve(F, values=[1.0, 2.0])
+    for j in range(2):
+        assert np.allclose(U[:, j], bc.solve(K, F[:, j], values=[1.0, 2.0]))
+    cache.invalidate("plate")
+    assert len(cache) == 0 and cache.nbytes == 0
@@ -0,0 +1,59 @@
+import os
+from functools import partial
+import numpy as np
+import pytest
+from fem.mesh import make_structured_Q4_mesh
+from fem.materials import D_plane_stress
+from fem.elements import K_structural_Q4_batch
+from fem.assembly import assemble_global_sparse
+from fem.bc import Dirichlet
+from fem.sweep import grid, Problem, Sweep, SweepStore
+
+_MESH = make_structured_Q4_mesh(10, 2, Lx=1.0, Ly=0.2)
+
+def cantilever(E, t, P):
+    m = _MESH
+    left, right = m.nodes['left'], m.nodes['right']
+    F = np.zeros(2*m.xy.shape[0])
+    F[2*right + 1] = P/right.size
+    return Problem(m.xy, m.IEN, partial(K_structural_Q4_batch, D=D_plane_stress(E, 0.3), t=t),
+                   F, np.concatenate([2*left, 2*left + 1]), mesh_key='cantilever',
+                   system_key=(E, t), outputs=lambda u: {'tip': u[2*right + 1].mean(), 'u': u})
+
+def _reference(E, t, P):
+    p = cantilever(E, t, P)
+    K = assemble_global_sparse(p.kernel(p.xy[p.IEN]), p.IEN, 2)
+    return Dirichlet(K.shape[0], p.fixed).solve(K, p.F)
+
+def test_grid_order():
+    cases = grid(E=[1.0, 2.0], P=[3, 4, 5])
+    assert len(cases) == 6 and cases[1] == {'E': 1.0, 'P': 4} and cases[3]['E'] == 2.0
+
+def test_serial_sweep_shares_pattern_and_factorization():
+    cases = grid(E=[200e9, 70e9], t=[0.01], P=[-1e3, -2e3, -5e3])
+    sweep = Sweep(cantilever, cases)
+    cols = sweep.run(n_workers=1, group=('E', 't'))
+    assert sweep.stats == {'cases': 6, 'dofmap': 1, 'assembled': 2, 'factored': 2}
+    assert np.array_equal(cols['index'], np.arange(6))
+    for i, c in enumerate(cases):
+        assert np.allclose(cols['u'][i], _reference(**c))
+    # linear in P, inversely proportional to E
+    assert np.allclose(cols['tip'][:3]/cols['P'][:3], cols['tip'][0]/cols['P'][0])
+    assert np.isclose(cols['tip'][3]/cols['tip'][0], 200/70)
+
+def test_process_sweep_streams_and_resumes(tmp_path):
+    path = str(tmp_path / 'study')
+    cases = grid(E=[200e9, 70e9], t=[0.01, 0.02], P=[-1e3, -2e3])
+    full = Sweep(cantilever, cases, path).run(n_workers=2, group=('E', 't'))
+    assert sorted(os.listdir(path)) == ['cases.json'] + [f"part-{i:06d}.npz" for i in range(8)]
+
+    os.remove(os.path.join(path, 'part-000005.npz'))          # lost in a crash
+    again = Sweep(cantilever, cases, path)
+    cols = again.run(n_workers=1)
+    assert again.stats['cases'] == 1
+    for k in full:
+        assert np.array_equal(cols[k], full[k])
+    assert np.allclose(SweepStore(path).load(5)['u'], _reference(**cases[5]))
+
+    with pytest.raises(ValueError):
+        Sweep(cantilever, cases[:4], path)
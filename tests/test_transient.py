@@ -0,0 +1,33 @@
+import numpy as np
+from fem.mesh import make_structured_Q4_mesh, make_structured_T3_mesh
+from fem.elements import (K_conduction_Q4_batch, C_conduction_Q4_batch,
+                          C_conduction_T3_batch)
+from fem.assembly import assemble_global_sparse
+from fem.bc import Dirichlet
+from fem.io import Store
+from fem.transient import ThetaMethod, BACKWARD_EULER, CRANK_NICOLSON
+
+def test_capacitance_totals():
+    m = make_structured_T3_mesh(3, 2, Lx=2.0)
+    for lumped in (False, True):
+        Ct = C_conduction_T3_batch(m.xy[m.IEN], 3.0, lumped=lumped)
+        assert np.isclose(Ct.sum(), 3.0*2.0)
+    Cq = C_conduction_Q4_batch(np.array([[[0, 0], [2, 0], [2, 1], [0, 1]]], float))
+    assert np.allclose(Cq[0], 2.0/36*np.array([[4, 2, 1, 2], [2, 4, 2, 1], [1, 2, 4, 2], [2, 1, 2, 4]]))
+
+def test_theta_method_decays_to_steady_state(tmp_path):
+    # 1D-like bar: left end held at 1, initial 0; compare the slowest mode decay
+    m = make_structured_Q4_mesh(20, 1, Lx=1.0, Ly=0.05)
+    K = assemble_global_sparse(K_conduction_Q4_batch(m.xy[m.IEN], 1.0), m.IEN, 1)
+    C = assemble_global_sparse(C_conduction_Q4_batch(m.xy[m.IEN], 1.0, lumped=True), m.IEN, 1)
+    bc = Dirichlet(K.shape[0], m.nodes['left'])
+    store = Store(tmp_path / 'run', 'w')
+    for theta in (BACKWARD_EULER, CRANK_NICOLSON):
+        tm = ThetaMethod(K, C, dt=0.01, theta=theta, bc=bc)
+        u, t = tm.run(np.zeros(K.shape[0]), 250, values=1.0, stride=40, store=store, name='T')
+        hist = store.load('T')
+        assert hist.shape == (8, K.shape[0]) and np.allclose(t[[0, -1]], [0.0, 2.5])
+        assert np.allclose(hist[-1], u)
+        # insulated bar: T(1,t) = 1 - 4/pi exp(-pi^2 t / 4) + ...
+        assert abs(u[m.nodes['right'][0]] - (1 - 4/np.pi*np.exp(-np.pi**2*2.5/4))) < 5e-3
+        assert np.all(np.diff(hist[:, m.nodes['right'][0]]) > 0)